@@ -0,0 +1,162 @@
+"""
+Admission control for memory-heavy extractions.
+
+Each extraction is weighted by an estimate of the memory it needs (file size
+times a per-format factor, plus a fixed overhead) and admitted only while the
+process-wide budget and the concurrency limit allow it. Requests that do not
+fit wait in a bounded FIFO queue; when the queue is full they are rejected at
+once (429), and when no room frees up in time they are rejected with 503. In
+both cases a Retry-After estimate is derived from recent extraction times.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+from metrics import metrics
+
+
+MB = 1024 * 1024
+
+# Approximate peak memory per byte of input while extracting (pdfplumber keeps
+# every character object of a page; pandas/openpyxl build whole frames)
+FORMAT_MEMORY_FACTORS = {'.pdf': 30, '.xlsx': 12, '.xls': 12, '.csv': 6}
+DEFAULT_MEMORY_FACTOR = 12
+BASE_COST = 8 * MB  # Interpreter-side overhead of any extraction
+
+
+class AdmissionRejected(Exception):
+    """An extraction was not admitted (HTTP ``status`` 429 or 503, retry after ``retry_after`` seconds)."""
+
+    def __init__(self, message: str, status: int, retry_after: int):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionBudget:
+    """Memory and concurrency budget shared by the extractions of one process."""
+
+    def __init__(self, capacity: int = 512 * MB, max_concurrent: int = 2,
+                 max_waiting: int = 16, timeout: float = 30):
+        """
+        Args:
+            capacity: Estimated bytes that extractions may use at once
+            max_concurrent: Extractions running at once
+            max_waiting: Requests allowed to wait for room (more get 429)
+            timeout: Seconds a request waits before it gets 503
+        """
+        self.capacity = capacity
+        self.max_concurrent = max_concurrent
+        self.max_waiting = max_waiting
+        self.timeout = timeout
+
+        self._condition = threading.Condition()
+        self._waiting: deque = deque()  # FIFO tickets: large requests are not starved
+        self.in_use = 0
+        self.active = 0
+        self.admitted = 0
+        self.rejected = {'queueFull': 0, 'timeout': 0}
+        self._average_seconds = 1.0  # Moving average of admitted extraction times
+
+    @staticmethod
+    def cost(suffix: str, size: int) -> int:
+        """Estimated peak memory of extracting ``size`` bytes of a ``suffix`` file."""
+        return BASE_COST + size * FORMAT_MEMORY_FACTORS.get(suffix.lower(), DEFAULT_MEMORY_FACTOR)
+
+    def _estimate_wait(self) -> int:
+        rounds = (len(self._waiting) + self.active) / max(1, self.max_concurrent)
+        return max(1, round(rounds * self._average_seconds))
+
+    def check_queue(self) -> None:
+        """
+        Reject a request before it is received when the wait queue is already full.
+
+        Raises:
+            AdmissionRejected: 429 if the wait queue is full
+        """
+        with self._condition:
+            if len(self._waiting) >= self.max_waiting:
+                raise self._reject('queueFull', 'Too many requests waiting for extraction', 429)
+
+    def _fits(self, cost: int) -> bool:
+        return self.active < self.max_concurrent and self.in_use + cost <= self.capacity
+
+    def _reject(self, reason: str, message: str, status: int) -> AdmissionRejected:
+        self.rejected[reason] += 1
+        metrics.inc('admission_rejected_total', reason=reason)
+        return AdmissionRejected(message, status, self._estimate_wait())
+
+    def _publish(self) -> None:
+        metrics.set_gauge('budget_bytes_in_use', self.in_use)
+        metrics.set_gauge('extractions_active', self.active)
+        metrics.set_gauge('extractions_waiting', len(self._waiting))
+
+    @contextmanager
+    def admit(self, cost: int) -> Iterator[None]:
+        """
+        Hold ``cost`` bytes of the budget and one concurrency slot while extracting.
+
+        A cost above the capacity is clamped to it: such a file runs alone.
+
+        Raises:
+            AdmissionRejected: 429 if the wait queue is full, 503 on timeout
+        """
+        cost = min(cost, self.capacity)
+        ticket = object()
+
+        with self._condition:
+            if self._waiting or not self._fits(cost):
+                if len(self._waiting) >= self.max_waiting:
+                    raise self._reject('queueFull', 'Too many requests waiting for extraction', 429)
+
+                self._waiting.append(ticket)
+                self._publish()
+                deadline = time.monotonic() + self.timeout
+                try:
+                    while self._waiting[0] is not ticket or not self._fits(cost):
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            raise self._reject('timeout', 'Server busy: extraction budget exhausted', 503)
+                        self._condition.wait(remaining)
+                finally:
+                    self._waiting.remove(ticket)
+                    self._publish()
+                    # The next ticket may fit now that this one left the head of the queue
+                    self._condition.notify_all()
+
+            self.in_use += cost
+            self.active += 1
+            self.admitted += 1
+            self._publish()
+
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._condition:
+                self.in_use -= cost
+                self.active -= 1
+                self._average_seconds = 0.8 * self._average_seconds + 0.2 * elapsed
+                self._publish()
+                self._condition.notify_all()
+
+    def stats(self) -> Dict[str, any]:
+        """Current usage and counters."""
+        with self._condition:
+            return {
+                'capacityBytes': self.capacity,
+                'inUseBytes': self.in_use,
+                'usage': round(self.in_use / self.capacity, 4) if self.capacity else 0,
+                'active': self.active,
+                'maxConcurrent': self.max_concurrent,
+                'waiting': len(self._waiting),
+                'maxWaiting': self.max_waiting,
+                'timeoutSeconds': self.timeout,
+                'admitted': self.admitted,
+                'rejected': dict(self.rejected),
+                'averageSeconds': round(self._average_seconds, 4)
+            }
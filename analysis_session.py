@@ -0,0 +1,435 @@
+"""
+Incremental analysis sessions.
+
+A session parses the calendar once and keeps its columnar state (days,
+raw name tokens per position, day types) together with the per-worker
+counters. Later edits are applied as deltas: appended weeks, name mapping
+changes and holiday changes only subtract and re-add the contributions of
+the days they affect, instead of re-running the whole pipeline.
+What-if swaps are simulated on a snapshot (see ``swap_simulator``).
+"""
+
+import copy
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from day_types import classify, split_codes
+from name_normalizer import NameNormalizer
+from shift_analyzer import (
+    LINES_PER_WEEK, POSITIONS, ROSELL_POSITION, CalendarParser, ParsedCalendar,
+    ShiftAnalysis, ShiftAnalyzer, advance_date, parse_holidays, parse_start_date
+)
+from swap_simulator import SwapSimulator
+
+
+class AnalysisSession:
+    """Parsed calendar plus per-worker counters that can be updated incrementally."""
+
+    def __init__(self, calendar_text: str, start_date: Union[str, date],
+                 name_mapping: str = '', holidays: str = ''):
+        """
+        Args:
+            calendar_text: Week-block calendar text
+            start_date: Date of the first day (YYYY-MM-DD)
+            name_mapping: Mapping lines (``alias=NAME``)
+            holidays: Comma-separated holiday dates
+        """
+        self.parser = CalendarParser(start_date)
+        self.mapping = NameNormalizer(name_mapping)
+        self.holidays = set(parse_holidays(holidays))
+        self._holidays_edited = False
+        self.lock = threading.Lock()
+        self.last_access = time.time()
+
+        # Raw name tokens (as written in the calendar) and their canonical worker
+        self.token_ids: Dict[str, int] = {}
+        self._token_workers: List[int] = []
+        self.token_worker = np.zeros(0, dtype=np.int32)
+        self.worker_ids: Dict[str, int] = {}
+        self.worker_names: List[str] = []
+
+        # Per-day columns
+        self.day_numbers = np.zeros(0, dtype=np.int64)  # day number as written
+        self.ordinals = np.zeros(0, dtype=np.int64)
+        self.day_of_week = np.zeros(0, dtype=np.int8)
+        self.tokens = np.zeros((0, POSITIONS), dtype=np.int32)  # token ids, -1 if empty
+        self.month = np.zeros(0, dtype=np.int8)  # month - 1
+        self.day_types = self._classify(self.ordinals, self.day_of_week)
+
+        # Per-worker counters
+        self.counters = {key: np.zeros(0, dtype=np.int64) for key in ShiftAnalysis.COUNTERS}
+        self.monthly = np.zeros((0, 12), dtype=np.int64)
+
+        # Incomplete last week block, re-parsed when more lines arrive
+        self._tail_lines: List[str] = []
+        self._tail_start = 0
+        self._tail_state = self.parser.state
+
+        self._simulator: Optional[SwapSimulator] = None
+        self.append_text(calendar_text)
+
+    # ------------------------------------------------------------------
+    # Internal helpers
+    # ------------------------------------------------------------------
+
+    def _worker_id(self, name: str) -> int:
+        worker = self.worker_ids.get(name)
+        if worker is None:
+            worker = self.worker_ids[name] = len(self.worker_names)
+            self.worker_names.append(name)
+        return worker
+
+    def _token_id(self, raw: str) -> int:
+        token = self.token_ids.get(raw)
+        if token is None:
+            token = self.token_ids[raw] = len(self._token_workers)
+            self._token_workers.append(self._worker_id(self.mapping.normalize(raw)))
+        return token
+
+    def _classify(self, ordinals: np.ndarray, day_of_week: np.ndarray) -> Dict[str, np.ndarray]:
+        if self._holidays_edited:
+            # Edited holiday sets are one-off: classify directly instead of caching a shared index
+            return split_codes(classify(ordinals, day_of_week, [h.toordinal() for h in self.holidays]))
+        return ShiftAnalyzer.classify_days(ParsedCalendar(ordinals, day_of_week, None, []), self.holidays)
+
+    @staticmethod
+    def _months(ordinals: np.ndarray) -> np.ndarray:
+        return (ParsedCalendar(ordinals, None, None, []).months - 1).astype(np.int8)
+
+    def _grow_counters(self) -> None:
+        """Extend the counter arrays to cover newly seen workers."""
+        missing = len(self.worker_names) - len(self.monthly)
+        if missing > 0:
+            for key, values in self.counters.items():
+                self.counters[key] = np.concatenate([values, np.zeros(missing, dtype=np.int64)])
+            self.monthly = np.vstack([self.monthly, np.zeros((missing, 12), dtype=np.int64)])
+
+    def _apply(self, days: np.ndarray, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) the contributions of the given days."""
+        if len(days) == 0:
+            return
+        self._grow_counters()
+        self._simulator = None  # Snapshot of the previous state
+
+        tokens = self.tokens[days]
+        day_index, position = np.nonzero(tokens >= 0)
+        worker = self.token_worker[tokens[day_index, position]]
+        days = days[day_index]
+
+        np.add.at(self.counters['total'], worker, sign)
+        for key in ('friday', 'saturday', 'sunday', 'weekend'):
+            np.add.at(self.counters[key], worker[self.day_types[key][days]], sign)
+        np.add.at(self.counters['lastPosition'], worker[position == ROSELL_POSITION], sign)
+        np.add.at(self.monthly, (worker, self.month[days]), sign)
+
+    def _truncate(self, n_days: int) -> None:
+        """Remove every day from index ``n_days`` on (and its contributions)."""
+        self._apply(np.arange(n_days, len(self.ordinals)), -1)
+        self.day_numbers = self.day_numbers[:n_days]
+        self.ordinals = self.ordinals[:n_days]
+        self.day_of_week = self.day_of_week[:n_days]
+        self.tokens = self.tokens[:n_days]
+        self.month = self.month[:n_days]
+        self.day_types = {key: values[:n_days] for key, values in self.day_types.items()}
+
+    def _add_days(self, lines: List[str]) -> None:
+        """Parse lines from the current parser state and append their days."""
+        day_numbers, ordinals, day_of_week, rows = [], [], [], []
+        for ordinal, dow, names in self.parser.iter_days(lines):
+            ids = [-1] * POSITIONS
+            for position, name in enumerate(names):
+                if name:  # Empty cells of layout-extracted grids stay -1
+                    ids[position] = self._token_id(name)
+            day_numbers.append(self.parser.state[1])
+            ordinals.append(ordinal)
+            day_of_week.append(dow)
+            rows.append(ids)
+
+        if not ordinals:
+            return
+
+        start = len(self.ordinals)
+        new_ordinals = np.asarray(ordinals, dtype=np.int64)
+        new_dow = np.asarray(day_of_week, dtype=np.int8)
+        new_types = self._classify(new_ordinals, new_dow)
+
+        self.token_worker = np.asarray(self._token_workers, dtype=np.int32)
+        self.day_numbers = np.concatenate([self.day_numbers, np.asarray(day_numbers, dtype=np.int64)])
+        self.ordinals = np.concatenate([self.ordinals, new_ordinals])
+        self.day_of_week = np.concatenate([self.day_of_week, new_dow])
+        self.tokens = np.concatenate([self.tokens, np.asarray(rows, dtype=np.int32).reshape(-1, POSITIONS)])
+        self.month = np.concatenate([self.month, self._months(new_ordinals)])
+        self.day_types = {key: np.concatenate([self.day_types[key], new_types[key]]) for key in new_types}
+
+        self._apply(np.arange(start, len(self.ordinals)), 1)
+
+    # ------------------------------------------------------------------
+    # Deltas
+    # ------------------------------------------------------------------
+
+    def snapshot(self) -> Dict[str, any]:
+        """
+        Copy the session state, so a batch of edits can be undone with ``restore``.
+
+        Arrays, containers and the parser are copied (edits change them in
+        place); the name mapping and simulator are replaced, never mutated.
+        """
+        def clone(value):
+            if isinstance(value, np.ndarray):
+                return value.copy()
+            if isinstance(value, dict):
+                return {key: clone(item) for key, item in value.items()}
+            if isinstance(value, (list, set)):
+                return type(value)(value)
+            if isinstance(value, CalendarParser):
+                return copy.copy(value)
+            return value
+
+        return {name: clone(value) for name, value in vars(self).items() if name != 'lock'}
+
+    def restore(self, state: Dict[str, any]) -> None:
+        """Return to a state taken with ``snapshot``."""
+        vars(self).update(state)
+
+    def append_text(self, text: Union[str, Iterable[str]]) -> int:
+        """
+        Append calendar lines (new weeks) to the session.
+
+        An incomplete week block left by a previous call is completed with
+        the new lines and re-parsed; earlier days are not touched.
+
+        Args:
+            text: Calendar text or lines
+
+        Returns:
+            Number of days re-parsed or added
+        """
+        lines = text.split('\n') if isinstance(text, str) else list(text)
+        lines = [line for line in lines if line.strip() or '\t' in line]  # Tab rows: empty grid positions
+        if not lines:
+            return 0
+
+        before = self._tail_start if self._tail_lines else len(self.ordinals)
+        if self._tail_lines:
+            self._truncate(self._tail_start)
+            self.parser.state = self._tail_state
+            lines = self._tail_lines + lines
+
+        complete = len(lines) - len(lines) % LINES_PER_WEEK
+        self._add_days(lines[:complete])
+
+        self._tail_lines = lines[complete:]
+        self._tail_start = len(self.ordinals)
+        self._tail_state = self.parser.state
+        if self._tail_lines:
+            self._add_days(self._tail_lines)
+
+        return len(self.ordinals) - before
+
+    def set_name_mapping(self, name_mapping: str) -> int:
+        """
+        Replace the name mapping, updating only the days whose tokens change worker.
+
+        Args:
+            name_mapping: Full mapping text (``alias=NAME`` lines)
+
+        Returns:
+            Number of days updated
+        """
+        self.mapping = NameNormalizer(name_mapping)
+        self._token_workers = [self._worker_id(self.mapping.normalize(raw)) for raw in self.token_ids]
+        new_worker = np.asarray(self._token_workers, dtype=np.int32)
+
+        changed = np.nonzero(new_worker != self.token_worker)[0]
+        days = np.nonzero(np.isin(self.tokens, changed).any(axis=1))[0]
+        self._apply(days, -1)
+        self.token_worker = new_worker
+        self._apply(days, 1)
+        return len(days)
+
+    def update_mapping(self, changes: Dict[str, Optional[str]]) -> int:
+        """
+        Add or change (``alias: NAME``) and remove (``alias: None``) mapping entries.
+
+        Args:
+            changes: Alias to canonical name (None or empty removes the alias)
+
+        Returns:
+            Number of days updated
+        """
+        entries = dict(self.mapping.exact)
+        for alias, name in changes.items():
+            alias = alias.strip()
+            if name is None or not str(name).strip():
+                entries.pop(alias, None)
+            else:
+                entries[alias] = str(name).strip()
+        return self.set_name_mapping('\n'.join(f'{alias}={name}' for alias, name in entries.items()))
+
+    def update_holidays(self, add: Iterable[date] = (), remove: Iterable[date] = ()) -> int:
+        """
+        Add or remove holidays, reclassifying only each holiday and the day before it.
+
+        Args:
+            add: Holidays to add
+            remove: Holidays to remove
+
+        Returns:
+            Number of days updated
+        """
+        self._holidays_edited = True
+        touched = set()
+        for holiday in add:
+            if holiday not in self.holidays:
+                self.holidays.add(holiday)
+                touched.update((holiday.toordinal(), holiday.toordinal() - 1))
+        for holiday in remove:
+            if holiday in self.holidays:
+                self.holidays.discard(holiday)
+                touched.update((holiday.toordinal(), holiday.toordinal() - 1))
+
+        days = np.nonzero(np.isin(self.ordinals, list(touched)))[0]
+        if len(days):
+            self._apply(days, -1)
+            day_types = self._classify(self.ordinals[days], self.day_of_week[days])
+            for key, values in day_types.items():
+                self.day_types[key][days] = values
+            self._apply(days, 1)
+        return len(days)
+
+    def set_start_date(self, start_date: Union[str, date]) -> int:
+        """
+        Move the calendar to a new start date.
+
+        Dates are recomputed from the stored day numbers (the text is not
+        parsed again), then every day is reclassified.
+
+        Args:
+            start_date: New date of the first day
+
+        Returns:
+            Number of days updated
+
+        Raises:
+            ValueError: If the start date is invalid or moves a day out of range
+                (the session is left unchanged)
+        """
+        start_date = parse_start_date(start_date)
+        if start_date == self.parser.start_date:
+            return 0
+
+        # Same month tracking as CalendarParser.iter_days; every date is
+        # computed (and validated) before the counters are touched
+        current, previous_day = start_date, 0
+        ordinals = []
+        tail_state = None
+        for index, day in enumerate(self.day_numbers.tolist()):
+            if index == self._tail_start:
+                tail_state = (current, previous_day)
+            current = advance_date(current, previous_day, day)
+            previous_day = day
+            ordinals.append(current.toordinal())
+
+        self._apply(np.arange(len(self.ordinals)), -1)
+        self.parser.start_date = start_date
+        self.parser.state = (current, previous_day)
+        self._tail_state = tail_state if tail_state is not None else self.parser.state
+
+        self.ordinals = np.asarray(ordinals, dtype=np.int64)
+        self.month = self._months(self.ordinals)
+        self.day_types = self._classify(self.ordinals, self.day_of_week)
+        self._apply(np.arange(len(self.ordinals)), 1)
+        return len(self.ordinals)
+
+    # ------------------------------------------------------------------
+    # Results
+    # ------------------------------------------------------------------
+
+    def analysis(self, sort_by: str = 'total') -> Dict[str, any]:
+        """
+        Return the current analysis in the same shape as ``analyze_text``.
+
+        Args:
+            sort_by: Sort key for the worker list
+
+        Returns:
+            Dictionary with 'workers', 'monthlyData', 'days' and 'nameSuggestions'
+        """
+        self._grow_counters()
+        # Workers in order of first appearance, as a full parse would number them
+        slots = self.tokens.ravel()
+        slot_workers = self.token_worker[slots[slots >= 0]]
+        seen, first = np.unique(slot_workers, return_index=True)
+        active = seen[np.argsort(first, kind='stable')]
+        active = active[self.counters['total'][active] > 0]
+        analysis = ShiftAnalysis(
+            [self.worker_names[w] for w in active.tolist()],
+            {key: values[active] for key, values in self.counters.items()},
+            self.monthly[active]
+        )
+        workers = analysis.to_workers(sort_by)
+
+        occurrences = np.bincount(slots[slots >= 0], minlength=len(self.token_ids)).tolist()
+        return {
+            'workers': workers,
+            'monthlyData': ShiftAnalysis.to_monthly_data(workers),
+            'days': len(self.ordinals),
+            'nameSuggestions': self.mapping.suggestions(dict(zip(self.token_ids, occurrences)))
+        }
+
+    def simulator(self, reset: bool = False) -> SwapSimulator:
+        """
+        Return the what-if simulator of the current state.
+
+        The simulator keeps its changes until ``reset`` or until the session
+        itself is edited (which takes a new snapshot).
+        """
+        if reset or self._simulator is None:
+            self._simulator = SwapSimulator.from_session(self)
+        return self._simulator
+
+
+class SessionStore:
+    """Thread-safe LRU of analysis sessions with idle expiry."""
+
+    def __init__(self, max_sessions: int = 100, ttl: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: 'OrderedDict[str, AnalysisSession]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, session: AnalysisSession) -> str:
+        """Store a session and return its id."""
+        session_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire()
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+
+    def get(self, session_id: str) -> Optional[AnalysisSession]:
+        """Return a session (None if unknown or expired)."""
+        with self._lock:
+            self._expire()
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_access = time.time()
+            return session
+
+    def delete(self, session_id: str) -> bool:
+        """Remove a session."""
+        with self._lock:
+            return self._sessions.pop(session_id, None) is not None
+
+    def _expire(self) -> None:
+        now = time.time()
+        for session_id in [sid for sid, s in self._sessions.items() if now - s.last_access > self.ttl]:
+            del self._sessions[session_id]
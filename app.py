@@ -1,30 +1,148 @@
 """
 Flask API for calendar file processing and shift schedule analysis.
+
+Routes live on the ``api`` blueprint; ``create_app`` builds a configured
+application. ``python app.py`` starts the development server, wsgi.py is the
+production entry point (see gunicorn.conf.py).
 """
 
-from flask import Flask, request, jsonify, send_file
+from flask import Blueprint, Flask, current_app, request, jsonify, send_file
 from flask_cors import CORS
 from werkzeug.utils import secure_filename
 import os
-import tempfile
 from pathlib import Path
-from file_processor import CalendarFileProcessor
+from file_processor import CalendarFileProcessor, supported_suffixes
+from extraction_cache import ExtractionCache, content_key
+from shift_analyzer import analyze_text, build_week_grid, parse_holidays
+from analysis_session import AnalysisSession, SessionStore
+from swap_simulator import MAX_CANDIDATES
+from schedule_validator import ValidationRules, validate_text
+from jobs import JobManager, JobQueueFull
+from day_types import preload as preload_day_types
+from admission import MB, AdmissionBudget, AdmissionRejected
+from metrics import metrics
 import traceback
+import time
+import zlib
+import shutil
+import tempfile
 from io import BytesIO
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from csv_export import iter_csv_rows, iter_csv_chunks
+from xlsx_export import XLSX_MIMETYPE, iter_xlsx_chunks
 from datetime import datetime
-
-app = Flask(__name__)
-CORS(app)
+from typing import Dict, Optional
 
 # Configuration
-ALLOWED_EXTENSIONS = {'pdf', 'xlsx', 'xls', 'csv'}
+ALLOWED_EXTENSIONS = {suffix[1:] for suffix in supported_suffixes()}  # Formats with a registered extractor
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50 MB
-TEMP_DIR = tempfile.gettempdir()
+MAX_REQUEST_SIZE = MAX_FILE_SIZE + 1024 * 1024  # File plus multipart overhead
+PDF_WORKERS = int(os.environ.get('PDF_WORKERS', '1'))  # Processes per PDF extraction
+CACHE_MAX_MB = int(os.environ.get('EXTRACTION_CACHE_MB', '64'))
+CACHE_DIR = os.environ.get('EXTRACTION_CACHE_DIR') or None  # Optional persistent tier
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', '2'))  # Background jobs run concurrently
+JOB_MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', '32'))
+JOB_RESULT_TTL = int(os.environ.get('JOB_RESULT_TTL', '3600'))  # Seconds results are kept
+SPOOL_MAX_MEMORY = 1024 * 1024  # Job uploads larger than this are spooled to disk
+STREAM_CHUNK_SIZE = 64 * 1024  # Chunk size for streamed downloads
+COMPRESS_MIN_SIZE = 1024  # Smaller JSON responses are sent uncompressed
+UPLOAD_RESPONSE_MODES = ('text', 'grid')
+SESSION_MAX = int(os.environ.get('ANALYSIS_SESSIONS_MAX', '100'))  # Analysis sessions kept in memory
+SESSION_TTL = int(os.environ.get('ANALYSIS_SESSION_TTL', '3600'))  # Seconds an idle session is kept
+MAX_EXTRACTIONS = int(os.environ.get('MAX_CONCURRENT_EXTRACTIONS', '2'))  # Per process
+EXTRACTION_MEMORY_MB = int(os.environ.get('EXTRACTION_MEMORY_MB', '512'))  # Estimated extraction memory, per process
+EXTRACTION_MAX_WAITING = int(os.environ.get('EXTRACTION_MAX_WAITING', '16'))  # Queued extractions before 429
+EXTRACTION_WAIT = float(os.environ.get('EXTRACTION_QUEUE_TIMEOUT', '30'))  # Seconds queued before 503
+UPLOAD_ENDPOINTS = ('api.upload_file', 'api.submit_upload_job')
+SHOW_TRACEBACKS = os.environ.get('SHOW_TRACEBACKS', '0').lower() not in ('0', 'false', 'no')
+# Holiday sets (';'-separated, each in the 'holidays' format) whose day-type indexes warm_up builds
+PRELOAD_HOLIDAYS = [h for h in os.environ.get('PRELOAD_HOLIDAYS', '').split(';') if h.strip()]
+
+extraction_cache = ExtractionCache(max_bytes=CACHE_MAX_MB * 1024 * 1024, disk_dir=CACHE_DIR)
+job_manager = JobManager(max_workers=JOB_WORKERS, max_pending=JOB_MAX_PENDING, result_ttl=JOB_RESULT_TTL)
+session_store = SessionStore(max_sessions=SESSION_MAX, ttl=SESSION_TTL)
+admission_budget = AdmissionBudget(capacity=EXTRACTION_MEMORY_MB * MB, max_concurrent=MAX_EXTRACTIONS,
+                                   max_waiting=EXTRACTION_MAX_WAITING, timeout=EXTRACTION_WAIT)
+
+api = Blueprint('api', __name__)
+
+
+def create_app(config: Optional[dict] = None) -> Flask:
+    """
+    Create the Flask application.
+    
+    Args:
+        config: Overrides for ``app.config`` (e.g. SHOW_TRACEBACKS=False)
+        
+    Returns:
+        Application with the API blueprint registered
+    """
+    app = Flask(__name__)
+    app.config['SHOW_TRACEBACKS'] = SHOW_TRACEBACKS
+    app.config['MAX_CONTENT_LENGTH'] = MAX_REQUEST_SIZE
+    if config:
+        app.config.update(config)
+    CORS(app)
+    app.register_blueprint(api)
+    return app
+
+
+def error_response(message: str, code: int = 500, trace: str = None, **extra):
+    """
+    JSON error response; the traceback is only included when SHOW_TRACEBACKS is set.
+    
+    Args:
+        message: Error message
+        code: HTTP status
+        trace: Traceback text (defaults to the exception being handled)
+        extra: Additional response fields
+    """
+    payload = {'error': message, **extra}
+    if current_app.config.get('SHOW_TRACEBACKS'):
+        payload['traceback'] = trace if trace is not None else traceback.format_exc()
+    return jsonify(payload), code
+
+
+@api.before_app_request
+def start_request_timing():
+    """Start collecting stage timings for this request."""
+    metrics.begin_request()
+
+
+@api.before_app_request
+def reject_early():
+    """
+    Turn uploads away before their body is read.
+    
+    Bodies announced larger than MAX_REQUEST_SIZE get 413, and uploads
+    arriving while the extraction queue is full get 429, without receiving
+    or spooling the file.
+    """
+    if request.endpoint not in UPLOAD_ENDPOINTS:
+        return None
+    if request.content_length is not None and request.content_length > MAX_REQUEST_SIZE:
+        return jsonify({
+            'error': f'File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024} MB'
+        }), 413
+    try:
+        admission_budget.check_queue()
+    except AdmissionRejected as e:
+        return jsonify({'error': str(e)}), e.status, {'Retry-After': str(e.retry_after)}
+    return None
+
+
+@api.after_app_request
+def add_server_timing(response):
+    """Expose the request's stage timings (Server-Timing) and record latency and errors."""
+    finished = metrics.end_request()
+    if finished is not None:
+        timings, total = finished
+        endpoint = request.endpoint or 'unknown'
+        response.headers['Server-Timing'] = metrics.server_timing(timings, total)
+        metrics.observe('request_seconds', total, endpoint=endpoint)
+        if response.status_code >= 400:
+            metrics.inc('errors_total', endpoint=endpoint, status=str(response.status_code))
+    return response
 
 
 def allowed_file(filename: str) -> bool:
@@ -32,79 +150,256 @@ def allowed_file(filename: str) -> bool:
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
-@app.route('/health', methods=['GET'])
+@api.route('/health', methods=['GET'])
 def health():
     """Health check endpoint."""
     return jsonify({'status': 'ok', 'version': '1.0.0'})
 
 
-@app.route('/api/upload', methods=['POST'])
-def upload_file():
+def get_upload_file():
     """
-    Upload and process a calendar file.
+    Validate the file of a multipart upload request.
     
-    Expected: multipart/form-data with 'file' field
-    Returns: JSON with extracted calendar text
+    Returns:
+        Tuple (file, None) on success or (None, (response, status)) on error
     """
-    try:
-        # Check if file is in request
-        if 'file' not in request.files:
-            return jsonify({'error': 'No file provided'}), 400
+    # Check if file is in request
+    if 'file' not in request.files:
+        return None, (jsonify({'error': 'No file provided'}), 400)
+    
+    file = request.files['file']
+    
+    if file.filename == '':
+        return None, (jsonify({'error': 'No file selected'}), 400)
+    
+    if not allowed_file(file.filename):
+        return None, (jsonify({
+            'error': f'Invalid file type. Allowed: {", ".join(ALLOWED_EXTENSIONS)}'
+        }), 400)
+    
+    # Check file size
+    file.seek(0, os.SEEK_END)
+    file_size = file.tell()
+    file.seek(0)
+    
+    if file_size > MAX_FILE_SIZE:
+        return None, (jsonify({
+            'error': f'File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024} MB'
+        }), 400)
+    
+    return file, None
+
+
+def extract_upload(stream, filename: str, progress=None, mode: str = 'text', cache_key: str = None) -> dict:
+    """
+    Extract text and structure from an uploaded file, using the cache.
+    
+    Args:
+        stream: Seekable binary stream with the file contents
+        filename: Sanitized file name
+        progress: Optional progress callback (pages/rows processed)
+        mode: 'text' returns the extracted text, 'grid' the tokenized week grid
+        cache_key: Content key if already computed
         
-        file = request.files['file']
+    Returns:
+        Upload response payload
+    """
+    started = time.perf_counter()
+    
+    # Repeat uploads of the same bytes are served from the cache
+    if cache_key is None:
+        with metrics.stage('hash'):
+            cache_key = content_key(stream, Path(filename).suffix)
+    with metrics.stage('cache_lookup'):
+        cached = extraction_cache.get(cache_key)
+    
+    if cached is not None:
+        extracted_text, structure, lines = cached['text'], cached['structure'], cached['lines']
+    else:
+        # Process straight from the stream. Werkzeug keeps small bodies in
+        # memory and spools large ones to a unique per-request temporary file,
+        # so concurrent uploads never share a path.
+        # Admission is weighted by format and size; cache hits skip it
+        size = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+        processor = CalendarFileProcessor()
+        with admission_budget.admit(admission_budget.cost(Path(filename).suffix, size)):
+            extracted_text = processor.process_stream(stream, filename, pdf_jobs=PDF_WORKERS, progress=progress)
         
-        if file.filename == '':
-            return jsonify({'error': 'No file selected'}), 400
+        # Detect structure
+        with metrics.stage('detect'):
+            structure = processor.detect_calendar_structure(extracted_text)
+            lines = extracted_text.count('\n') + 1
         
-        if not allowed_file(file.filename):
-            return jsonify({
-                'error': f'Invalid file type. Allowed: {", ".join(ALLOWED_EXTENSIONS)}'
-            }), 400
+        with metrics.stage('cache_store'):
+            extraction_cache.put(cache_key, {
+                'text': extracted_text,
+                'structure': structure,
+                'lines': lines
+            })
+    
+    result = {
+        'success': True,
+        'filename': filename,
+        'structure': structure,
+        'lines': lines,
+        'cached': cached is not None
+    }
+    if mode == 'grid':
+        with metrics.stage('grid'):
+            result['grid'] = build_week_grid(extracted_text.split('\n'))
+    else:
+        result['text'] = extracted_text
+    result['processingMs'] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+
+def compact_json_response(payload: dict, etag: str = None):
+    """
+    Serialize a JSON payload without whitespace, compressed when the client accepts it.
+    
+    Args:
+        payload: JSON-serializable response
+        etag: Weak ETag identifying the payload (enables If-None-Match)
         
-        # Check file size
-        file.seek(0, os.SEEK_END)
-        file_size = file.tell()
-        file.seek(0)
+    Returns:
+        Response with Content-Encoding gzip/deflate when negotiated
+    """
+    with metrics.stage('serialize'):
+        body = current_app.json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    
+    response = current_app.response_class(body, status=200, mimetype='application/json')
+    response.headers['Vary'] = 'Accept-Encoding'
+    if etag:
+        response.set_etag(etag, weak=True)
+    
+    if len(body) >= COMPRESS_MIN_SIZE:
+        encodings = request.accept_encodings
+        with metrics.stage('compress'):
+            if encodings['gzip']:
+                compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # 31 = gzip container
+                response.set_data(compressor.compress(body) + compressor.flush())
+                response.headers['Content-Encoding'] = 'gzip'
+            elif encodings['deflate']:
+                response.set_data(zlib.compress(body, 6))
+                response.headers['Content-Encoding'] = 'deflate'
+    return response
+
+
+@api.route('/api/upload', methods=['POST'])
+def upload_file():
+    """
+    Upload and process a calendar file.
+    
+    Expected: multipart/form-data with 'file' field, optional 'response'
+    field or query parameter: 'text' (default) or 'grid'
+    Returns: JSON with extracted calendar text, or with 'grid' (day numbers
+    and per-position worker ids plus a 'names' dictionary). Responses carry
+    an ETag of the file contents (If-None-Match gives 304) and are gzip or
+    deflate compressed when the client accepts it.
+    """
+    try:
+        file, error = get_upload_file()
+        if error:
+            return error
         
-        if file_size > MAX_FILE_SIZE:
-            return jsonify({
-                'error': f'File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024} MB'
-            }), 400
+        mode = request.values.get('response', 'text')
+        if mode not in UPLOAD_RESPONSE_MODES:
+            return jsonify({'error': f'Invalid response mode. Allowed: {", ".join(UPLOAD_RESPONSE_MODES)}'}), 400
         
-        # Save temporary file
         filename = secure_filename(file.filename)
-        temp_path = os.path.join(TEMP_DIR, filename)
-        file.save(temp_path)
+        with metrics.stage('hash'):
+            cache_key = content_key(file.stream, Path(filename).suffix)
+        etag = f'{cache_key[:32]}-{mode}'
+        if request.if_none_match.contains_weak(etag):
+            response = current_app.response_class(status=304)
+            response.set_etag(etag, weak=True)
+            return response
         
-        try:
-            # Process file
-            processor = CalendarFileProcessor()
-            extracted_text = processor.process_file(temp_path)
-            
-            # Detect structure
-            structure = processor.detect_calendar_structure(extracted_text)
-            
-            return jsonify({
-                'success': True,
-                'filename': filename,
-                'text': extracted_text,
-                'structure': structure,
-                'lines': len(extracted_text.split('\n'))
-            }), 200
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(temp_path):
-                os.remove(temp_path)
+        result = extract_upload(file.stream, filename, mode=mode, cache_key=cache_key)
+        return compact_json_response(result, etag)
     
+    except AdmissionRejected as e:
+        return jsonify({'error': str(e)}), e.status, {'Retry-After': str(e.retry_after)}
     except Exception as e:
-        return jsonify({
-            'error': f'Processing error: {str(e)}',
-            'traceback': traceback.format_exc()
-        }), 500
+        return error_response(f'Processing error: {str(e)}')
+
+
+@api.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    """Stage latencies, throughput and error counts in the Prometheus text format (this worker only)."""
+    if not metrics.enabled:
+        return jsonify({'error': 'Metrics are disabled (METRICS_ENABLED=0)'}), 404
+    return current_app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 
-@app.route('/api/analyze', methods=['POST'])
+@api.route('/api/budget', methods=['GET'])
+def budget_stats():
+    """Return extraction budget usage (bytes, active and queued extractions, rejections)."""
+    return jsonify({**admission_budget.stats(), 'maxRequestBytes': MAX_REQUEST_SIZE})
+
+
+@api.route('/api/cache/stats', methods=['GET'])
+def cache_stats():
+    """Return extraction cache hit/miss counters and usage."""
+    return jsonify(extraction_cache.stats())
+
+
+@api.route('/api/cache/purge', methods=['POST'])
+def purge_cache():
+    """Remove every cached extraction (memory and disk)."""
+    removed = extraction_cache.purge()
+    return jsonify({'success': True, 'removed': removed})
+
+
+def run_analysis(data: dict, progress=None) -> dict:
+    """
+    Analyze calendar text from an /api/analyze payload.
+    
+    Args:
+        data: Request payload
+        progress: Optional progress callback
+        
+    Returns:
+        Analysis response payload
+        
+    Raises:
+        ValueError: If the payload is invalid
+    """
+    if not data or 'calendarText' not in data:
+        raise ValueError('Missing calendarText')
+    
+    calendar_text = data.get('calendarText', '')
+    start_date = data.get('startDate', '2025-12-22')
+    name_mapping = data.get('nameMapping', '')
+    holidays = data.get('holidays', '')
+    sort_by = data.get('sortBy', 'total')
+    
+    if not calendar_text.strip():
+        raise ValueError('Calendar text is empty')
+    
+    processor = CalendarFileProcessor()
+    with metrics.stage('detect'):
+        structure = processor.detect_calendar_structure(calendar_text)
+    
+    with metrics.stage('analysis'):
+        result = analyze_text(calendar_text, start_date, name_mapping, holidays, sort_by)
+    if progress:
+        progress(days_processed=result['days'], workers=len(result['workers']))
+    
+    return {
+        'success': True,
+        'structure': structure,
+        'textLength': len(calendar_text),
+        'lines': len(calendar_text.split('\n')),
+        'days': result['days'],
+        'workers': result['workers'],
+        'monthlyData': result['monthlyData'],
+        'nameSuggestions': result['nameSuggestions']
+    }
+
+
+@api.route('/api/analyze', methods=['POST'])
 def analyze_calendar():
     """
     Analyze calendar text.
@@ -113,238 +408,599 @@ def analyze_calendar():
     {
         "calendarText": "...",
         "startDate": "2025-12-22",
-        "nameMapping": "..."
+        "nameMapping": "...",
+        "holidays": "2025-12-25, 01-01-2026",
+        "sortBy": "total"
     }
+    Returns: JSON with structure plus 'workers' and 'monthlyData' in the
+    same shape used by the UI and /api/export, and 'nameSuggestions'
+    (mapping lines for names that look like typos)
+    """
+    try:
+        try:
+            result = run_analysis(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        with metrics.stage('serialize'):
+            return jsonify(result), 200
+    
+    except Exception as e:
+        return error_response(f'Analysis error: {str(e)}')
+
+
+@api.route('/api/validate', methods=['POST'])
+def validate_calendar():
+    """
+    Check calendar text against scheduling rules.
+    
+    Expected JSON:
+    {
+        "calendarText": "...",
+        "startDate": "2025-12-22",
+        "nameMapping": "...",
+        "holidays": "2025-12-25",
+        "rules": {
+            "minRestDays": 1,
+            "maxShiftsPerWeek": 2,
+            "maxShiftsPerMonth": 6,
+            "maxWeekendShiftsPerMonth": 3,
+            "checkDuplicates": true
+        }
+    }
+    Returns: JSON with 'warnings' (rule, worker, dayIndex, date, message),
+    'counts' per rule and 'days'
     """
     try:
         data = request.json
+        try:
+            if not data or not (data.get('calendarText') or '').strip():
+                raise ValueError('Missing calendarText')
+            result = validate_text(
+                data['calendarText'],
+                data.get('startDate', '2025-12-22'),
+                data.get('nameMapping', ''),
+                data.get('holidays', ''),
+                ValidationRules.from_dict(data.get('rules'))
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if not data or 'calendarText' not in data:
-            return jsonify({'error': 'Missing calendarText'}), 400
+        return jsonify({'success': True, **result}), 200
+    
+    except Exception as e:
+        return error_response(f'Validation error: {str(e)}')
+
+
+class ExportFile:
+    """A rendered export returned as a file download."""
+    
+    def __init__(self, body, mimetype: str, filename: str, headers: dict = None):
+        """
+        Args:
+            body: File contents as bytes, a finished BytesIO buffer or an iterator of chunks
+            mimetype: Response content type
+            filename: Download file name
+            headers: Extra response headers (e.g. Content-Encoding)
+        """
+        self.body = body
+        self.mimetype = mimetype
+        self.filename = filename
+        self.headers = headers or {}
+    
+    def materialize(self) -> 'ExportFile':
+        """Consume a chunk iterator into a buffer so the export can be served more than once."""
+        if not isinstance(self.body, (bytes, BytesIO)):
+            buffer = BytesIO()
+            for chunk in self.body:
+                buffer.write(chunk)
+            self.body = buffer
+        return self
+    
+    def _iter_buffer(self):
+        view = self.body.getbuffer()
+        try:
+            for start in range(0, len(view), STREAM_CHUNK_SIZE):
+                yield bytes(view[start:start + STREAM_CHUNK_SIZE])
+        finally:
+            view.release()
+    
+    def to_response(self):
+        """Build the download response (buffers and iterators are streamed in chunks, not copied whole)."""
+        headers = {'Content-Disposition': f'attachment; filename={self.filename}', **self.headers}
         
-        calendar_text = data.get('calendarText', '')
-        start_date = data.get('startDate', '2025-12-22')
-        name_mapping = data.get('nameMapping', '')
+        if isinstance(self.body, BytesIO):
+            headers['Content-Length'] = str(self.body.getbuffer().nbytes)
+            return current_app.response_class(
+                response=self._iter_buffer(),
+                status=200,
+                mimetype=self.mimetype,
+                headers=headers,
+                direct_passthrough=True
+            )
         
-        if not calendar_text.strip():
-            return jsonify({'error': 'Calendar text is empty'}), 400
+        return current_app.response_class(
+            response=self.body,
+            status=200,
+            mimetype=self.mimetype,
+            headers=headers,
+            direct_passthrough=not isinstance(self.body, bytes)
+        )
+
+
+def render_export(data: dict, progress=None):
+    """
+    Render an /api/export payload.
+    
+    Args:
+        data: Request payload
+        progress: Optional progress callback (rows rendered)
         
-        # Parse calendar (this would be done by the React component)
-        # Here we just validate the structure
-        processor = CalendarFileProcessor()
-        structure = processor.detect_calendar_structure(calendar_text)
+    Returns:
+        JSON-serializable dict, or an ExportFile for binary formats
         
-        return jsonify({
+    Raises:
+        ValueError: If the payload or format is invalid
+    """
+    if not data or 'workers' not in data:
+        raise ValueError('Missing workers data')
+    
+    workers = data.get('workers', [])
+    monthly_data = data.get('monthlyData', [])
+    export_format = data.get('format', 'csv').lower()
+    period = data.get('analysisPeriod', 'Análisis de Guardias')
+    
+    metrics.inc('export_rows_total', len(workers) + len(monthly_data), format=export_format)
+    
+    if export_format == 'csv':
+        # Stream CSV rows (global columns plus the monthly breakdown)
+        compress = bool(data.get('gzip', False))
+        return ExportFile(
+            iter_csv_chunks(iter_csv_rows(workers, monthly_data), compress=compress),
+            'text/csv',
+            f'analisis_guardias_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
+            headers={'Content-Encoding': 'gzip'} if compress else None
+        )
+    
+    elif export_format == 'xlsx':
+        # Write-only workbook (global and monthly sheets) streamed while it is zipped
+        return ExportFile(
+            iter_xlsx_chunks(workers, monthly_data),
+            XLSX_MIMETYPE,
+            f'analisis_guardias_{datetime.now().strftime("%Y%m%d_%H%M%S")}.xlsx'
+        )
+    
+    elif export_format == 'json':
+        return {
             'success': True,
-            'structure': structure,
-            'textLength': len(calendar_text),
-            'lines': len(calendar_text.split('\n'))
-        }), 200
+            'format': 'json',
+            'workers': workers,
+            'monthlyData': monthly_data
+        }
     
-    except Exception as e:
-        return jsonify({
-            'error': f'Analysis error: {str(e)}',
-            'traceback': traceback.format_exc()
-        }), 500
+    elif export_format == 'pdf':
+        # Generate PDF with global and monthly data - A4 Portrait
+        pdf_buffer = BytesIO()
+        with metrics.stage('render_pdf'):
+            # ReportLab is only loaded by the first PDF export
+            from pdf_report import render_pdf_report
+            render_pdf_report(pdf_buffer, workers, monthly_data, period, progress)
+        return ExportFile(
+            pdf_buffer,
+            'application/pdf',
+            f'analisis_guardias_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
+        )
+    
+    else:
+        raise ValueError(f'Unsupported format: {export_format}')
 
 
-@app.route('/api/export', methods=['POST'])
+@api.route('/api/export', methods=['POST'])
 def export_data():
     """
-    Export shift analysis data to CSV, JSON or PDF.
+    Export shift analysis data to CSV, XLSX, JSON or PDF.
     
     Expected JSON:
     {
         "workers": [...],
         "monthlyData": [...],
-        "format": "csv", "json" or "pdf",
-        "analysisPeriod": "Dec 2024 - Mar 2025"
+        "format": "csv", "xlsx", "json" or "pdf",
+        "analysisPeriod": "Dec 2024 - Mar 2025",
+        "gzip": false
     }
+    Returns: a text/csv stream (gzip Content-Encoding if requested), an
+    XLSX stream (global and monthly sheets), a JSON document or a PDF download
     """
     try:
-        data = request.json
+        try:
+            result = render_export(request.json)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        if not data or 'workers' not in data:
-            return jsonify({'error': 'Missing workers data'}), 400
+        if isinstance(result, ExportFile):
+            return result.to_response()
+        with metrics.stage('serialize'):
+            return jsonify(result), 200
+    
+    except Exception as e:
+        return error_response(f'Export error: {str(e)}')
+
+
+def _upload_job(spool, filename: str, mode: str, progress=None) -> dict:
+    """Background extraction of a spooled upload."""
+    try:
+        return extract_upload(spool, filename, progress, mode)
+    finally:
+        spool.close()
+
+
+def _export_job(data: dict, progress=None):
+    """Background export; streamed bodies are buffered so the result can be fetched later."""
+    result = render_export(data, progress)
+    if isinstance(result, ExportFile):
+        result.materialize()
+    return result
+
+
+def _submit_job(kind: str, func, *args):
+    """Queue a job and return the 202 response (503 with Retry-After if the queue is full)."""
+    try:
+        job = job_manager.submit(kind, func, *args)
+    except JobQueueFull as e:
+        return jsonify({'error': str(e)}), 503, {'Retry-After': str(e.retry_after)}
+    return jsonify(job.to_dict()), 202
+
+
+@api.route('/api/jobs/upload', methods=['POST'])
+def submit_upload_job():
+    """
+    Queue the processing of a calendar file.
+    
+    Expected: multipart/form-data with 'file' field (and optional 'response' mode)
+    Returns: 202 with the job id; the result has the /api/upload shape
+    """
+    file, error = get_upload_file()
+    if error:
+        return error
+    
+    mode = request.values.get('response', 'text')
+    if mode not in UPLOAD_RESPONSE_MODES:
+        return jsonify({'error': f'Invalid response mode. Allowed: {", ".join(UPLOAD_RESPONSE_MODES)}'}), 400
+    
+    # The request stream is closed when the request ends, so the job gets its own copy
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY)
+    shutil.copyfileobj(file.stream, spool)
+    spool.seek(0)
+    
+    return _submit_job('upload', _upload_job, spool, secure_filename(file.filename), mode)
+
+
+@api.route('/api/jobs/analyze', methods=['POST'])
+def submit_analyze_job():
+    """Queue an analysis (same payload and result as /api/analyze)."""
+    return _submit_job('analyze', run_analysis, request.json)
+
+
+@api.route('/api/jobs/export', methods=['POST'])
+def submit_export_job():
+    """Queue an export (same payload and result as /api/export)."""
+    return _submit_job('export', _export_job, request.json)
+
+
+@api.route('/api/jobs', methods=['GET'])
+def job_stats():
+    """Return the number of jobs per status."""
+    return jsonify(job_manager.stats())
+
+
+@api.route('/api/jobs/<job_id>', methods=['GET'])
+def job_status(job_id: str):
+    """Return the status and progress of a job."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    return jsonify(job.to_dict())
+
+
+@api.route('/api/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id: str):
+    """Return the result of a finished job (400 if it failed on bad input, like the synchronous endpoints)."""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found or expired'}), 404
+    
+    if job.status == 'error' and job.client_error:
+        return jsonify({'error': job.error, 'status': job.status}), 400
+    if job.status == 'error':
+        return error_response(job.error, trace=job.traceback, status=job.status)
+    if job.status != 'done':
+        return jsonify({'error': 'Job not finished', 'status': job.status}), 409
+    
+    if isinstance(job.result, ExportFile):
+        return job.result.to_response()
+    return jsonify(job.result), 200
+
+
+def session_response(session_id: str, session: AnalysisSession, sort_by: str, **extra) -> dict:
+    """Build the analysis payload returned by the session endpoints."""
+    result = session.analysis(sort_by)
+    return {
+        'success': True,
+        'sessionId': session_id,
+        'days': result['days'],
+        'workers': result['workers'],
+        'monthlyData': result['monthlyData'],
+        'nameSuggestions': result['nameSuggestions'],
+        **extra
+    }
+
+
+@api.route('/api/sessions', methods=['POST'])
+def create_session():
+    """
+    Parse a calendar once and keep it server-side for incremental re-analysis.
+    
+    Expected JSON: same fields as /api/analyze
+    Returns: /api/analyze-style result plus 'sessionId'
+    """
+    try:
+        data = request.json
+        if not data or not (data.get('calendarText') or '').strip():
+            return jsonify({'error': 'Missing calendarText'}), 400
         
-        workers = data.get('workers', [])
-        monthly_data = data.get('monthlyData', [])
-        export_format = data.get('format', 'csv').lower()
-        period = data.get('analysisPeriod', 'Análisis de Guardias')
+        started = time.perf_counter()
+        try:
+            session = AnalysisSession(
+                data['calendarText'],
+                data.get('startDate', '2025-12-22'),
+                data.get('nameMapping', ''),
+                data.get('holidays', '')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
-        print(f"[DEBUG] Export: format={export_format}, workers={len(workers)}, monthly_data={len(monthly_data)}")
+        session_id = session_store.create(session)
+        elapsed = round((time.perf_counter() - started) * 1000, 2)
+        return jsonify(session_response(session_id, session, data.get('sortBy', 'total'),
+                                        changedDays=len(session.ordinals), elapsedMs=elapsed)), 201
+    
+    except Exception as e:
+        return error_response(f'Analysis error: {str(e)}')
+
+
+@api.route('/api/sessions/<session_id>', methods=['PATCH'])
+def update_session(session_id: str):
+    """
+    Apply edits to an analysis session and return the updated analysis.
+    
+    Expected JSON (every field optional):
+    {
+        "appendText": "...",                  # new week blocks
+        "nameMapping": "...",                 # full replacement
+        "mapping": {"alias": "NAME", "old": null},  # add/change/remove entries
+        "addHolidays": "2026-01-06",
+        "removeHolidays": "2025-12-25",
+        "startDate": "2025-12-22",
+        "sortBy": "total"
+    }
+    Only the days affected by each edit are recounted ('changedDays').
+    The edits are applied together: if one is invalid (400), none is kept.
+    """
+    try:
+        session = session_store.get(session_id)
+        if session is None:
+            return jsonify({'error': 'Session not found or expired'}), 404
+        data = request.json or {}
         
-        if export_format == 'csv':
-            # Generate CSV
-            csv_content = 'Médico,Total,Viernes,Sábado,Domingo,% Fin de Semana,Rosell\n'
-            for worker in workers:
-                csv_content += f'"{worker["name"]}",{worker["total"]},{worker["friday"]},{worker["saturday"]},{worker["sunday"]},{worker["weekendPercentage"]},{worker["lastPosition"]}\n'
+        started = time.perf_counter()
+        changed = 0
+        with session.lock:
+            # All or nothing: a failing edit undoes the ones applied before it
+            snapshot = session.snapshot()
+            try:
+                if data.get('startDate'):
+                    changed += session.set_start_date(data['startDate'])
+                if 'nameMapping' in data:
+                    changed += session.set_name_mapping(data.get('nameMapping') or '')
+                if data.get('mapping'):
+                    if not isinstance(data['mapping'], dict):
+                        raise ValueError('mapping must be an object')
+                    changed += session.update_mapping(data['mapping'])
+                if data.get('addHolidays') or data.get('removeHolidays'):
+                    changed += session.update_holidays(
+                        add=parse_holidays(data.get('addHolidays') or ''),
+                        remove=parse_holidays(data.get('removeHolidays') or '')
+                    )
+                if data.get('appendText'):
+                    changed += session.append_text(data['appendText'])
+            except ValueError as e:
+                session.restore(snapshot)
+                return jsonify({'error': str(e)}), 400
+            except Exception:
+                session.restore(snapshot)
+                raise
             
-            return jsonify({
-                'success': True,
-                'format': 'csv',
-                'content': csv_content
-            }), 200
+            elapsed = round((time.perf_counter() - started) * 1000, 2)
+            return jsonify(session_response(session_id, session, data.get('sortBy', 'total'),
+                                            changedDays=changed, elapsedMs=elapsed)), 200
+    
+    except Exception as e:
+        return error_response(f'Analysis error: {str(e)}')
+
+
+@api.route('/api/sessions/<session_id>/simulate', methods=['POST'])
+def simulate_session(session_id: str):
+    """
+    Try swaps and reassignments on a session without editing it.
+    
+    Expected JSON (every field optional):
+    {
+        "reset": false,                       # drop earlier simulated changes
+        "undo": 1,                            # revert the last N simulated changes
+        "changes": [
+            {"swap": [{"date": "2025-01-04", "position": 0}, {"date": "2025-01-07", "position": 3}]},
+            {"date": "2025-01-10", "position": 3, "worker": "NAME"}   # null empties the slot
+        ],
+        "rank": {"objective": "weekend", "limit": 10, "pairs": 5, "reassign": false,
+                 "maxCandidates": 2000},
+        "sortBy": "total"
+    }
+    The objective is a category or {category: weight}; swaps never change
+    totals, so rank "total" with "reassign": true. Simulated changes
+    accumulate across calls until "reset" or until the session is edited
+    (PATCH). If a change is invalid, the changes of the request are reverted.
+    Returns: 'steps' (each change and the fairness metrics after it),
+    'fairness', 'workers', 'pending' and, when ranking, 'ranking' (current
+    objective, candidates evaluated and the best moves)
+    """
+    try:
+        session = session_store.get(session_id)
+        if session is None:
+            return jsonify({'error': 'Session not found or expired'}), 404
+        data = request.json or {}
         
-        elif export_format == 'json':
-            return jsonify({
-                'success': True,
-                'format': 'json',
-                'workers': workers,
-                'monthlyData': monthly_data
-            }), 200
+        started = time.perf_counter()
+        with session.lock:
+            simulator = session.simulator(reset=bool(data.get('reset')))
+            steps = []
+            try:
+                undo = data.get('undo') or 0
+                if not isinstance(undo, int) or undo < 0:
+                    raise ValueError('undo must be a non-negative integer')
+                for _ in range(undo):
+                    simulator.undo()
         
-        elif export_format == 'pdf':
-            # Generate PDF with global and monthly data - A4 Portrait
-            pdf_buffer = BytesIO()
-            doc = SimpleDocTemplate(pdf_buffer, pagesize=A4, topMargin=0.5*inch, bottomMargin=0.5*inch, 
-                                   leftMargin=0.5*inch, rightMargin=0.5*inch)
-            # A4 Portrait is default (210 x 297 mm)
-            story = []
-            styles = getSampleStyleSheet()
-            
-            # Title
-            title_style = ParagraphStyle(
-                'CustomTitle',
-                parent=styles['Heading1'],
-                fontSize=14,
-                textColor=colors.HexColor('#1f2937'),
-                spaceAfter=6,
-                alignment=1  # Center
-            )
-            story.append(Paragraph(f"Análisis de Guardias - {period}", title_style))
-            story.append(Paragraph(f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['Normal']))
-            story.append(Spacer(1, 0.2*inch))
-            
-            # GLOBAL DATA SECTION
-            story.append(Paragraph("1. Resumen Global", styles['Heading2']))
-            story.append(Spacer(1, 0.1*inch))
-            
-            global_table_data = [
-                ['Médico', 'Total', 'Viernes', 'Sábado', 'Domingo', '% Fin de Semana', 'Rosell']
-            ]
-            for worker in workers:
-                global_table_data.append([
-                    worker['name'],
-                    str(worker.get('total', 0)),
-                    str(worker.get('friday', 0)),
-                    str(worker.get('saturday', 0)),
-                    str(worker.get('sunday', 0)),
-                    f"{worker.get('weekendPercentage', 0)}%",
-                    str(worker.get('lastPosition', 0))
-                ])
-            
-            global_table = Table(global_table_data, colWidths=[1.3*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.9*inch, 0.6*inch])
-            global_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
-            ]))
-            story.append(global_table)
-            story.append(Spacer(1, 0.2*inch))
-            
-            # MONTHLY DATA SECTION (if available)
-            if monthly_data and len(monthly_data) > 0:
-                story.append(PageBreak())
-                story.append(Paragraph("2. Desglose Mensual", styles['Heading2']))
-                story.append(Spacer(1, 0.1*inch))
-                
-                # Get only months with data (non-zero totals)
-                all_months = set()
-                month_totals = {}
-                
-                for worker_data in monthly_data:
-                    for key in worker_data.keys():
-                        if key != 'name':
-                            value = worker_data.get(key, 0)
-                            if value > 0:
-                                all_months.add(key)
-                                if key not in month_totals:
-                                    month_totals[key] = 0
-                                month_totals[key] += value
-                
-                # Order months: Dic, Ene, Feb, Mar, Abr, May, Jun, Jul, Ago, Sep, Oct, Nov
-                month_order = ['Dic', 'Ene', 'Feb', 'Mar', 'Abr', 'May', 'Jun', 'Jul', 'Ago', 'Sep', 'Oct', 'Nov']
-                all_months = sorted(list(all_months), key=lambda x: month_order.index(x) if x in month_order else 999)
-                
-                if all_months:  # Only show table if there are months with data
-                    monthly_table_data = [['Médico'] + all_months + ['Total']]
-                    
-                    for worker_data in monthly_data:
-                        row = [worker_data['name']]
-                        monthly_total = 0
-                        for month in all_months:
-                            value = worker_data.get(month, 0)
-                            row.append(str(value))
-                            monthly_total += value
-                        row.append(str(monthly_total))
-                        monthly_table_data.append(row)
-                    
-                    # Adjust column widths for portrait
-                    col_width = 3.5 / (len(all_months) + 2)  # A4 portrait is ~6.5 inches, minus margins
-                    col_widths = [1.2*inch] + [col_width*inch] * len(all_months) + [0.6*inch]
-                    
-                    monthly_table = Table(monthly_table_data, colWidths=col_widths)
-                    monthly_table.setStyle(TableStyle([
-                        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
-                        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0, 0), (-1, 0), 8),
-                        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-                        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                        ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                        ('FONTSIZE', (0, 1), (-1, -1), 7),
-                        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
-                    ]))
-                    story.append(monthly_table)
-            
-            # Build PDF
-            doc.build(story)
-            pdf_buffer.seek(0)
-            
-            # Return PDF as response with proper headers
-            pdf_data = pdf_buffer.getvalue()
-            
-            response = app.response_class(
-                response=pdf_data,
-                status=200,
-                mimetype='application/pdf',
-                headers={
-                    'Content-Disposition': f'attachment; filename=analisis_guardias_{datetime.now().strftime("%Y%m%d_%H%M%S")}.pdf'
-                }
-            )
-            return response
+                changes = data.get('changes') or []
+                if not isinstance(changes, list):
+                    raise ValueError('changes must be a list')
+                for change in changes:
+                    steps.append({'change': simulator.apply(change), 'fairness': simulator.fairness()})
+        
+                rank = data.get('rank')
+                candidates = None
+                if rank is not None:
+                    if not isinstance(rank, dict):
+                        raise ValueError('rank must be an object')
+                    candidates = simulator.rank_swaps(
+                        rank.get('objective', 'weekend'), limit=rank.get('limit', 10),
+                        pairs=rank.get('pairs', 5), reassign=bool(rank.get('reassign')),
+                        max_candidates=rank.get('maxCandidates', MAX_CANDIDATES)
+                    )
+            except ValueError as e:
+                for _ in steps:
+                    simulator.undo()
+                return jsonify({'error': str(e)}), 400
         
-        else:
-            return jsonify({'error': f'Unsupported format: {export_format}'}), 400
+            response = {
+                'success': True,
+                'sessionId': session_id,
+                'steps': steps,
+                'fairness': simulator.fairness(),
+                'workers': simulator.workers(data.get('sortBy', 'total')),
+                'pending': len(simulator.history),
+                'elapsedMs': round((time.perf_counter() - started) * 1000, 2)
+            }
+            if candidates is not None:
+                response['ranking'] = candidates
+            return jsonify(response), 200
     
     except Exception as e:
-        return jsonify({
-            'error': f'Export error: {str(e)}',
-            'traceback': traceback.format_exc()
-        }), 500
+        return error_response(f'Simulation error: {str(e)}')
 
 
-@app.errorhandler(404)
+@api.route('/api/sessions/<session_id>', methods=['GET'])
+def get_session(session_id: str):
+    """Return the current analysis of a session."""
+    session = session_store.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Session not found or expired'}), 404
+    with session.lock:
+        return jsonify(session_response(session_id, session, request.args.get('sortBy', 'total'))), 200
+
+
+@api.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id: str):
+    """Discard a session."""
+    if not session_store.delete(session_id):
+        return jsonify({'error': 'Session not found or expired'}), 404
+    return jsonify({'success': True}), 200
+
+
+@api.app_errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
     return jsonify({'error': 'Endpoint not found'}), 404
 
 
-@app.errorhandler(500)
+@api.app_errorhandler(413)
+def request_too_large(error):
+    """Handle bodies over MAX_CONTENT_LENGTH."""
+    return jsonify({'error': f'File too large. Maximum size: {MAX_FILE_SIZE / 1024 / 1024} MB'}), 413
+
+
+@api.app_errorhandler(500)
 def internal_error(error):
     """Handle 500 errors."""
     return jsonify({'error': 'Internal server error'}), 500
 
 
+# Small calendar used to exercise every backend once (one week block)
+WARM_UP_CALENDAR = '1 2 3 4 5 6 7\n' + '\n'.join(
+    ' '.join(f'W{row}{day}' for day in range(7)) for row in range(4))
+
+
+def warm_up() -> Dict[str, float]:
+    """
+    Load and exercise every format backend and the PDF report once.
+    
+    The production entry point calls this before the server forks its
+    workers, so imported modules, font metrics and style sheets are built
+    once and shared copy-on-write instead of on each worker's first request.
+    Day-type indexes are preloaded for rosters within or across the current
+    year, without holidays and for each PRELOAD_HOLIDAYS set.
+    
+    Returns:
+        Seconds per step
+    """
+    from openpyxl import Workbook
+    
+    timings = {}
+    
+    def step(name: str, func):
+        started = time.perf_counter()
+        result = func()
+        timings[name] = round(time.perf_counter() - started, 4)
+        return result
+    
+    year = datetime.now().year
+    holiday_sets = [[]] + [parse_holidays(holidays) for holidays in PRELOAD_HOLIDAYS]
+    step('day_types', lambda: [preload_day_types(first, last, holiday_sets)
+                               for first, last in ((year - 1, year), (year, year), (year, year + 1))])
+    
+    analysis = step('analysis', lambda: run_analysis({'calendarText': WARM_UP_CALENDAR, 'startDate': '2025-12-01'}))
+    pdf = step('render_pdf', lambda: render_export({
+        'format': 'pdf', 'workers': analysis['workers'], 'monthlyData': analysis['monthlyData']
+    }).body.getvalue())
+    
+    rows = [line.split() for line in WARM_UP_CALENDAR.split('\n')]
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    for row in rows:
+        sheet.append(row)
+    xlsx = BytesIO()
+    workbook.save(xlsx)
+    
+    processor = CalendarFileProcessor()
+    step('extract_pdf', lambda: processor.process_stream(pdf, 'warm_up.pdf'))
+    step('extract_xlsx', lambda: processor.process_stream(xlsx.getvalue(), 'warm_up.xlsx'))
+    step('extract_csv', lambda: processor.process_stream(
+        '\n'.join(','.join(row) for row in rows).encode('utf-8'), 'warm_up.csv'))
+    return timings
+
+
+app = create_app()
+
+
 if __name__ == '__main__':
     # Windows compatibility: use 127.0.0.1 instead of 0.0.0.0
     # 0.0.0.0 sometimes has connection issues on Windows
@@ -363,4 +1019,8 @@ if __name__ == '__main__':
     print(f"Platform: {'Windows' if is_windows else 'Unix-like'}")
     print(f"{'='*70}\n")
     
+    # Development server: include tracebacks in 500 responses unless SHOW_TRACEBACKS is set
+    if 'SHOW_TRACEBACKS' not in os.environ:
+        app.config['SHOW_TRACEBACKS'] = True
+    
     app.run(debug=True, host=host, port=5000, use_reloader=False)
@@ -0,0 +1,364 @@
+"""
+Compact on-disk store of shift assignments for multi-year queries.
+
+Each assignment ("worker W covered position P on date D") is one row in a
+set of fixed-width column files (date ordinal, worker id, position, day-type
+code) that are appended to per roster and read back through ``np.memmap``.
+Worker names and roster metadata live in a small JSON file. Queries scan
+only the rosters overlapping the requested date range, in bounded chunks,
+so archives of any size are aggregated without loading them into RAM.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from day_types import FRIDAY, SATURDAY, SUNDAY, WEEKEND, day_type_codes
+from shift_analyzer import (
+    ROSELL_POSITION, CalendarParser, ParsedCalendar, ShiftAnalysis,
+    parse_holidays, parse_start_date
+)
+
+
+COLUMNS = {
+    'date': np.dtype('<i4'),      # date.toordinal()
+    'worker': np.dtype('<i4'),    # index into the worker name list
+    'position': np.dtype('<i1'),  # 0-based position in the day (3 = Rosell)
+    'day_type': np.dtype('u1')    # day_types bits
+}
+META_FILE = 'store.json'
+SCAN_CHUNK_ROWS = 1 << 20
+
+DateLike = Union[str, date, None]
+
+
+def _ordinal(value: DateLike, default: int) -> int:
+    return default if value is None else parse_start_date(value).toordinal()
+
+
+class AssignmentStore:
+    """Append-only columnar store of assignments kept in a directory."""
+
+    def __init__(self, directory: str):
+        """
+        Args:
+            directory: Store directory (created if missing)
+        """
+        self.directory = directory
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path, 'r', encoding='utf-8') as fh:
+                meta = json.load(fh)
+        else:
+            meta = {'rows': 0, 'workers': [], 'rosters': []}
+
+        self.rows: int = meta['rows']
+        self.worker_names: List[str] = meta['workers']
+        self.rosters: List[Dict[str, any]] = meta['rosters']
+        self._worker_ids = {name: index for index, name in enumerate(self.worker_names)}
+
+    def _column_path(self, name: str) -> str:
+        return os.path.join(self.directory, f'{name}.bin')
+
+    def _save_meta(self) -> None:
+        path = os.path.join(self.directory, META_FILE)
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as fh:
+            json.dump({'rows': self.rows, 'workers': self.worker_names, 'rosters': self.rosters},
+                      fh, ensure_ascii=False)
+        os.replace(temp_path, path)
+
+    def column(self, name: str) -> np.ndarray:
+        """Return a read-only memory map of a column (committed rows only)."""
+        if self.rows == 0:
+            return np.zeros(0, dtype=COLUMNS[name])
+        return np.memmap(self._column_path(name), dtype=COLUMNS[name], mode='r', shape=(self.rows,))
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def append(self, parsed: ParsedCalendar, holidays: Iterable[date] = (), source: str = '') -> Dict[str, any]:
+        """
+        Append the assignments of a parsed roster.
+
+        Column files are written first and the metadata (row count) last, so
+        an interrupted append leaves the store at its previous state.
+
+        Args:
+            parsed: Parsed calendar
+            holidays: Holiday dates used for the day-type codes
+            source: Label of the roster (e.g. file name)
+
+        Returns:
+            Roster metadata entry
+        """
+        day_index, position = np.nonzero(parsed.assignments >= 0)
+        local_worker = parsed.assignments[day_index, position]
+        codes = day_type_codes(parsed.ordinals, parsed.day_of_week, holidays)
+
+        with self._lock:
+            # Map the roster's worker ids to store ids
+            mapping = np.array([self._worker_ids.setdefault(name, len(self._worker_ids))
+                                for name in parsed.worker_names], dtype=np.int32)
+            self.worker_names[:] = list(self._worker_ids)
+
+            columns = {
+                'date': parsed.ordinals[day_index],
+                'worker': mapping[local_worker] if len(mapping) else local_worker,
+                'position': position,
+                'day_type': codes[day_index]
+            }
+            for name, values in columns.items():
+                with open(self._column_path(name), 'ab') as fh:
+                    fh.truncate(self.rows * COLUMNS[name].itemsize)  # drop rows of an interrupted append
+                    fh.write(np.ascontiguousarray(values, dtype=COLUMNS[name]).tobytes())
+
+            roster = {
+                'id': len(self.rosters),
+                'source': source,
+                'offset': self.rows,
+                'rows': len(day_index),
+                'firstDate': date.fromordinal(int(parsed.ordinals.min())).isoformat() if len(parsed) else None,
+                'lastDate': date.fromordinal(int(parsed.ordinals.max())).isoformat() if len(parsed) else None,
+                'added': time.time()
+            }
+            self.rosters.append(roster)
+            self.rows += len(day_index)
+            self._save_meta()
+        return roster
+
+    def add_text(self, calendar_text: str, start_date: Union[str, date], name_mapping: str = '',
+                 holidays: str = '', source: str = '') -> Dict[str, any]:
+        """Parse calendar text and append its assignments (see ``append``)."""
+        parsed = CalendarParser(start_date, name_mapping).parse(calendar_text)
+        return self.append(parsed, parse_holidays(holidays), source)
+
+    def add_file(self, file_path: str, start_date: Union[str, date], name_mapping: str = '',
+                 holidays: str = '') -> Dict[str, any]:
+        """Extract a roster file, parse it and append its assignments."""
+        from file_processor import CalendarFileProcessor
+
+        text = CalendarFileProcessor.process_file(file_path)
+        return self.add_text(text, start_date, name_mapping, holidays, os.path.basename(file_path))
+
+    @staticmethod
+    def bytes_per_row() -> int:
+        """Disk size of one assignment."""
+        return sum(dtype.itemsize for dtype in COLUMNS.values())
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def iter_chunks(self, start: DateLike = None, end: DateLike = None,
+                    chunk_rows: int = SCAN_CHUNK_ROWS) -> Iterator[Dict[str, np.ndarray]]:
+        """
+        Yield the rows dated within [start, end] in bounded chunks.
+
+        Rosters whose date span does not overlap the range are skipped
+        without being read.
+
+        Args:
+            start: First date (inclusive, None = unbounded)
+            end: Last date (inclusive, None = unbounded)
+            chunk_rows: Maximum rows read at a time
+
+        Yields:
+            Dictionaries of column arrays
+        """
+        low = _ordinal(start, 0)
+        high = _ordinal(end, date.max.toordinal())
+        columns = {name: self.column(name) for name in COLUMNS}
+
+        for roster in self.rosters[:]:
+            if not roster['rows'] or roster['offset'] + roster['rows'] > self.rows:
+                continue
+            if (parse_start_date(roster['lastDate']).toordinal() < low or
+                    parse_start_date(roster['firstDate']).toordinal() > high):
+                continue
+
+            stop = roster['offset'] + roster['rows']
+            for chunk_start in range(roster['offset'], stop, chunk_rows):
+                chunk_stop = min(chunk_start + chunk_rows, stop)
+                dates = np.asarray(columns['date'][chunk_start:chunk_stop])
+                mask = (dates >= low) & (dates <= high)
+                if mask.any():
+                    yield {name: np.asarray(values[chunk_start:chunk_stop])[mask]
+                           for name, values in columns.items()}
+
+    def worker_summary(self, start: DateLike = None, end: DateLike = None) -> ShiftAnalysis:
+        """
+        Per-worker totals, day-type counters and calendar-month counts over a date range.
+
+        Returns:
+            Shift analysis (use ``to_workers`` for the UI/export shape)
+        """
+        n_workers = len(self.worker_names)
+        counters = {key: np.zeros(n_workers, dtype=np.int64) for key in ShiftAnalysis.COUNTERS}
+        monthly = np.zeros(n_workers * 12, dtype=np.int64)
+
+        for chunk in self.iter_chunks(start, end):
+            worker = chunk['worker']
+            codes = chunk['day_type']
+
+            def count(mask: np.ndarray) -> np.ndarray:
+                return np.bincount(worker[mask], minlength=n_workers)
+
+            counters['total'] += np.bincount(worker, minlength=n_workers)
+            counters['friday'] += count((codes & FRIDAY) != 0)
+            counters['saturday'] += count((codes & SATURDAY) != 0)
+            counters['sunday'] += count((codes & SUNDAY) != 0)
+            counters['weekend'] += count((codes & WEEKEND) != 0)
+            counters['lastPosition'] += count(chunk['position'] == ROSELL_POSITION)
+            monthly += np.bincount(worker * 12 + self._month_index(chunk['date']) % 12,
+                                   minlength=n_workers * 12)
+
+        active = np.nonzero(counters['total'])[0]
+        return ShiftAnalysis(
+            [self.worker_names[w] for w in active.tolist()],
+            {key: values[active] for key, values in counters.items()},
+            monthly.reshape(n_workers, 12)[active]
+        )
+
+    def monthly_totals(self, start: DateLike = None, end: DateLike = None) -> Dict[str, Dict[str, int]]:
+        """
+        Shifts per worker and year-month over a date range.
+
+        Returns:
+            ``{worker: {'YYYY-MM': count}}``
+        """
+        counts: Dict[Tuple[int, int], int] = {}
+        for chunk in self.iter_chunks(start, end):
+            keys = chunk['worker'].astype(np.int64) * 100000 + self._month_index(chunk['date'])
+            unique, totals = np.unique(keys, return_counts=True)
+            for key, total in zip(unique.tolist(), totals.tolist()):
+                counts[key] = counts.get(key, 0) + total
+
+        result: Dict[str, Dict[str, int]] = {}
+        for key in sorted(counts):
+            worker, month_index = divmod(key, 100000)
+            label = f'{month_index // 12:04d}-{month_index % 12 + 1:02d}'
+            result.setdefault(self.worker_names[worker], {})[label] = counts[key]
+        return result
+
+    def day_type_totals(self, start: DateLike = None, end: DateLike = None) -> Dict[str, Dict[str, int]]:
+        """
+        Shifts per worker and day type over a date range.
+
+        Returns:
+            ``{worker: {'weekday'|'friday'|'saturday'|'sunday': count}}`` (a
+            Saturday holiday counts as both Saturday and Sunday)
+        """
+        return {
+            worker['name']: {
+                'weekday': worker['total'] - worker['weekend'],
+                'friday': worker['friday'],
+                'saturday': worker['saturday'],
+                'sunday': worker['sunday']
+            }
+            for worker in self.worker_summary(start, end).to_workers('name')
+        }
+
+    @staticmethod
+    def _month_index(ordinals: np.ndarray) -> np.ndarray:
+        """Months since year 0 (year * 12 + month - 1) of each date ordinal."""
+        days = (ordinals.astype(np.int64) - date(1970, 1, 1).toordinal()).astype('datetime64[D]')
+        return days.astype('datetime64[M]').astype(np.int64) + 1970 * 12
+
+    def stats(self) -> Dict[str, any]:
+        """Return the size of the store."""
+        return {
+            'rows': self.rows,
+            'workers': len(self.worker_names),
+            'rosters': len(self.rosters),
+            'bytes': self.rows * self.bytes_per_row()
+        }
+
+
+def _file_starts(files: List[str], start: Optional[str]) -> List[Tuple[str, date]]:
+    """
+    Pair each roster file of the ``add`` command with its start date.
+
+    Every file is given as ``FILE:YYYY-MM-DD``; a bare ``FILE`` takes
+    ``--start``, which is only accepted for a single file so that several
+    rosters never share the same dates.
+
+    Raises:
+        ValueError: If a file has no start date or --start is given for several files
+    """
+    if start is not None and len(files) > 1:
+        raise ValueError("--start applies to a single file; give each roster as FILE:YYYY-MM-DD")
+
+    pairs = []
+    for spec in files:
+        path, _, suffix = spec.rpartition(':')
+        if path and re.fullmatch(r'\d{4}-\d{2}-\d{2}', suffix):
+            pairs.append((path, parse_start_date(suffix)))
+        elif start is not None:
+            pairs.append((spec, parse_start_date(start)))
+        else:
+            raise ValueError(f"Missing start date for {spec} (use FILE:YYYY-MM-DD or --start)")
+    return pairs
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive rosters and query historical shift totals.")
+    parser.add_argument('store', help="Store directory")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    add = subparsers.add_parser('add', help="Extract and append roster files")
+    add.add_argument('files', nargs='+', metavar='FILE[:YYYY-MM-DD]',
+                     help="Roster files, each with its start date")
+    add.add_argument('--start', help="Start date of a single roster file (YYYY-MM-DD)")
+    add.add_argument('--mapping', metavar='FILE', help="Name mapping file (alias=NAME lines)")
+    add.add_argument('--holidays', default='', help="Comma-separated holidays")
+
+    summary = subparsers.add_parser('summary', help="Per-worker totals as JSON")
+    summary.add_argument('--from', dest='start', help="First date (YYYY-MM-DD)")
+    summary.add_argument('--to', dest='end', help="Last date (YYYY-MM-DD)")
+    summary.add_argument('--monthly', action='store_true', help="Per year-month counts instead")
+    args = parser.parse_args(argv)
+
+    store = AssignmentStore(args.store)
+
+    if args.command == 'add':
+        mapping = ''
+        if args.mapping:
+            with open(args.mapping, 'r', encoding='utf-8') as fh:
+                mapping = fh.read()
+        try:
+            files = _file_starts(args.files, args.start)
+        except ValueError as e:
+            parser.error(str(e))
+        for file_path, start in files:
+            try:
+                roster = store.add_file(file_path, start, mapping, args.holidays)
+                print(json.dumps(roster, ensure_ascii=False))
+            except Exception as e:
+                print(f"Error: {file_path}: {e}")
+                return 1
+        return 0
+
+    if args.monthly:
+        result = store.monthly_totals(args.start, args.end)
+    else:
+        result = store.worker_summary(args.start, args.end).to_workers()
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
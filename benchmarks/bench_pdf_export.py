@@ -0,0 +1,64 @@
+"""
+Benchmark PDF report generation (pdf_report.render_pdf_report).
+
+Usage: python benchmarks/bench_pdf_export.py [--workers 50 500 5000] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_report import render_pdf_report  # noqa: E402
+from shift_analyzer import MONTH_LABELS  # noqa: E402
+
+
+def make_report_data(n_workers: int, seed: int = 0):
+    """Build deterministic worker and monthly data for ``n_workers`` workers."""
+    rng = random.Random(seed)
+    workers = []
+    monthly_data = []
+    for index in range(n_workers):
+        friday, saturday, sunday = rng.randint(0, 10), rng.randint(0, 10), rng.randint(0, 10)
+        total = friday + saturday + sunday + rng.randint(5, 40)
+        workers.append({
+            'name': f'MEDICO {index:05d}',
+            'total': total,
+            'friday': friday,
+            'saturday': saturday,
+            'sunday': sunday,
+            'weekendPercentage': f'{(friday + saturday + sunday) / total * 100:.1f}',
+            'lastPosition': rng.randint(0, total // 4)
+        })
+        monthly_data.append(dict([('name', workers[-1]['name'])] +
+                                 [(month, rng.randint(0, 8)) for month in MONTH_LABELS]))
+    return workers, monthly_data
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[50, 500, 5000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'best s':>8} {'reports/s':>10} {'rows/s':>10} {'KiB':>8}")
+    for n_workers in args.workers:
+        workers, monthly_data = make_report_data(n_workers)
+        best = float('inf')
+        size = 0
+        for _ in range(args.repeat):
+            buffer = BytesIO()
+            started = time.perf_counter()
+            render_pdf_report(buffer, workers, monthly_data, 'Benchmark')
+            best = min(best, time.perf_counter() - started)
+            size = buffer.getbuffer().nbytes
+        rows = len(workers) + len(monthly_data)
+        print(f"{n_workers:>8} {best:>8.3f} {1 / best:>10.2f} {rows / best:>10.0f} {size / 1024:>8.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+"""
+Cold-start measurement: wall time of fresh interpreters for common entry points.
+
+Each scenario runs in a new Python process (best of several runs) and reports
+which heavy format backends it loaded. The run fails (exit code 1) when a
+scenario exceeds its target or loads a backend it does not need.
+
+Usage:
+    python benchmarks/cold_start.py [--repeat 5] [--scale 1.0] [--output results.json]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from roster_generator import generate_roster  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ['numpy', 'pandas', 'pdfplumber', 'reportlab', 'openpyxl']
+
+# Reports the heavy modules loaded by the scenario on the last line of stdout
+_REPORT = ("import json, sys; print(json.dumps(sorted(m for m in {modules} if m in sys.modules)))"
+           .format(modules=HEAVY_MODULES))
+
+# name: (code, target seconds, backends that must not be loaded)
+SCENARIOS = {
+    'import_file_processor': (
+        "import file_processor",
+        0.2, ['numpy', 'pandas', 'pdfplumber', 'reportlab']),
+    'import_app': (
+        "import app",
+        0.6, ['pandas', 'pdfplumber', 'reportlab']),
+    'cli_csv': (
+        "import sys, file_processor; sys.stdout = open(__import__('os').devnull, 'w');"
+        "file_processor.main([{csv!r}]); sys.stdout = sys.__stdout__",
+        0.8, ['pdfplumber', 'reportlab']),
+    'upload_csv': (
+        "import app; client = app.app.test_client();"
+        "response = client.post('/api/upload', data={{'file': (open({csv!r}, 'rb'), 'roster.csv')}});"
+        "assert response.status_code == 200, response.data",
+        1.2, ['pdfplumber', 'reportlab']),
+}
+
+
+def run_scenario(code: str, repeat: int) -> Dict[str, any]:
+    """Run ``code`` in fresh interpreters and return the best wall time and loaded backends."""
+    timings: List[float] = []
+    loaded: List[str] = []
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, '-c', f'{code}\n{_REPORT}'], cwd=ROOT, env=env,
+                                capture_output=True, text=True)
+        timings.append(time.perf_counter() - started)
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip())
+        loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return {'best': min(timings), 'loaded': loaded}
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--scale', type=float, default=1.0, help="Multiply the targets (slower machines)")
+    parser.add_argument('--output', metavar='FILE', help="Write results JSON to FILE")
+    args = parser.parse_args()
+
+    # Bare interpreter startup, for reference
+    results = {'python': run_scenario('pass', args.repeat)}
+    failures = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        csv_path = generate_roster(1).write(work_dir, ['csv'])['csv']
+        for name, (code, target, forbidden) in SCENARIOS.items():
+            result = run_scenario(code.format(csv=csv_path), args.repeat)
+            result['target'] = target * args.scale
+            results[name] = result
+            if result['best'] > result['target']:
+                failures.append(f"{name}: {result['best']:.3f}s > target {result['target']:.3f}s")
+            unexpected = sorted(set(result['loaded']) & set(forbidden))
+            if unexpected:
+                failures.append(f"{name}: loaded {', '.join(unexpected)}")
+
+    for name, result in results.items():
+        target = f"  target {result['target']:.3f}s" if 'target' in result else ''
+        print(f"{name:<24} best {result['best']:>7.3f}s{target}  loaded: {', '.join(result['loaded']) or '-'}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(results, fh, indent=2)
+
+    for message in failures:
+        print(f"FAIL {message}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
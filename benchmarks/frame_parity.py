@@ -0,0 +1,108 @@
+"""
+Parity and speed check of the columnar DataFrame-to-text conversion.
+
+Compares ``CalendarFileProcessor.frame_to_text`` with the row-wise reference
+``_frame_to_text_rowwise`` on frames of every dtype the extractors can
+produce (object, int, float, bool, NaN/None, datetime, nullable Int64,
+mixed) and times both on large object and float frames. The run fails
+(exit code 1) when an output differs or a speedup is below the minimum.
+
+Usage:
+    python benchmarks/frame_parity.py [--rows 100000] [--min-speedup 10]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_processor import CalendarFileProcessor  # noqa: E402
+
+
+def parity_frames() -> Dict[str, pd.DataFrame]:
+    """Small frames covering the dtypes and missing-value markers of real sheets."""
+    return {
+        'object': pd.DataFrame([[' LUNES ', 'MARTES', None], ['1', np.nan, ' 2 '], [None, None, None],
+                                ['  ', 'GARCIA', 'PEREZ LOPEZ']]),
+        'int': pd.DataFrame([[1, 2, 3], [-4, 0, 2 ** 62]]),
+        'float': pd.DataFrame([[1.0, 0.1, -0.0, 0.0], [np.nan, 1e16, 1e-5, np.inf],
+                               [np.nan, np.nan, np.nan, np.nan], [1 / 3, 9999999999999998.0, -2.5, np.nan]]),
+        'float32': pd.DataFrame(np.array([[0.1, 2.0], [np.nan, -7.25]], dtype=np.float32)),
+        'bool': pd.DataFrame([[True, False], [False, False]]),
+        'int_float': pd.DataFrame({0: [1, 2, 3], 1: [0.5, np.nan, 7.0]}),
+        'mixed': pd.DataFrame({0: ['LUNES', None, 'x'], 1: [1, 2, 3], 2: [1.5, np.nan, None], 3: [True, False, True]}),
+        'datetime': pd.DataFrame({0: pd.to_datetime(['2024-01-01', None, '2024-03-01']), 1: ['A', 'B', None]}),
+        'datetime_only': pd.DataFrame({0: pd.to_datetime(['2024-01-01', None]), 1: pd.to_datetime([None, None])}),
+        'Int64': pd.DataFrame({0: pd.array([1, None, 3], dtype='Int64'), 1: pd.array([None, None, 6], dtype='Int64')}),
+        'Int64_object': pd.DataFrame({0: pd.array([1, None], dtype='Int64'), 1: ['A', None]}),
+        'empty': pd.DataFrame(),
+        'no_rows': pd.DataFrame(columns=[0, 1]),
+        'sample_schedule': pd.read_excel(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                                      'sample_schedule.xlsx'), sheet_name=0, header=None),
+    }
+
+
+def large_frames(rows: int, seed: int = 0) -> Dict[str, pd.DataFrame]:
+    """Large frames shaped like exported rosters (8 columns, some empty cells and rows)."""
+    rng = np.random.default_rng(seed)
+    names = np.array(['GARCIA', ' LOPEZ ', 'MARTIN PEREZ', 'ROSELL', 'SANZ'], dtype=object)
+    text = pd.DataFrame(rng.choice(names, (rows, 8)))
+    text.iloc[::7, 3] = None
+    text.iloc[::11, :] = None
+    numbers = pd.DataFrame(rng.integers(1, 32, (rows, 8)).astype(float))
+    numbers.iloc[::7, 3] = np.nan
+    numbers.iloc[::11, :] = np.nan
+    numbers.iloc[::5, 0] = rng.random(len(numbers.iloc[::5, 0]))
+    return {'object': text, 'float': numbers}
+
+
+def best_time(func: Callable[[], any], repeat: int) -> float:
+    """Best wall time of ``repeat`` calls."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000, help='Rows of the timed frames')
+    parser.add_argument('--repeat', type=int, default=3, help='Timed runs of the columnar path (best is kept)')
+    parser.add_argument('--min-speedup', type=float, default=10.0,
+                        help='Fail when the columnar path is less than this many times faster')
+    args = parser.parse_args()
+
+    failures = []
+    for name, df in parity_frames().items():
+        same = CalendarFileProcessor.frame_to_text(df) == CalendarFileProcessor._frame_to_text_rowwise(df)
+        print(f"{'parity ' + name:<28} {'ok' if same else 'DIFFERENT'}")
+        if not same:
+            failures.append(f'parity {name}: output differs')
+
+    for name, df in large_frames(args.rows).items():
+        columnar = CalendarFileProcessor.frame_to_text(df)
+        if columnar != CalendarFileProcessor._frame_to_text_rowwise(df):
+            failures.append(f'{name} x{args.rows}: output differs')
+        rowwise_time = best_time(lambda: CalendarFileProcessor._frame_to_text_rowwise(df), 1)
+        columnar_time = best_time(lambda: CalendarFileProcessor.frame_to_text(df), args.repeat)
+        speedup = rowwise_time / columnar_time
+        print(f"{name + ' x' + str(args.rows):<28} row-wise {rowwise_time:6.2f}s  "
+              f"columnar {columnar_time:6.3f}s  x{speedup:.1f}")
+        if speedup < args.min_speedup:
+            failures.append(f'{name} x{args.rows}: x{speedup:.1f} < x{args.min_speedup:g}')
+
+    for failure in failures:
+        print(f'FAIL {failure}')
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+"""
+Load test of the production server: requests/second for uploads and exports as workers scale.
+
+For each worker count a gunicorn server (gunicorn.conf.py + wsgi.py) is
+started on a local port, every scenario is run for a fixed duration by
+concurrent clients, and throughput and latency percentiles are reported.
+The extraction cache is disabled (unless --cache) so uploads measure real
+extractions.
+
+Usage:
+    python benchmarks/load_test.py [--workers 1 2 4] [--threads 4] [--concurrency 8]
+        [--duration 10] [--years 1] [--scenarios upload_csv export_pdf] [--output results.json]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from roster_generator import generate_roster  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ['upload_csv', 'upload_xlsx', 'upload_pdf', 'export_csv', 'export_pdf']
+
+# (method, path, body, headers)
+Request = Tuple[str, str, bytes, Dict[str, str]]
+
+
+def multipart_request(path: str) -> Request:
+    """POST /api/upload request carrying the file at ``path``."""
+    boundary = uuid.uuid4().hex
+    with open(path, 'rb') as fh:
+        content = fh.read()
+    body = (f'--{boundary}\r\nContent-Disposition: form-data; name="file"; '
+            f'filename="{os.path.basename(path)}"\r\nContent-Type: application/octet-stream\r\n\r\n'
+            ).encode('utf-8') + content + f'\r\n--{boundary}--\r\n'.encode('utf-8')
+    return 'POST', '/api/upload', body, {'Content-Type': f'multipart/form-data; boundary={boundary}'}
+
+
+def build_requests(roster, work_dir: str) -> Dict[str, Request]:
+    """One request per scenario, built from the generated roster."""
+    from shift_analyzer import analyze_text
+
+    paths = roster.write(work_dir, ['csv', 'xlsx', 'pdf'])
+    requests = {f'upload_{fmt}': multipart_request(path) for fmt, path in paths.items()}
+
+    analysis = analyze_text(roster.to_text(), roster.start_date.isoformat(), '', roster.holiday_string())
+    for fmt in ('csv', 'pdf'):
+        body = json.dumps({'format': fmt, 'workers': analysis['workers'],
+                           'monthlyData': analysis['monthlyData']}).encode('utf-8')
+        requests[f'export_{fmt}'] = ('POST', '/api/export', body, {'Content-Type': 'application/json'})
+    return requests
+
+
+def start_server(port: int, workers: int, threads: int, cache: bool, log_path: str) -> subprocess.Popen:
+    """Start gunicorn (output to ``log_path``) and wait until /health answers."""
+    env = dict(os.environ, WEB_BIND=f'127.0.0.1:{port}', WEB_WORKERS=str(workers),
+               WEB_THREADS=str(threads), WEB_ACCESS_LOG='', METRICS_ENABLED='0')
+    if not cache:
+        env['EXTRACTION_CACHE_MB'] = '0'
+    with open(log_path, 'ab') as log:
+        server = subprocess.Popen([sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+                                  cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        if server.poll() is not None:
+            with open(log_path, 'r', encoding='utf-8', errors='replace') as log:
+                raise RuntimeError(f'gunicorn exited during start-up:\n{log.read()[-2000:]}')
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', '/health')
+            if connection.getresponse().status == 200:
+                return server
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError('gunicorn did not start within 60s')
+
+
+def run_load(port: int, request: Request, concurrency: int, duration: float) -> Dict[str, float]:
+    """Send ``request`` from ``concurrency`` clients for ``duration`` seconds."""
+    method, path, body, headers = request
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client() -> None:
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                response.read()
+                status = response.status
+            except OSError:
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+                status = 0
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[status] = statuses.get(status, 0) + 1
+                if status == 200:
+                    latencies.append(elapsed)
+        connection.close()
+
+    started = time.perf_counter()
+    clients = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in clients:
+        thread.start()
+    for thread in clients:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests_per_second': round(len(latencies) / wall, 2),
+        'ok': len(latencies),
+        'errors': sum(count for status, count in statuses.items() if status != 200),
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'p50_ms': round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        'p95_ms': round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1) if latencies else None
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help="Worker counts to compare")
+    parser.add_argument('--threads', type=int, default=4, help="Threads per worker")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent clients")
+    parser.add_argument('--duration', type=float, default=10, help="Seconds per scenario")
+    parser.add_argument('--years', type=float, default=1, help="Roster length")
+    parser.add_argument('--roster-size', type=int, default=40)
+    parser.add_argument('--scenarios', nargs='+', default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--cache', action='store_true', help="Keep the extraction cache enabled")
+    parser.add_argument('--output', metavar='FILE', help="Write results JSON to FILE")
+    args = parser.parse_args()
+
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        requests = build_requests(generate_roster(args.years, args.roster_size), work_dir)
+
+        for workers in args.workers:
+            server = start_server(args.port, workers, args.threads, args.cache,
+                                  os.path.join(work_dir, 'gunicorn.log'))
+            try:
+                for scenario in args.scenarios:
+                    result = run_load(args.port, requests[scenario], args.concurrency, args.duration)
+                    results.setdefault(scenario, {})[str(workers)] = result
+                    errors = ', '.join(f'{status}: {count}' for status, count in result['statuses'].items()
+                                       if status != '200') or '0'
+                    print(f"{scenario:<12} workers {workers:>2}  {result['requests_per_second']:>8.2f} req/s  "
+                          f"p50 {result['p50_ms']} ms  p95 {result['p95_ms']} ms  errors {errors}",
+                          flush=True)
+            finally:
+                server.terminate()
+                server.wait()
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump({'config': vars(args), 'results': results}, fh, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
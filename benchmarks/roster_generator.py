@@ -0,0 +1,198 @@
+"""
+Deterministic synthetic rosters in the week-block format.
+
+A roster is generated from a seed and written as calendar text, CSV, XLSX
+or PDF, so every extraction path can be timed on the same content.
+
+Usage: python benchmarks/roster_generator.py OUTPUT_DIR [--years 2] [--roster-size 40]
+       [--holiday-density 0.03] [--name-noise 0.01] [--seed 0]
+"""
+
+import argparse
+import csv
+import os
+import random
+from datetime import date, timedelta
+from typing import List
+
+DAYS_PER_WEEK = 7
+POSITIONS = 4  # Worker rows per week block (fixed by the calendar format)
+
+SURNAMES = ['GARCIA', 'RODRIGUEZ', 'GONZALEZ', 'FERNANDEZ', 'LOPEZ', 'MARTINEZ', 'SANCHEZ', 'PEREZ',
+            'GOMEZ', 'MARTIN', 'JIMENEZ', 'RUIZ', 'HERNANDEZ', 'DIAZ', 'MORENO', 'MUÑOZ', 'ALVAREZ',
+            'ROMERO', 'ALONSO', 'GUTIERREZ', 'NAVARRO', 'TORRES', 'DOMINGUEZ', 'VAZQUEZ', 'RAMOS',
+            'GIL', 'RAMIREZ', 'SERRANO', 'BLANCO', 'MOLINA', 'MORALES', 'SUAREZ', 'ORTEGA', 'DELGADO',
+            'CASTRO', 'ORTIZ', 'RUBIO', 'MARIN', 'SANZ', 'NUÑEZ', 'IGLESIAS', 'MEDINA', 'GARRIDO']
+
+
+class Roster:
+    """A generated roster: week blocks plus the holidays and mapping used for analysis."""
+
+    def __init__(self, start_date: date, weeks: List[List[List[str]]], holidays: List[date], names: List[str]):
+        self.start_date = start_date
+        self.weeks = weeks        # each week: [day numbers] + POSITIONS rows of names
+        self.holidays = holidays
+        self.names = names        # canonical worker names
+
+    @property
+    def days(self) -> int:
+        return len(self.weeks) * DAYS_PER_WEEK
+
+    def rows(self) -> List[List[str]]:
+        """All lines of the roster as lists of cells."""
+        return [row for week in self.weeks for row in week]
+
+    def to_text(self) -> str:
+        return '\n'.join(' '.join(row) for row in self.rows())
+
+    def holiday_string(self) -> str:
+        return ', '.join(holiday.isoformat() for holiday in self.holidays)
+
+    def write_text(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8') as fh:
+            fh.write(self.to_text())
+        return path
+
+    def write_csv(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8', newline='') as fh:
+            csv.writer(fh).writerows(self.rows())
+        return path
+
+    def write_xlsx(self, path: str) -> str:
+        from openpyxl import Workbook
+
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet('Guardias')
+        for row in self.rows():
+            sheet.append(row)
+        workbook.save(path)
+        return path
+
+    def write_pdf(self, path: str, lines_per_page: int = 60) -> str:
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        pdf = canvas.Canvas(path, pagesize=A4)
+        pdf.setFont('Helvetica', 8)
+        lines = [' '.join(row) for row in self.rows()]
+        # Keep week blocks on one page
+        lines_per_page -= lines_per_page % (POSITIONS + 1)
+        for start in range(0, len(lines), lines_per_page):
+            y = A4[1] - 40
+            for line in lines[start:start + lines_per_page]:
+                pdf.drawString(30, y, line)
+                y -= 12
+            pdf.showPage()
+        pdf.save()
+        return path
+
+    def write_table_pdf(self, path: str) -> str:
+        """Write the week blocks as a ruled table: one cell per day and position, names left-aligned."""
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        margin, row_height, week_gap = 30, 12, 6
+        column_width = (A4[0] - 2 * margin) / DAYS_PER_WEEK
+        block_height = (POSITIONS + 1) * row_height + week_gap
+        weeks_per_page = int((A4[1] - 2 * margin) // block_height)
+
+        pdf = canvas.Canvas(path, pagesize=A4)
+        for start in range(0, len(self.weeks), weeks_per_page):
+            pdf.setFont('Helvetica-Bold', 10)
+            pdf.drawString(margin, A4[1] - margin + 8, 'Calendario de guardias')
+            pdf.setFont('Helvetica', 8)
+            top = A4[1] - margin - 8
+            for week in self.weeks[start:start + weeks_per_page]:
+                for row_index, row in enumerate(week):
+                    y = top - row_index * row_height
+                    for column, cell in enumerate(row):
+                        x = margin + column * column_width
+                        pdf.rect(x, y - 3, column_width, row_height, stroke=1, fill=0)
+                        pdf.drawString(x + 2, y, cell)
+                top -= block_height
+            pdf.drawString(A4[0] / 2, margin / 2, str(start // weeks_per_page + 1))
+            pdf.showPage()
+        pdf.save()
+        return path
+
+    def write(self, directory: str, formats=('txt', 'csv', 'xlsx', 'pdf', 'table_pdf'), stem: str = 'roster') -> dict:
+        """Write the roster in each format and return {format: path} ('table_pdf' is written as STEM.table.pdf)."""
+        os.makedirs(directory, exist_ok=True)
+        writers = {'txt': (self.write_text, 'txt'), 'csv': (self.write_csv, 'csv'),
+                   'xlsx': (self.write_xlsx, 'xlsx'), 'pdf': (self.write_pdf, 'pdf'),
+                   'table_pdf': (self.write_table_pdf, 'table.pdf')}
+        return {fmt: writers[fmt][0](os.path.join(directory, f'{stem}.{writers[fmt][1]}')) for fmt in formats}
+
+
+def _add_noise(name: str, rng: random.Random) -> str:
+    """Introduce a typical extraction typo: lower case, dropped or swapped letter."""
+    kind = rng.randrange(3)
+    if kind == 0 or len(name) < 4:
+        return name.lower()
+    position = rng.randrange(1, len(name) - 1)
+    if kind == 1:
+        return name[:position] + name[position + 1:]
+    return name[:position - 1] + name[position] + name[position - 1] + name[position + 1:]
+
+
+def generate_roster(years: float = 1, roster_size: int = 40, holiday_density: float = 0.03,
+                    name_noise: float = 0.0, start_date: date = date(2024, 12, 2), seed: int = 0) -> Roster:
+    """
+    Generate a roster deterministically.
+
+    Args:
+        years: Length of the roster in years (rounded to whole weeks)
+        roster_size: Number of distinct workers
+        holiday_density: Fraction of days that are holidays
+        name_noise: Probability that a name cell contains a typo
+        start_date: First day (should be a Monday, the first column of a week block)
+        seed: Random seed
+
+    Returns:
+        Generated roster
+    """
+    if roster_size < POSITIONS:
+        raise ValueError(f"roster_size must be at least {POSITIONS}")
+    rng = random.Random(seed)
+
+    names = []
+    for index in range(roster_size):
+        surname = SURNAMES[index % len(SURNAMES)]
+        names.append(surname if index < len(SURNAMES) else f'{surname}{index // len(SURNAMES) + 1}')
+
+    weeks = []
+    holidays = []
+    current = start_date
+    for _ in range(max(1, round(years * 365 / DAYS_PER_WEEK))):
+        day_numbers = []
+        rows = [[] for _ in range(POSITIONS)]
+        for _ in range(DAYS_PER_WEEK):
+            day_numbers.append(str(current.day))
+            if rng.random() < holiday_density:
+                holidays.append(current)
+            for row, name in zip(rows, rng.sample(names, POSITIONS)):
+                row.append(_add_noise(name, rng) if name_noise and rng.random() < name_noise else name)
+            current += timedelta(days=1)
+        weeks.append([day_numbers] + rows)
+
+    return Roster(start_date, weeks, holidays, names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Write a synthetic roster as TXT, CSV, XLSX and PDF.")
+    parser.add_argument('output', help="Output directory")
+    parser.add_argument('--years', type=float, default=1)
+    parser.add_argument('--roster-size', type=int, default=40)
+    parser.add_argument('--holiday-density', type=float, default=0.03)
+    parser.add_argument('--name-noise', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    roster = generate_roster(args.years, args.roster_size, args.holiday_density, args.name_noise, seed=args.seed)
+    for fmt, path in roster.write(args.output).items():
+        print(f"{fmt:>9} {os.path.getsize(path) / 1024:>10.1f} KiB  {path}")
+    print(f"{roster.days} days, {len(roster.holidays)} holidays, start {roster.start_date.isoformat()}")
+
+
+if __name__ == '__main__':
+    main()
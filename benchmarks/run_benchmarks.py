@@ -0,0 +1,194 @@
+"""
+Benchmark suite: extraction, structure detection, analysis, swap simulation and exports on synthetic rosters.
+
+Rosters are generated deterministically (see roster_generator.py) in every
+input format. Each step is timed several times and the best time is kept.
+Results are written as JSON and can be compared against a stored baseline:
+the run fails (exit code 1) when a step is slower than the baseline by more
+than the allowed tolerance, or has no baseline entry (unless --allow-missing).
+
+Usage:
+    python benchmarks/run_benchmarks.py [--years 1 5] [--roster-size 40] [--repeat 3]
+        [--output results.json] [--baseline benchmarks/baseline.json] [--tolerance 0.5]
+        [--save-baseline] [--allow-missing]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from roster_generator import generate_roster  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+EXTRACT_FORMATS = ['csv', 'xlsx', 'pdf', 'table_pdf']
+EXPORT_FORMATS = ['csv', 'xlsx', 'json', 'pdf']
+MIN_COMPARABLE_SECONDS = 0.005  # Faster steps are too noisy to flag as regressions
+
+
+def time_call(func: Callable[[], any], repeat: int) -> Dict[str, float]:
+    """Run ``func`` ``repeat`` times and return best/median seconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return {'best': min(timings), 'median': statistics.median(timings), 'runs': repeat}
+
+
+def run_case(years: float, args: argparse.Namespace, work_dir: str) -> Dict[str, Dict[str, float]]:
+    """Benchmark every step for one roster size."""
+    from analysis_session import AnalysisSession
+    from app import app as flask_app, render_export, run_analysis
+    from file_processor import CalendarFileProcessor
+
+    roster = generate_roster(years, args.roster_size, args.holiday_density, args.name_noise, seed=args.seed)
+    paths = roster.write(os.path.join(work_dir, f'{years}y'), EXTRACT_FORMATS)
+    text = roster.to_text()
+    results = {}
+
+    for fmt in EXTRACT_FORMATS:
+        results[f'process_file.{fmt}'] = time_call(
+            lambda: CalendarFileProcessor.process_file(paths[fmt]), args.repeat)
+
+    # Opt-in layout-aware PDF extraction (PDF_LAYOUT=1), to compare with the default text path
+    for fmt in ('pdf', 'table_pdf'):
+        results[f'extract_pdf_layout.{fmt}'] = time_call(
+            lambda: CalendarFileProcessor.extract_text_from_pdf(paths[fmt], layout=True), args.repeat)
+
+    results['detect_calendar_structure'] = time_call(
+        lambda: CalendarFileProcessor.detect_calendar_structure(text), args.repeat)
+
+    payload = {
+        'calendarText': text,
+        'startDate': roster.start_date.isoformat(),
+        'holidays': roster.holiday_string()
+    }
+    results['analysis'] = time_call(lambda: run_analysis(payload), args.repeat)
+
+    simulator = AnalysisSession(text, roster.start_date.isoformat(), '', roster.holiday_string()).simulator()
+    results['simulate.rank_swaps'] = time_call(lambda: simulator.rank_swaps('weekend'), args.repeat)
+    swaps = [candidate['change'] for candidate in simulator.rank_swaps('weekend', limit=100)['candidates']]
+
+    def what_ifs():
+        for change in swaps:
+            simulator.apply(change)
+            simulator.fairness()
+            simulator.undo()
+
+    results['simulate.what_ifs'] = time_call(what_ifs, args.repeat)
+
+    analysis = run_analysis(payload)
+    with flask_app.app_context():
+        for fmt in EXPORT_FORMATS:
+            export = {
+                'format': fmt,
+                'workers': analysis['workers'],
+                'monthlyData': analysis['monthlyData'],
+                'analysisPeriod': 'Benchmark'
+            }
+
+            def render():
+                result = render_export(export)
+                if hasattr(result, 'materialize'):
+                    result.materialize()
+
+            results[f'export.{fmt}'] = time_call(render, args.repeat)
+
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> Tuple[List[str], List[str]]:
+    """
+    Compare results with the baseline.
+
+    Returns:
+        Messages per step slower than ``baseline * (1 + tolerance)``, and the
+        steps that have no baseline entry (they cannot be checked)
+    """
+    regressions = []
+    missing = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if not reference:
+            missing.append(name)
+            continue
+        if reference['best'] < MIN_COMPARABLE_SECONDS:
+            continue
+        limit = reference['best'] * (1 + tolerance)
+        if current['best'] > limit:
+            regressions.append(f"{name}: {current['best']:.4f}s > {limit:.4f}s "
+                               f"(baseline {reference['best']:.4f}s +{tolerance:.0%})")
+    return regressions, missing
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--years', type=float, nargs='+', default=[1, 5], help="Roster lengths to benchmark")
+    parser.add_argument('--roster-size', type=int, default=40, help="Distinct workers")
+    parser.add_argument('--holiday-density', type=float, default=0.03)
+    parser.add_argument('--name-noise', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--output', metavar='FILE', help="Write results JSON to FILE")
+    parser.add_argument('--baseline', metavar='FILE', default=DEFAULT_BASELINE)
+    parser.add_argument('--tolerance', type=float, default=0.5,
+                        help="Allowed slowdown versus the baseline (0.5 = 50%%)")
+    parser.add_argument('--save-baseline', action='store_true', help="Store these results as the baseline")
+    parser.add_argument('--allow-missing', action='store_true',
+                        help="Only warn about steps without a baseline entry instead of failing")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for years in args.years:
+            for name, timing in run_case(years, args, work_dir).items():
+                key = f'{years:g}y.{name}'
+                results[key] = {k: round(v, 6) if isinstance(v, float) else v for k, v in timing.items()}
+                print(f"{key:<36} best {timing['best']:>9.4f}s  median {timing['median']:>9.4f}s", flush=True)
+
+    report = {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'config': {k: v for k, v in vars(args).items() if k not in ('output', 'baseline', 'save_baseline')}
+        },
+        'results': results
+    }
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline} (use --save-baseline)")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as fh:
+        baseline = json.load(fh)['results']
+    regressions, missing = compare(results, baseline, args.tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    for name in missing:
+        print(f"{'WARNING' if args.allow_missing else 'MISSING'} {name}: not in the baseline (use --save-baseline)")
+    return 1 if regressions or (missing and not args.allow_missing) else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
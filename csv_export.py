@@ -0,0 +1,132 @@
+"""
+Streaming CSV export of the global statistics and the monthly breakdown.
+
+Rows are produced by generators and encoded in small batches through the
+``csv`` module (so names with quotes or commas are escaped correctly),
+optionally gzip-compressed on the fly. Memory use does not depend on the
+number of workers or months exported.
+"""
+
+import csv
+import zlib
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+from shift_analyzer import MONTH_LABELS, months_with_data
+
+
+GLOBAL_HEADER = ['Médico', 'Total', 'Viernes', 'Sábado', 'Domingo', '% Fin de Semana', 'Rosell']
+ROWS_PER_CHUNK = 256
+
+
+class _LineBuffer:
+    """Minimal file-like object collecting what ``csv.writer`` writes."""
+
+    def __init__(self):
+        self.parts: List[str] = []
+
+    def write(self, text: str) -> None:
+        self.parts.append(text)
+
+    def drain(self) -> str:
+        text = ''.join(self.parts)
+        self.parts.clear()
+        return text
+
+
+def monthly_breakdown(workers: List[Dict[str, any]],
+                      monthly_data: List[Dict[str, any]]) -> Tuple[List[str], Dict[str, Dict[str, any]]]:
+    """
+    Resolve the monthly table of an export.
+
+    Values come from ``monthly_data`` when given, otherwise from the
+    worker's own month counters (``december``, ``january``...).
+
+    Args:
+        workers: Worker statistics
+        monthly_data: Monthly breakdown per worker (may be empty)
+
+    Returns:
+        Tuple (month labels with data in Dic..Nov order, {name: {label: count}})
+    """
+    if monthly_data:
+        monthly_by_name = {entry.get('name'): entry for entry in monthly_data}
+        return months_with_data(monthly_data), monthly_by_name
+    monthly_by_name = {
+        worker.get('name'): {label: worker.get(key, 0) for label, key in MONTH_LABELS.items()}
+        for worker in workers
+    }
+    return months_with_data(monthly_by_name.values()), monthly_by_name
+
+
+def iter_csv_rows(workers: List[Dict[str, any]], monthly_data: List[Dict[str, any]]) -> Iterator[List[any]]:
+    """
+    Yield the CSV header and one row per worker.
+
+    Monthly columns (months with data, in Dic..Nov order, see
+    ``monthly_breakdown``) follow the global columns.
+
+    Args:
+        workers: Worker statistics
+        monthly_data: Monthly breakdown per worker (may be empty)
+
+    Yields:
+        Lists of cell values
+    """
+    months, monthly_by_name = monthly_breakdown(workers, monthly_data)
+
+    yield GLOBAL_HEADER + months + (['Total Mensual'] if months else [])
+
+    for worker in workers:
+        row = [
+            worker.get('name', ''),
+            worker.get('total', 0),
+            worker.get('friday', 0),
+            worker.get('saturday', 0),
+            worker.get('sunday', 0),
+            worker.get('weekendPercentage', 0),
+            worker.get('lastPosition', 0)
+        ]
+        if months:
+            entry = monthly_by_name.get(worker.get('name'), {})
+            values = [entry.get(month, 0) or 0 for month in months]
+            row.extend(values)
+            row.append(sum(values))
+        yield row
+
+
+def iter_csv_chunks(rows: Iterable[List[any]], compress: bool = False,
+                    rows_per_chunk: int = ROWS_PER_CHUNK) -> Iterator[bytes]:
+    """
+    Encode rows as UTF-8 CSV in batches, optionally gzip-compressed.
+
+    Args:
+        rows: Row iterator (see ``iter_csv_rows``)
+        compress: Produce a gzip stream
+        rows_per_chunk: Rows encoded per yielded chunk
+
+    Yields:
+        Encoded chunks
+    """
+    buffer = _LineBuffer()
+    writer = csv.writer(buffer, lineterminator='\n')
+    compressor = zlib.compressobj(wbits=31) if compress else None  # 31 = gzip container
+
+    def encode(text: str) -> bytes:
+        data = text.encode('utf-8')
+        return compressor.compress(data) if compressor else data
+
+    pending = 0
+    for row in rows:
+        writer.writerow(row)
+        pending += 1
+        if pending >= rows_per_chunk:
+            chunk = encode(buffer.drain())
+            pending = 0
+            if chunk:
+                yield chunk
+
+    chunk = encode(buffer.drain())
+    if compressor:
+        chunk += compressor.flush()
+    if chunk:
+        yield chunk
@@ -0,0 +1,177 @@
+"""
+Precomputed day-type index for weekend and holiday classification.
+
+For a range of years and a holiday set, every (date, weekday column) pair is
+mapped once to a compact bit code, so classifying a calendar is a single
+array lookup instead of a holiday scan per day. Indexes are memoized in a
+small LRU and shared by every request using the same years and holidays.
+Codes are uint8 (7 bytes per indexed date); calendars spanning more than
+``MAX_INDEX_YEARS`` are classified directly without an index.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, FrozenSet, Iterable, Tuple
+
+import numpy as np
+
+
+# Day-type bits (a weekday has code 0)
+FRIDAY = 1        # Friday, or Monday-Thursday before a holiday
+SATURDAY = 2
+SUNDAY = 4        # Sunday or holiday
+HOLIDAY = 8
+HOLIDAY_EVE = 16  # Day before a holiday (counted as Friday only Monday-Thursday)
+WEEKEND = FRIDAY | SATURDAY | SUNDAY
+
+INDEX_CACHE_SIZE = 32
+MAX_INDEX_YEARS = 10  # Longer spans are classified directly instead of indexed (~2.5 KB per year)
+
+_cache: 'OrderedDict[Tuple[int, int, FrozenSet[int]], DayTypeIndex]' = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def classify(ordinals: np.ndarray, day_of_week: np.ndarray, holidays: Iterable[int]) -> np.ndarray:
+    """
+    Compute day-type codes directly (no index).
+
+    Used to build indexes and for inputs an index would not pay off for (a
+    few days, or a span longer than ``MAX_INDEX_YEARS``). Arrays broadcast
+    against each other.
+
+    Args:
+        ordinals: Date ordinals
+        day_of_week: Weekday column per day (0=Sunday)
+        holidays: Holiday date ordinals
+
+    Returns:
+        uint8 array of day-type bits
+    """
+    ordinals = np.asarray(ordinals, dtype=np.int64)
+    day_of_week = np.asarray(day_of_week, dtype=np.int8)
+    holiday_ordinals = np.fromiter(holidays, dtype=np.int64)
+    is_holiday = np.isin(ordinals, holiday_ordinals)
+    is_eve = np.isin(ordinals + 1, holiday_ordinals)
+
+    friday = (day_of_week == 5) | (~is_holiday & is_eve & (day_of_week >= 1) & (day_of_week <= 4))
+    saturday = day_of_week == 6
+    sunday = (day_of_week == 0) | is_holiday
+
+    shape = np.broadcast_shapes(ordinals.shape, day_of_week.shape)
+    codes = np.zeros(shape, dtype=np.uint8)
+    for mask, bit in ((friday, FRIDAY), (saturday, SATURDAY), (sunday, SUNDAY),
+                      (is_holiday, HOLIDAY), (is_eve, HOLIDAY_EVE)):
+        codes[np.broadcast_to(mask, shape)] |= bit
+    return codes
+
+
+class DayTypeIndex:
+    """Day-type codes for every date of a year range and every weekday column."""
+
+    def __init__(self, first_year: int, last_year: int, holidays: Iterable[int]):
+        """
+        Args:
+            first_year: First year covered
+            last_year: Last year covered (inclusive)
+            holidays: Holiday date ordinals
+        """
+        self.first_year = first_year
+        self.last_year = last_year
+        self.first = date(first_year, 1, 1).toordinal()
+        self.last = date(last_year, 12, 31).toordinal()
+
+        # Weekday comes from the calendar column (0=Sunday), so codes are
+        # stored for each of the 7 possible columns: shape (dates, 7)
+        ordinals = np.arange(self.first, self.last + 1, dtype=np.int64)[:, np.newaxis]
+        self.codes = classify(ordinals, np.arange(7, dtype=np.int8)[np.newaxis, :], holidays)
+
+    def lookup(self, ordinals: np.ndarray, day_of_week: np.ndarray) -> np.ndarray:
+        """
+        Return the day-type code of each day.
+
+        Args:
+            ordinals: Date ordinals (inside the indexed range)
+            day_of_week: Weekday column per day (0=Sunday)
+
+        Returns:
+            uint8 array of day-type bits
+        """
+        return self.codes[ordinals - self.first, day_of_week]
+
+
+def get_index(first_year: int, last_year: int, holidays: Iterable[date]) -> DayTypeIndex:
+    """
+    Return the (memoized) index for a year range and holiday set.
+
+    Args:
+        first_year: First year covered
+        last_year: Last year covered (inclusive)
+        holidays: Holiday dates
+
+    Returns:
+        Shared day-type index
+    """
+    key = (first_year, last_year, frozenset(h.toordinal() for h in holidays))
+    with _cache_lock:
+        index = _cache.get(key)
+        if index is not None:
+            _cache.move_to_end(key)
+            return index
+
+    index = DayTypeIndex(first_year, last_year, key[2])
+    with _cache_lock:
+        _cache[key] = index
+        while len(_cache) > INDEX_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return index
+
+
+def preload(first_year: int, last_year: int, holiday_sets: Iterable[Iterable[date]]) -> None:
+    """Build the indexes of known (e.g. regional) holiday sets ahead of the first request."""
+    for holidays in holiday_sets:
+        get_index(first_year, last_year, holidays)
+
+
+def day_type_codes(ordinals: np.ndarray, day_of_week: np.ndarray, holidays: Iterable[date]) -> np.ndarray:
+    """
+    Classify days with the index covering their years.
+
+    Spans of more than ``MAX_INDEX_YEARS`` years are classified directly, so
+    a stray far-away date cannot build (and keep cached) a huge index.
+
+    Args:
+        ordinals: Date ordinals
+        day_of_week: Weekday column per day (0=Sunday)
+        holidays: Holiday dates
+
+    Returns:
+        uint8 array of day-type bits
+    """
+    if len(ordinals) == 0:
+        return np.zeros(0, dtype=np.uint8)
+    first_year = date.fromordinal(int(ordinals.min())).year
+    last_year = date.fromordinal(int(ordinals.max())).year
+    if last_year - first_year >= MAX_INDEX_YEARS:
+        return classify(ordinals, day_of_week, (h.toordinal() for h in holidays))
+    return get_index(first_year, last_year, holidays).lookup(ordinals, day_of_week)
+
+
+def split_codes(codes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Expand day-type codes into the boolean friday/saturday/sunday/weekend arrays."""
+    return {
+        'friday': (codes & FRIDAY) != 0,
+        'saturday': (codes & SATURDAY) != 0,
+        'sunday': (codes & SUNDAY) != 0,
+        'weekend': (codes & WEEKEND) != 0
+    }
+
+
+def cache_info() -> Dict[str, int]:
+    """Return the number of memoized indexes and their total size."""
+    with _cache_lock:
+        return {
+            'indexes': len(_cache),
+            'maxIndexes': INDEX_CACHE_SIZE,
+            'bytes': sum(index.codes.nbytes for index in _cache.values())
+        }
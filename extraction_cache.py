@@ -0,0 +1,174 @@
+"""
+Content-addressed cache for extracted calendar text.
+
+Entries are keyed by a hash of the uploaded bytes, the file extension and
+the extractor version, and hold the extracted text together with the
+detected structure. A size-bounded in-memory LRU is backed by an optional
+on-disk tier that survives restarts.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import BinaryIO, Dict, Optional
+
+from file_processor import EXTRACTOR_VERSION
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def content_key(stream: BinaryIO, suffix: str) -> str:
+    """
+    Hash a binary stream (from its current position) into a cache key.
+
+    The stream is rewound to where it started after hashing.
+
+    Args:
+        stream: Readable, seekable binary stream
+        suffix: File extension (the same bytes may be read differently per format)
+
+    Returns:
+        Hex digest identifying the content
+    """
+    start = stream.tell()
+    digest = hashlib.sha256(f'{EXTRACTOR_VERSION}:{suffix.lower()}:'.encode('utf-8'))
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+        digest.update(chunk)
+    stream.seek(start)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """Thread-safe LRU cache of extraction results with an optional disk tier."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, disk_dir: Optional[str] = None):
+        """
+        Args:
+            max_bytes: Approximate memory budget (size of cached texts)
+            disk_dir: Directory for the persistent tier (None disables it)
+        """
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries: 'OrderedDict[str, Dict[str, any]]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f'{key}.json')
+
+    def _store(self, key: str, entry: Dict[str, any]) -> None:
+        """Insert into the memory tier and evict least recently used entries (lock held)."""
+        size = len(entry.get('text', ''))
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._bytes -= self._sizes[key]
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._sizes[key] = size
+        self._bytes += size
+
+        while self._bytes > self.max_bytes:
+            old_key, _ = self._entries.popitem(last=False)
+            self._bytes -= self._sizes.pop(old_key)
+
+    def get(self, key: str) -> Optional[Dict[str, any]]:
+        """
+        Look up an extraction result.
+
+        Args:
+            key: Content key from ``content_key``
+
+        Returns:
+            Cached entry or None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+
+        if self.disk_dir:
+            try:
+                with open(self._disk_path(key), 'r', encoding='utf-8') as fh:
+                    entry = json.load(fh)
+            except (OSError, ValueError):
+                entry = None
+            if entry is not None:
+                with self._lock:
+                    self._store(key, entry)
+                    self.disk_hits += 1
+                return entry
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: str, entry: Dict[str, any]) -> None:
+        """
+        Store an extraction result.
+
+        Args:
+            key: Content key from ``content_key``
+            entry: JSON-serializable result (must contain 'text')
+        """
+        with self._lock:
+            self._store(key, entry)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+            try:
+                with open(temp_path, 'w', encoding='utf-8') as fh:
+                    json.dump(entry, fh, ensure_ascii=False)
+                os.replace(temp_path, path)
+            except OSError:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+    def purge(self) -> int:
+        """
+        Remove every entry from both tiers.
+
+        Returns:
+            Number of entries removed from memory
+        """
+        with self._lock:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+        if self.disk_dir and os.path.isdir(self.disk_dir):
+            for name in os.listdir(self.disk_dir):
+                if name.endswith('.json'):
+                    try:
+                        os.remove(os.path.join(self.disk_dir, name))
+                    except OSError:
+                        pass
+
+        return removed
+
+    def stats(self) -> Dict[str, any]:
+        """Return hit/miss counters and current usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'diskHits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'maxBytes': self.max_bytes,
+                'diskEnabled': bool(self.disk_dir)
+            }
@@ -1,97 +1,453 @@
 """
 Module for processing calendar files (PDF, Excel, CSV) and extracting schedule data.
+
+Extractors are registered per file extension (see ``register_extractor``).
+The heavy format backends (pdfplumber, pandas) are imported the first time a
+file of that format is processed, so importing this module, the CLI and
+server workers only pay for the formats they actually read.
 """
 
-import pandas as pd
 from pathlib import Path
-import pdfplumber
-from typing import List, Dict, Tuple
+from typing import TYPE_CHECKING, List, Dict, Tuple, Iterator, Optional, Union, BinaryIO, Callable
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from collections import deque
+from contextlib import contextmanager
+from functools import lru_cache
+from io import BytesIO
+import os
 import re
+import shutil
+import tempfile
+import time
+
+from metrics import metrics
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+
+# Bin PDF words into the week grid by position instead of reconstructing page text
+# (opt-in: not faster than plain text extraction yet)
+PDF_LAYOUT = os.environ.get('PDF_LAYOUT', '0').lower() not in ('0', 'false', 'no')
+
+# Bump when extraction output changes (invalidates caches); plain text output is unchanged since '2'
+EXTRACTOR_VERSION = '3' if PDF_LAYOUT else '2'
+PDF_PAGES_PER_CHUNK = 8  # Pages extracted per worker task
+
+# A path, raw bytes or a readable binary file-like object
+FileSource = Union[str, os.PathLike, bytes, BinaryIO]
+
+# Receives progress counters as keyword arguments (e.g. pages_processed=3)
+ProgressCallback = Callable[..., None]
+
+
+@lru_cache(maxsize=None)
+def _cell_to_text():
+    """Elementwise str(value).strip() applied to whole arrays (ufunc built on first use)."""
+    import numpy as np
+    return np.frompyfunc(lambda value: str(value).strip(), 1, 1)
+
+
+def _numbers_to_text(values: 'np.ndarray', present: 'np.ndarray') -> 'np.ndarray':
+    """
+    Format a bool/int/float array as str() of its Python scalars.
+    
+    Each distinct value is formatted once and spread back with an index
+    array. Values are told apart by their bit pattern, so 0.0 and -0.0 keep
+    their own text.
+    
+    Args:
+        values: Numeric value array
+        present: Mask of the cells to format
+        
+    Returns:
+        Object array of strings (None where ``present`` is False)
+    """
+    import numpy as np
+    
+    cells = np.empty(values.shape, dtype=object)
+    kept = np.ascontiguousarray(values[present])
+    if kept.dtype.kind == 'f':
+        bits = kept.view(f'u{kept.dtype.itemsize}')
+        unique_bits, inverse = np.unique(bits, return_inverse=True)
+        unique = unique_bits.view(kept.dtype)
+    else:
+        unique, inverse = np.unique(kept, return_inverse=True)
+    texts = np.array([str(value) for value in unique.tolist()], dtype=object)
+    cells[present] = texts[inverse.reshape(-1)]
+    return cells
+
+
+def _join_cells(cells: 'np.ndarray', present: 'np.ndarray') -> str:
+    """
+    Join the present cells of each row with spaces and the rows with newlines.
+    
+    Rows without present cells are dropped. Every present cell is followed
+    by its separator (a space, or a newline after the last one of its row)
+    and the whole text is built with one ``join``.
+    """
+    import numpy as np
+    
+    n_rows, n_cols = present.shape
+    if not present.any():
+        return ''
+    last = n_cols - 1 - np.argmax(present[:, ::-1], axis=1)
+    separators = np.full(present.shape, ' ', dtype=object)
+    separators[np.arange(n_rows), last] = '\n'
+    pieces = np.stack((cells, separators), axis=2)[present]
+    return ''.join(pieces.ravel().tolist())[:-1]
+
+
+# Extracts calendar text: (source, pdf_jobs, progress) -> text
+Extractor = Callable[[FileSource, Optional[int], Optional[ProgressCallback]], str]
+
+# Registered extractors by lower-case suffix ('.pdf')
+_EXTRACTORS: Dict[str, Extractor] = {}
+
+
+def register_extractor(*suffixes: str) -> Callable[[Extractor], Extractor]:
+    """
+    Register an extractor for one or more file extensions (decorator).
+    
+    The extractor is called as ``extractor(source, pdf_jobs, progress)`` and
+    returns the calendar text. It should import its backend on first use so
+    that registering it costs nothing. Extractors that report
+    ``pages_total`` through ``progress`` are measured in pages, the rest in
+    rows of output text.
+    
+    Args:
+        suffixes: Extensions including the dot ('.ods')
+        
+    Returns:
+        Decorator returning the extractor unchanged
+    """
+    def decorator(extractor: Extractor) -> Extractor:
+        for suffix in suffixes:
+            _EXTRACTORS[suffix.lower()] = extractor
+        return extractor
+    return decorator
+
+
+def get_extractor(suffix: str) -> Extractor:
+    """
+    Return the extractor registered for a file extension.
+    
+    Raises:
+        ValueError: If no extractor handles the extension
+    """
+    try:
+        return _EXTRACTORS[suffix.lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported file format: {suffix}")
+
+
+def supported_suffixes() -> List[str]:
+    """Extensions with a registered extractor (with the dot, sorted)."""
+    return sorted(_EXTRACTORS)
+
+
+def _extract_pdf_page_range(pdf_path: str, start: int, stop: int, layout: bool = PDF_LAYOUT) -> List[str]:
+    """
+    Extract the text of pages [start, stop) from a PDF (runs in worker processes).
+    
+    Args:
+        pdf_path: Path to the PDF file
+        start: First page index
+        stop: Page index after the last page
+        layout: Layout-aware grid extraction (see ``pdf_layout``)
+        
+    Returns:
+        Text of each page ('' for pages without text)
+    """
+    import pdfplumber
+    from pdf_layout import page_calendar_text
+    
+    texts = []
+    with pdfplumber.open(pdf_path, pages=list(range(start + 1, stop + 1))) as pdf:
+        for page in pdf.pages:
+            texts.append(page_calendar_text(page, layout))
+            page.close()
+    return texts
+
+
+def _open_source(source: FileSource) -> Union[str, BinaryIO]:
+    """Return something pdfplumber/pandas can read: a path string or a binary stream."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return BytesIO(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source)
+    source.seek(0)
+    return source
+
+
+def _source_size(source: FileSource) -> int:
+    """Size in bytes of a source (path, bytes or seekable stream)."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, os.SEEK_END)
+    source.seek(position)
+    return size
+
+
+@contextmanager
+def _source_as_path(source: FileSource, suffix: str) -> Iterator[str]:
+    """
+    Yield a filesystem path for a source (needed by worker processes).
+    
+    In-memory sources are spilled to a unique temporary file that is
+    removed afterwards.
+    """
+    source = _open_source(source)
+    if isinstance(source, str):
+        yield source
+        return
+    
+    fd, temp_path = tempfile.mkstemp(suffix=suffix)
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            shutil.copyfileobj(source, fh)
+        yield temp_path
+    finally:
+        os.remove(temp_path)
 
 
 class CalendarFileProcessor:
     """Process calendar files in different formats (PDF, Excel, CSV)."""
     
     @staticmethod
-    def extract_text_from_pdf(pdf_path: str) -> str:
+    def iter_pdf_pages(pdf_path: FileSource, jobs: Optional[int] = 1,
+                       pages_per_chunk: int = PDF_PAGES_PER_CHUNK,
+                       progress: Optional[ProgressCallback] = None,
+                       layout: bool = PDF_LAYOUT) -> Iterator[str]:
         """
-        Extract text from a PDF file.
+        Extract text from a PDF file page by page, in page order.
+        
+        With jobs > 1 page ranges are extracted by a process pool. Only a
+        bounded number of ranges is in flight at a time, so peak memory stays
+        at a few chunks of pages regardless of the document size.
+        
+        With ``layout`` the words of each page are binned into the week grid
+        by their coordinates (tab-separated cells, see ``pdf_layout``); pages
+        that are not a column-aligned grid fall back to plain text extraction.
         
         Args:
-            pdf_path: Path to the PDF file
+            pdf_path: Path, bytes or binary file-like object of the PDF
+            jobs: Number of worker processes (None = CPU count, 1 = in-process)
+            pages_per_chunk: Pages extracted per worker task
+            progress: Called with pages_processed/pages_total after each page or chunk
+            layout: Layout-aware grid extraction
             
-        Returns:
-            Extracted text from the PDF
+        Yields:
+            Text of each page that contains text
         """
-        text = []
         try:
-            with pdfplumber.open(pdf_path) as pdf:
-                for page in pdf.pages:
-                    page_text = page.extract_text()
-                    if page_text:
-                        text.append(page_text)
-            return '\n'.join(text)
+            import pdfplumber
+            from pdf_layout import page_calendar_text
+            
+            if jobs is None:
+                jobs = os.cpu_count() or 1
+            
+            if jobs <= 1:
+                with pdfplumber.open(_open_source(pdf_path)) as pdf:
+                    page_count = len(pdf.pages)
+                    for index, page in enumerate(pdf.pages):
+                        page_text = page_calendar_text(page, layout)
+                        page.close()
+                        if progress:
+                            progress(pages_processed=index + 1, pages_total=page_count)
+                        if page_text:
+                            yield page_text
+                return
+            
+            with pdfplumber.open(_open_source(pdf_path)) as pdf:
+                page_count = len(pdf.pages)
+            
+            ranges = [(start, min(start + pages_per_chunk, page_count))
+                      for start in range(0, page_count, pages_per_chunk)]
+            
+            if len(ranges) <= 1:
+                yield from CalendarFileProcessor.iter_pdf_pages(pdf_path, jobs=1, progress=progress,
+                                                                layout=layout)
+                return
+            
+            with _source_as_path(pdf_path, '.pdf') as path, \
+                    ProcessPoolExecutor(max_workers=min(jobs, len(ranges))) as executor:
+                remaining = iter(ranges)
+                pending = deque()
+                
+                def submit_next() -> None:
+                    page_range = next(remaining, None)
+                    if page_range is not None:
+                        pending.append(executor.submit(_extract_pdf_page_range, path, *page_range, layout))
+                
+                # Keep at most two chunks per worker in flight
+                for _ in range(2 * jobs):
+                    submit_next()
+                
+                pages_processed = 0
+                while pending:
+                    page_texts = pending.popleft().result()
+                    submit_next()
+                    pages_processed += len(page_texts)
+                    if progress:
+                        progress(pages_processed=pages_processed, pages_total=page_count)
+                    for page_text in page_texts:
+                        if page_text:
+                            yield page_text
         except Exception as e:
             raise ValueError(f"Error extracting PDF: {str(e)}")
     
     @staticmethod
-    def extract_from_excel(excel_path: str) -> str:
+    def iter_pdf_lines(pdf_path: FileSource, jobs: Optional[int] = 1) -> Iterator[str]:
+        """
+        Stream the lines of a PDF as pages are extracted.
+        
+        The result can be fed directly to ``CalendarParser.parse`` so that
+        parsing starts on the first weeks while later pages are extracted.
+        
+        Args:
+            pdf_path: Path, bytes or binary file-like object of the PDF
+            jobs: Number of worker processes (see ``iter_pdf_pages``)
+            
+        Yields:
+            Text lines in document order
+        """
+        for page_text in CalendarFileProcessor.iter_pdf_pages(pdf_path, jobs=jobs):
+            yield from page_text.split('\n')
+    
+    @staticmethod
+    def extract_text_from_pdf(pdf_path: FileSource, jobs: Optional[int] = 1,
+                              progress: Optional[ProgressCallback] = None,
+                              layout: bool = PDF_LAYOUT) -> str:
+        """
+        Extract text from a PDF file.
+        
+        Args:
+            pdf_path: Path, bytes or binary file-like object of the PDF
+            jobs: Number of worker processes (see ``iter_pdf_pages``)
+            progress: Page progress callback (see ``iter_pdf_pages``)
+            layout: Layout-aware grid extraction (see ``iter_pdf_pages``)
+            
+        Returns:
+            Extracted text from the PDF
+        """
+        return '\n'.join(CalendarFileProcessor.iter_pdf_pages(pdf_path, jobs=jobs, progress=progress,
+                                                              layout=layout))
+    
+    @staticmethod
+    def _frame_to_text_rowwise(df: 'pd.DataFrame') -> str:
+        """
+        Reference row-by-row conversion of a DataFrame to calendar text.
+        
+        Kept as the fallback for dtypes the columnar path does not handle
+        (datetimes, categoricals, extension arrays).
+        """
+        import pandas as pd
+        
+        lines = []
+        for _, row in df.iterrows():
+            # Remove NaN values and convert to string
+            cleaned_row = [str(val).strip() for val in row if pd.notna(val)]
+            if cleaned_row:
+                lines.append(' '.join(cleaned_row))
+        
+        return '\n'.join(lines)
+    
+    @staticmethod
+    def frame_to_text(df: 'pd.DataFrame') -> str:
+        """
+        Convert a DataFrame to calendar text (one line per non-empty row).
+        
+        Cells are masked, cast and stripped over the whole value array at
+        once (numeric arrays format each distinct value once), and empty
+        rows are dropped before joining. The output is byte-identical to
+        ``_frame_to_text_rowwise``: it works on the same ``df.values`` array
+        that ``iterrows`` uses, so numeric upcasting of mixed int/float
+        frames is reproduced as well. ``benchmarks/frame_parity.py`` checks
+        both paths against each other.
+        
+        Args:
+            df: DataFrame read with header=None
+            
+        Returns:
+            Formatted calendar text
+        """
+        import pandas as pd
+        
+        values = df.values
+        
+        if values.dtype.kind not in 'biufO':
+            return CalendarFileProcessor._frame_to_text_rowwise(df)
+        
+        present = ~pd.isna(values)
+        if values.dtype.kind == 'O':
+            cells = _cell_to_text()(values)
+        else:
+            # str() of the Python scalars a row Series yields (no padding to strip)
+            cells = _numbers_to_text(values, present)
+        
+        return _join_cells(cells, present)
+    
+    @staticmethod
+    def extract_from_excel(excel_path: FileSource) -> str:
         """
         Extract calendar data from an Excel file.
         
         Args:
-            excel_path: Path to the Excel file
+            excel_path: Path, bytes or binary file-like object of the Excel file
             
         Returns:
             Formatted calendar text
         """
         try:
+            import pandas as pd
+            
             # Try to read with openpyxl first (handles .xlsx)
-            df = pd.read_excel(excel_path, sheet_name=0, header=None)
+            with metrics.stage('read_excel'):
+                df = pd.read_excel(_open_source(excel_path), sheet_name=0, header=None)
             
             # Convert to text format similar to the calendar input
-            lines = []
-            for _, row in df.iterrows():
-                # Remove NaN values and convert to string
-                cleaned_row = [str(val).strip() for val in row if pd.notna(val)]
-                if cleaned_row:
-                    lines.append(' '.join(cleaned_row))
-            
-            return '\n'.join(lines)
+            with metrics.stage('frame_to_text'):
+                return CalendarFileProcessor.frame_to_text(df)
         except Exception as e:
             raise ValueError(f"Error extracting Excel file: {str(e)}")
     
     @staticmethod
-    def extract_from_csv(csv_path: str) -> str:
+    def extract_from_csv(csv_path: FileSource) -> str:
         """
         Extract calendar data from a CSV file.
         
         Args:
-            csv_path: Path to the CSV file
+            csv_path: Path, bytes or binary file-like object of the CSV file
             
         Returns:
             Formatted calendar text
         """
         try:
-            df = pd.read_csv(csv_path, header=None)
+            import pandas as pd
             
-            lines = []
-            for _, row in df.iterrows():
-                cleaned_row = [str(val).strip() for val in row if pd.notna(val)]
-                if cleaned_row:
-                    lines.append(' '.join(cleaned_row))
+            with metrics.stage('read_csv'):
+                df = pd.read_csv(_open_source(csv_path), header=None)
             
-            return '\n'.join(lines)
+            with metrics.stage('frame_to_text'):
+                return CalendarFileProcessor.frame_to_text(df)
         except Exception as e:
             raise ValueError(f"Error extracting CSV file: {str(e)}")
     
     @staticmethod
-    def process_file(file_path: str) -> str:
+    def process_file(file_path: str, pdf_jobs: Optional[int] = 1,
+                     progress: Optional[ProgressCallback] = None) -> str:
         """
         Process a calendar file based on its extension.
         
         Args:
             file_path: Path to the file
+            pdf_jobs: Worker processes used for PDF extraction
+            progress: Optional progress callback (pages for PDFs, rows for spreadsheets)
             
         Returns:
             Extracted calendar text
@@ -101,16 +457,61 @@ class CalendarFileProcessor:
         if not path.exists():
             raise FileNotFoundError(f"File not found: {file_path}")
         
-        suffix = path.suffix.lower()
+        return CalendarFileProcessor._extract(file_path, path.suffix, pdf_jobs, progress)
+    
+    @staticmethod
+    def process_stream(stream: Union[bytes, BinaryIO], filename: str,
+                       pdf_jobs: Optional[int] = 1,
+                       progress: Optional[ProgressCallback] = None) -> str:
+        """
+        Process an in-memory calendar file (bytes or a binary file-like object).
+        
+        Nothing is written to disk, except when parallel PDF extraction needs
+        a path for its worker processes (a unique temporary file is used).
+        
+        Args:
+            stream: File contents
+            filename: Original file name (used to pick the format)
+            pdf_jobs: Worker processes used for PDF extraction
+            progress: Optional progress callback (pages for PDFs, rows for spreadsheets)
+            
+        Returns:
+            Extracted calendar text
+        """
+        return CalendarFileProcessor._extract(stream, Path(filename).suffix, pdf_jobs, progress)
+    
+    @staticmethod
+    def _extract(source: FileSource, suffix: str, pdf_jobs: Optional[int],
+                 progress: Optional[ProgressCallback] = None) -> str:
+        """Dispatch extraction to the extractor registered for the file extension."""
+        extractor = get_extractor(suffix)
+        if not metrics.enabled and progress is None:
+            # Nothing to measure or report: no counter tracking around the extractor
+            return extractor(source, pdf_jobs, None)
+        
+        fmt = suffix.lower()[1:]
+        started = time.perf_counter()
+        counters = {}
+        
+        def track(**values) -> None:
+            counters.update(values)
+            if progress:
+                progress(**values)
         
-        if suffix == '.pdf':
-            return CalendarFileProcessor.extract_text_from_pdf(file_path)
-        elif suffix in ['.xlsx', '.xls']:
-            return CalendarFileProcessor.extract_from_excel(file_path)
-        elif suffix == '.csv':
-            return CalendarFileProcessor.extract_from_csv(file_path)
+        text = extractor(source, pdf_jobs, track)
+        
+        if 'pages_total' in counters:
+            metrics.record_throughput('pages', counters['pages_total'], time.perf_counter() - started)
         else:
-            raise ValueError(f"Unsupported file format: {suffix}")
+            rows = text.count('\n') + 1 if text else 0
+            if progress:
+                progress(rows_processed=rows, rows_total=rows)
+            metrics.record_throughput('rows', rows, time.perf_counter() - started, format=fmt)
+        
+        if metrics.enabled:
+            metrics.record_throughput('bytes', _source_size(source), time.perf_counter() - started,
+                                      format=fmt)
+        return text
     
     @staticmethod
     def detect_calendar_structure(text: str) -> Dict[str, any]:
@@ -138,43 +539,142 @@ class CalendarFileProcessor:
         return structure
 
 
-def batch_process_files(directory: str, pattern: str = "*") -> Dict[str, str]:
+@register_extractor('.pdf')
+def _extract_pdf(source: FileSource, pdf_jobs: Optional[int], progress: Optional[ProgressCallback]) -> str:
+    with metrics.stage('extract_pdf'):
+        return CalendarFileProcessor.extract_text_from_pdf(source, jobs=pdf_jobs, progress=progress)
+
+
+@register_extractor('.xlsx', '.xls')
+def _extract_excel(source: FileSource, pdf_jobs: Optional[int], progress: Optional[ProgressCallback]) -> str:
+    return CalendarFileProcessor.extract_from_excel(source)
+
+
+@register_extractor('.csv')
+def _extract_csv(source: FileSource, pdf_jobs: Optional[int], progress: Optional[ProgressCallback]) -> str:
+    return CalendarFileProcessor.extract_from_csv(source)
+
+
+def _process_batch_file(file_path: str) -> Dict[str, any]:
+    """
+    Process one file of a batch into a JSON-serializable record (runs in worker processes).
+    
+    Args:
+        file_path: Path to the file
+        
+    Returns:
+        Record with filename, text, structure, seconds and error
+    """
+    started = time.perf_counter()
+    record = {'filename': Path(file_path).name, 'text': None, 'structure': None, 'error': None}
+    try:
+        record['text'] = CalendarFileProcessor.process_file(file_path)
+        record['structure'] = CalendarFileProcessor.detect_calendar_structure(record['text'])
+    except Exception as e:
+        record['error'] = str(e)
+    record['seconds'] = round(time.perf_counter() - started, 4)
+    return record
+
+
+def iter_batch_process(directory: str, pattern: str = "*", jobs: Optional[int] = 1) -> Iterator[Dict[str, any]]:
+    """
+    Process the files of a directory, yielding one record per file as it finishes.
+    
+    With jobs > 1 files are processed by a process pool; only a bounded
+    number of files is in flight, so memory does not grow with the number
+    of files in the directory.
+    
+    Args:
+        directory: Path to the directory containing files
+        pattern: File pattern to match (e.g., "*.pdf", "*.xlsx")
+        jobs: Number of worker processes (None = CPU count, 1 = in-process)
+        
+    Yields:
+        Records as returned by ``_process_batch_file`` (completion order)
+    """
+    paths = (str(p) for p in sorted(Path(directory).glob(pattern)) if p.is_file())
+    
+    if jobs is None:
+        jobs = os.cpu_count() or 1
+    
+    if jobs <= 1:
+        for file_path in paths:
+            yield _process_batch_file(file_path)
+        return
+    
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        pending = set()
+        for file_path in paths:
+            pending.add(executor.submit(_process_batch_file, file_path))
+            if len(pending) >= 2 * jobs:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def batch_process_files(directory: str, pattern: str = "*", jobs: Optional[int] = 1) -> Dict[str, str]:
     """
     Process multiple calendar files in a directory.
     
     Args:
         directory: Path to the directory containing files
         pattern: File pattern to match (e.g., "*.pdf", "*.xlsx")
+        jobs: Number of worker processes (see ``iter_batch_process``)
         
     Returns:
         Dictionary with filename as key and extracted text as value
     """
     results = {}
-    path = Path(directory)
     
-    for file_path in path.glob(pattern):
-        try:
-            extracted_text = CalendarFileProcessor.process_file(str(file_path))
-            results[file_path.name] = extracted_text
-        except Exception as e:
-            results[file_path.name] = f"Error: {str(e)}"
+    for record in iter_batch_process(directory, pattern, jobs):
+        if record['error'] is None:
+            results[record['filename']] = record['text']
+        else:
+            results[record['filename']] = f"Error: {record['error']}"
     
     return results
 
 
-if __name__ == "__main__":
-    # Example usage
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    import argparse
+    import json
     import sys
     
-    if len(sys.argv) < 2:
-        print("Usage: python file_processor.py <file_path>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Extract calendar text from PDF, Excel or CSV files.")
+    parser.add_argument('file_path', nargs='?', help="File to process")
+    parser.add_argument('--batch', metavar='DIR', help="Process every file in DIR, one JSON line per file")
+    parser.add_argument('--pattern', default='*', help="File pattern for --batch (default: *)")
+    parser.add_argument('--jobs', type=int, default=1, help="Worker processes for --batch (0 = CPU count)")
+    parser.add_argument('--output', metavar='FILE', help="Write JSON lines to FILE instead of stdout")
+    args = parser.parse_args(argv)
+    
+    if args.batch:
+        out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+        errors = 0
+        try:
+            for record in iter_batch_process(args.batch, args.pattern, args.jobs or None):
+                errors += record['error'] is not None
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+                out.flush()
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        return 1 if errors else 0
+    
+    if not args.file_path:
+        parser.print_usage()
+        return 1
     
-    file_path = sys.argv[1]
     processor = CalendarFileProcessor()
     
     try:
-        extracted_text = processor.process_file(file_path)
+        extracted_text = processor.process_file(args.file_path)
         print("Extracted text:")
         print(extracted_text)
         
@@ -184,4 +684,10 @@ if __name__ == "__main__":
         print(structure)
     except Exception as e:
         print(f"Error: {e}")
-        sys.exit(1)
+        return 1
+    
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
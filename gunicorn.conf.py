@@ -0,0 +1,35 @@
+"""
+Gunicorn settings for the production entry point (``gunicorn -c gunicorn.conf.py wsgi:app``).
+
+Every value can be overridden with an environment variable:
+
+    WEB_BIND         address to listen on (default 0.0.0.0:5000)
+    WEB_WORKERS      worker processes (default: CPU count)
+    WEB_THREADS      request threads per worker (default 4)
+    WEB_TIMEOUT      seconds before a silent worker is restarted (default 120)
+    WEB_MAX_REQUESTS restart a worker after this many requests (default 0 = never)
+    WEB_ACCESS_LOG   access log file ('-' = stderr, the default; empty disables it)
+
+Heavy extractions are additionally capped per worker by
+MAX_CONCURRENT_EXTRACTIONS (see app.py). Analysis sessions and background
+jobs live in the memory of the worker that created them, so clients using
+/api/sessions or /api/jobs need WEB_WORKERS=1 (scale with threads) or
+worker affinity in the load balancer. Likewise /metrics, Server-Timing and
+/api/budget report only the worker that served the request.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('WEB_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('WEB_THREADS', '4'))
+worker_class = 'gthread'
+timeout = int(os.environ.get('WEB_TIMEOUT', '120'))
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', '0'))
+max_requests_jitter = max_requests // 10
+
+# Import wsgi (and run its warm-up) in the master, before forking workers
+preload_app = True
+
+accesslog = os.environ.get('WEB_ACCESS_LOG', '-') or None
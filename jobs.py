@@ -0,0 +1,164 @@
+"""
+In-process background job queue for long-running uploads, analyses and exports.
+
+Jobs run on a bounded thread pool. Clients receive a job id immediately,
+poll its status (including progress counters) and fetch the result, which
+is kept for a limited time. Everything runs in-process: no external broker
+is required.
+"""
+
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+
+# Exceptions caused by the submitted payload rather than by the server
+CLIENT_ERRORS = (ValueError, KeyError)
+
+
+class JobQueueFull(Exception):
+    """Raised when the number of queued jobs exceeds the configured limit (retry after ``retry_after`` seconds)."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class Job:
+    """State of a background job."""
+
+    def __init__(self, kind: str):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = 'queued'  # queued -> running -> done | error
+        self.progress: Dict[str, any] = {}
+        self.created = time.time()
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.error: Optional[str] = None
+        self.client_error = False  # The job failed on bad input (see CLIENT_ERRORS)
+        self.traceback: Optional[str] = None
+        self.result: any = None
+        self._lock = threading.Lock()
+
+    def update_progress(self, **counters) -> None:
+        """Merge progress counters (e.g. pages_processed=3, pages_total=120)."""
+        with self._lock:
+            self.progress.update(counters)
+
+    def to_dict(self) -> Dict[str, any]:
+        """Return the public status of the job."""
+        with self._lock:
+            progress = dict(self.progress)
+        return {
+            'jobId': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'progress': progress,
+            'created': self.created,
+            'started': self.started,
+            'finished': self.finished,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """Bounded background worker pool with result expiry."""
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 32, result_ttl: float = 3600):
+        """
+        Args:
+            max_workers: Jobs executed concurrently
+            max_pending: Maximum jobs queued or running before submissions are rejected
+            result_ttl: Seconds a finished job (and its result) is kept
+        """
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.max_workers = max_workers
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._average_seconds = 1.0  # Moving average of job run times
+
+    def submit(self, kind: str, func: Callable[..., any], *args, **kwargs) -> Job:
+        """
+        Queue a job.
+
+        ``func`` is called as ``func(*args, progress=job.update_progress, **kwargs)``
+        and its return value becomes the job result.
+
+        Args:
+            kind: Job type label ('upload', 'analyze', 'export')
+            func: Work to run
+
+        Returns:
+            The queued job
+
+        Raises:
+            JobQueueFull: If too many jobs are pending (with an estimated wait)
+        """
+        self.expire()
+        job = Job(kind)
+
+        with self._lock:
+            active = sum(1 for j in self._jobs.values() if j.status in ('queued', 'running'))
+            if active >= self.max_pending:
+                retry_after = max(1, round(active / max(1, self.max_workers) * self._average_seconds))
+                raise JobQueueFull(f'Too many pending jobs ({active})', retry_after)
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def _run(self, job: Job, func: Callable[..., any], args: tuple, kwargs: dict) -> None:
+        job.status = 'running'
+        job.started = time.time()
+        try:
+            job.result = func(*args, progress=job.update_progress, **kwargs)
+            job.finished = time.time()
+            job.status = 'done'
+        except CLIENT_ERRORS as e:
+            job.error = str(e)
+            job.client_error = True
+            job.finished = time.time()
+            job.status = 'error'
+        except Exception as e:
+            job.error = str(e)
+            job.traceback = traceback.format_exc()
+            job.finished = time.time()
+            job.status = 'error'
+        with self._lock:
+            self._average_seconds = 0.8 * self._average_seconds + 0.2 * (job.finished - job.started)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Return a job by id (None if unknown or expired)."""
+        self.expire()
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def expire(self) -> int:
+        """
+        Drop finished jobs older than the result TTL.
+
+        Returns:
+            Number of jobs removed
+        """
+        now = time.time()
+        with self._lock:
+            expired = [job for job in self._jobs.values()
+                       if job.finished is not None and now - job.finished > self.result_ttl]
+            for job in expired:
+                del self._jobs[job.id]
+
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number of jobs per status."""
+        counts = {'queued': 0, 'running': 0, 'done': 0, 'error': 0}
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job.status] += 1
+        return counts
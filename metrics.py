@@ -0,0 +1,214 @@
+"""
+Lightweight timing and counters exposed as Server-Timing headers and Prometheus text.
+
+Code wraps each stage in ``metrics.stage('name')``. The duration is added to
+a latency histogram and, while a request is being served, to the request's
+Server-Timing list. With ``METRICS_ENABLED=0`` every call returns
+immediately (``stage`` hands out a shared no-op context manager), so the
+instrumentation costs next to nothing.
+
+The registry is per process: under several gunicorn workers, /metrics shows
+the counters of whichever worker answers the scrape.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional, Tuple
+
+ENABLED = os.environ.get('METRICS_ENABLED', '1').lower() not in ('0', 'false', 'no')
+PREFIX = 'sched_'
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NOOP = nullcontext()
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Thread-safe store of histograms, counters and gauges."""
+
+    def __init__(self, enabled: bool = ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self._help: Dict[str, str] = {}
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    def describe(self, name: str, text: str) -> None:
+        """Set the HELP text of a metric family."""
+        self._help[name] = text
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Add a value to a histogram."""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._histograms.setdefault(name, {})
+            histogram = family.get(key)
+            if histogram is None:
+                histogram = family[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name: str, value: float = 1, **labels) -> None:
+        """Increase a counter."""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            family = self._counters.setdefault(name, {})
+            family[key] = family.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels) -> None:
+        """Set a gauge."""
+        if not self.enabled:
+            return
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def stage(self, name: str):
+        """
+        Time a block as a named stage.
+
+        Usage: ``with metrics.stage('extract_pdf'): ...``
+        """
+        if not self.enabled:
+            return _NOOP
+        return self._timed_stage(name)
+
+    @contextmanager
+    def _timed_stage(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.observe('stage_seconds', elapsed, stage=name)
+            timings = getattr(self._local, 'timings', None)
+            if timings is not None:
+                timings.append((name, elapsed))
+
+    def record_throughput(self, unit: str, amount: int, seconds: float, **labels) -> None:
+        """Count processed pages/rows/bytes and set the last observed rate per second."""
+        if not self.enabled:
+            return
+        self.inc(f'{unit}_processed_total', amount, **labels)
+        if seconds > 0:
+            self.set_gauge(f'{unit}_per_second', amount / seconds, **labels)
+
+    # ------------------------------------------------------------------
+    # Per-request Server-Timing
+    # ------------------------------------------------------------------
+
+    def begin_request(self) -> None:
+        """Start collecting stage timings for the current thread's request."""
+        if self.enabled:
+            self._local.timings = []
+            self._local.started = time.perf_counter()
+
+    def end_request(self) -> Optional[Tuple[List[Tuple[str, float]], float]]:
+        """
+        Stop collecting and return (stage timings, total seconds).
+
+        Returns:
+            None when disabled or no request was started on this thread
+        """
+        timings = getattr(self._local, 'timings', None)
+        if timings is None:
+            return None
+        total = time.perf_counter() - self._local.started
+        self._local.timings = None
+        return timings, total
+
+    @staticmethod
+    def server_timing(timings: List[Tuple[str, float]], total: float) -> str:
+        """Format a Server-Timing header value (durations in milliseconds)."""
+        entries = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings]
+        entries.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(entries)
+
+    # ------------------------------------------------------------------
+    # Exposition
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+        items = key + extra
+        if not items:
+            return ''
+        return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in items) + '}'
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, family in sorted(self._histograms.items()):
+                full = PREFIX + name
+                lines.append(f'# HELP {full} {self._help.get(name, name)}')
+                lines.append(f'# TYPE {full} histogram')
+                for key, histogram in sorted(family.items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{full}_bucket{self._labels(key, (("le", repr(bound)),))} {cumulative}')
+                    lines.append(f'{full}_bucket{self._labels(key, (("le", "+Inf"),))} {histogram.count}')
+                    lines.append(f'{full}_sum{self._labels(key)} {histogram.sum:.6f}')
+                    lines.append(f'{full}_count{self._labels(key)} {histogram.count}')
+
+            for kind, families in (('counter', self._counters), ('gauge', self._gauges)):
+                for name, family in sorted(families.items()):
+                    full = PREFIX + name
+                    lines.append(f'# HELP {full} {self._help.get(name, name)}')
+                    lines.append(f'# TYPE {full} {kind}')
+                    for key, value in sorted(family.items()):
+                        lines.append(f'{full}{self._labels(key)} {value:g}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = MetricsRegistry()
+metrics.describe('stage_seconds', 'Duration of processing stages in seconds')
+metrics.describe('request_seconds', 'Request latency in seconds by endpoint')
+metrics.describe('errors_total', 'Responses with status >= 400 by endpoint and status')
+metrics.describe('bytes_processed_total', 'Bytes of uploaded files extracted, by format')
+metrics.describe('pages_processed_total', 'PDF pages extracted')
+metrics.describe('rows_processed_total', 'Spreadsheet rows extracted, by format')
+metrics.describe('pages_per_second', 'Pages per second of the last PDF extraction')
+metrics.describe('rows_per_second', 'Rows per second of the last spreadsheet extraction')
+metrics.describe('bytes_per_second', 'Bytes per second of the last extraction, by format')
+metrics.describe('export_rows_total', 'Worker and monthly rows exported, by format')
+metrics.describe('budget_bytes_in_use', 'Estimated memory held by running extractions')
+metrics.describe('extractions_active', 'Extractions running')
+metrics.describe('extractions_waiting', 'Extractions queued for budget')
+metrics.describe('admission_rejected_total', 'Extractions rejected by admission control, by reason')
@@ -0,0 +1,236 @@
+"""
+Worker-name normalization with memoization and typo suggestions.
+
+The mapping text (``alias=NAME`` lines) is compiled once into exact,
+case-folded and accent-folded lookup tables, plus a deletion index used to
+find names within a small edit distance. Results are memoized per raw
+token for a whole document, and every token's occurrences are counted so
+that unresolved tokens (likely PDF typos creating phantom workers) can be
+reported with a suggested mapping line.
+"""
+
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+MIN_SUGGESTION_LENGTH = 4  # Shorter tokens (initials, short surnames) are never matched fuzzily
+TYPO_FREQUENCY_RATIO = 5  # A document name is a typo target only if this many times more frequent
+
+
+def fold(text: str) -> str:
+    """Upper-case and strip accents (``García`` -> ``GARCIA``)."""
+    decomposed = unicodedata.normalize('NFKD', text.upper())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def max_distance(text: str) -> int:
+    """Edit distance tolerated for a name of this length."""
+    if len(text) < MIN_SUGGESTION_LENGTH:
+        return 0
+    return 1 if len(text) <= 6 else 2
+
+
+def _deletes(word: str, depth: int) -> Set[str]:
+    """All strings obtained by deleting up to ``depth`` characters from ``word``."""
+    result = {word}
+    frontier = {word}
+    for _ in range(depth):
+        frontier = {item[:i] + item[i + 1:] for item in frontier for i in range(len(item))}
+        result |= frontier
+    return result
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (adjacent transpositions count as one edit).
+
+    Returns:
+        The distance, or ``limit + 1`` as soon as it is known to exceed ``limit``
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+
+    previous_previous = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and i > 1 and j > 1 and
+                    a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous_previous, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+class CandidateIndex:
+    """Deletion index answering "which names are within distance d of this token"."""
+
+    def __init__(self, names: Iterable[str] = (), depth: int = 2):
+        self.depth = depth
+        self._deletes: Dict[str, Set[str]] = {}
+        self.names: Dict[str, str] = {}  # folded -> original
+
+        for name in names:
+            self.add(name)
+
+    def add(self, name: str) -> None:
+        folded = fold(name)
+        if folded in self.names or len(folded) < MIN_SUGGESTION_LENGTH:
+            return
+        self.names[folded] = name
+        for variant in _deletes(folded, self.depth):
+            self._deletes.setdefault(variant, set()).add(folded)
+
+    def lookup(self, token: str) -> List[Tuple[str, int]]:
+        """
+        Return (name, distance) pairs within the distance tolerated for ``token``.
+
+        The token itself is not returned.
+        """
+        folded = fold(token)
+        limit = min(max_distance(folded), self.depth)
+        if not limit:
+            return []
+
+        candidates: Set[str] = set()
+        for variant in _deletes(folded, limit):
+            candidates |= self._deletes.get(variant, set())
+        candidates.discard(folded)
+
+        matches = []
+        for candidate in candidates:
+            distance = edit_distance(folded, candidate, limit)
+            if distance <= limit:
+                matches.append((self.names[candidate], distance))
+        matches.sort(key=lambda match: (match[1], match[0]))
+        return matches
+
+
+class NameNormalizer:
+    """Resolve raw worker tokens to canonical names using the mapping text."""
+
+    def __init__(self, mapping_text: str = ''):
+        self.exact: Dict[str, str] = {}
+        self.upper: Dict[str, str] = {}
+        self.folded: Dict[str, str] = {}
+        for line in (mapping_text or '').split('\n'):
+            parts = [part.strip() for part in line.split('=')]
+            if len(parts) >= 2 and parts[0] and parts[1]:
+                self.exact[parts[0]] = parts[1]
+                self.upper[parts[0].upper()] = parts[1]
+                self.folded.setdefault(fold(parts[0]), parts[1])
+        self._approx = [(key.upper(), value) for key, value in self.exact.items()]
+        self.targets = CandidateIndex(self.exact.values())
+
+        self._cache: Dict[str, Optional[str]] = {}
+        self._unresolved: Set[str] = set()
+        self.counts: Dict[str, int] = {}  # raw token -> occurrences seen
+
+    def _resolve(self, name: str) -> Optional[str]:
+        trimmed = name.strip()
+        upper = trimmed.upper()
+
+        if trimmed in self.exact:
+            return self.exact[trimmed]
+        if upper in self.upper:
+            return self.upper[upper]
+
+        folded = fold(trimmed)
+        if folded in self.folded:
+            return self.folded[folded]
+
+        for key, value in self._approx:
+            if key in upper or upper in key:
+                return value
+
+        self._unresolved.add(name)
+        return trimmed
+
+    def normalize(self, name: str) -> Optional[str]:
+        """Return the canonical name for a token (or the trimmed token itself)."""
+        if not name:
+            return None
+        self.counts[name] = self.counts.get(name, 0) + 1
+        try:
+            return self._cache[name]
+        except KeyError:
+            result = self._cache[name] = self._resolve(name) or None
+            return result
+
+    def normalize_many(self, names: Iterable[str]) -> List[Optional[str]]:
+        """Normalize a whole row of tokens (empty or unresolvable entries become None)."""
+        cache = self._cache
+        counts = self.counts
+        result = []
+        for name in names:
+            if not name:
+                result.append(None)
+                continue
+            counts[name] = counts.get(name, 0) + 1
+            if name not in cache:
+                cache[name] = self._resolve(name) or None
+            result.append(cache[name])
+        return result
+
+    def suggestions(self, counts: Optional[Dict[str, int]] = None) -> List[Dict[str, any]]:
+        """
+        Suggest mapping lines for tokens no mapping entry resolved.
+
+        A token is matched against the canonical names of the mapping and
+        against much more frequent names of the same document, within a small
+        edit distance (case and accents ignored).
+
+        Args:
+            counts: Occurrences per raw token (defaults to the tokens seen so far)
+
+        Returns:
+            Suggestions sorted by occurrences: token, suggestion, distance,
+            occurrences and the mapping line to add
+        """
+        counts = self.counts if counts is None else counts
+        for token in counts:
+            if token not in self._cache:
+                self._cache[token] = self._resolve(token) or None
+
+        # Occurrences per resulting name
+        frequency: Dict[str, int] = {}
+        for token, count in counts.items():
+            name = self._cache.get(token)
+            if name:
+                frequency[name] = frequency.get(name, 0) + count
+
+        # Most frequent spelling first, so it represents its case/accent variants
+        index = CandidateIndex(self.targets.names.values())
+        for name in sorted(frequency, key=lambda n: -frequency[n]):
+            index.add(name)
+
+        result = []
+        for name in {self._cache.get(token) for token in self._unresolved if counts.get(token)}:
+            if not name:
+                continue
+
+            candidates = index.lookup(name)
+            variant = index.names.get(fold(name))
+            if variant is not None and variant != name:
+                candidates.insert(0, (variant, 0))
+
+            for candidate, distance in candidates:
+                # Canonical mapping names always qualify; document names only if much more
+                # frequent (similar surnames of two real workers are not typos)
+                if (fold(candidate) in self.targets.names or
+                        frequency.get(candidate, 0) >= frequency[name] * TYPO_FREQUENCY_RATIO):
+                    result.append({
+                        'token': name,
+                        'suggestion': candidate,
+                        'distance': distance,
+                        'occurrences': frequency[name],
+                        'mappingLine': f'{name}={candidate}'
+                    })
+                    break
+
+        result.sort(key=lambda item: (-item['occurrences'], item['token']))
+        return result
@@ -0,0 +1,223 @@
+"""
+Layout-aware extraction of calendar grids from PDF pages.
+
+Instead of reconstructing the page's text (``page.extract_text``) and
+letting the parser guess which name belongs to which day from whitespace,
+the words of a page are placed with their coordinates: lines made only of
+day numbers start a week block, the 7 day columns are anchored on those
+numbers, and every word below is binned into its column and into one of the
+4 position rows. Titles, footers and anything outside the week blocks are
+ignored, so only the calendar region is kept.
+
+Each week is emitted as tab-separated lines (one cell per column, empty
+cells kept) that the text parser reads cell by cell. Pages that do not look
+like a column-aligned grid return None so the caller can fall back to plain
+text extraction.
+"""
+
+import re
+from bisect import bisect_right
+from statistics import median
+from typing import Dict, List, Optional, Sequence
+
+DAYS_PER_WEEK = 7
+POSITIONS = 4  # Worker rows per week block
+
+PLAIN_TEXT_Y_TOLERANCE = 3  # pdfplumber's default line tolerance for extract_text
+
+_DAY_NUMBER = re.compile(r'^\d{1,2}$')
+
+Word = Dict[str, any]  # pdfplumber word: text, x0, x1, top, bottom
+
+
+def _center(word: Word) -> float:
+    return (word['x0'] + word['x1']) / 2
+
+
+def group_lines(words: Sequence[Word], tolerance: float) -> List[List[Word]]:
+    """Group words into text lines by their top coordinate (each line sorted left to right)."""
+    lines: List[List[Word]] = []
+    line_top = None
+    for word in sorted(words, key=lambda w: (w['top'], w['x0'])):
+        if line_top is None or word['top'] - line_top > tolerance:
+            lines.append([])
+            line_top = word['top']
+        lines[-1].append(word)
+    for line in lines:
+        line.sort(key=lambda w: w['x0'])
+    return lines
+
+
+def _is_days_line(line: List[Word]) -> bool:
+    return (len(line) <= DAYS_PER_WEEK and
+            all(_DAY_NUMBER.match(word['text']) and 1 <= int(word['text']) <= 31 for word in line))
+
+
+def _column_boundaries(anchors: List[float], words: Sequence[Word]) -> List[float]:
+    """
+    Place a boundary between each pair of adjacent column anchors.
+
+    The boundary is the middle of the widest horizontal gap not covered by
+    any word between the two anchors (the gutter between columns), which
+    works for left-aligned as well as centered cells.
+    """
+    intervals = sorted((word['x0'], word['x1']) for word in words)
+    covered: List[List[float]] = []
+    for x0, x1 in intervals:
+        if covered and x0 <= covered[-1][1]:
+            covered[-1][1] = max(covered[-1][1], x1)
+        else:
+            covered.append([x0, x1])
+
+    boundaries = []
+    for left, right in zip(anchors, anchors[1:]):
+        best, best_width = (left + right) / 2, 0.0
+        cursor = left
+        for x0, x1 in covered + [[right, right]]:
+            if x1 <= cursor:
+                continue
+            if x0 >= right:
+                x0 = right
+            if x0 - cursor > best_width:
+                best, best_width = (cursor + x0) / 2, x0 - cursor
+            cursor = max(cursor, x1)
+            if cursor >= right:
+                break
+        boundaries.append(best)
+    return boundaries
+
+
+def _merge_rows(rows: List[List[Word]], count: int) -> List[List[Word]]:
+    """Merge the vertically closest lines (wrapped names) until ``count`` rows remain."""
+    rows = [list(row) for row in rows]
+    while len(rows) > count:
+        gaps = [rows[i + 1][0]['top'] - max(w['bottom'] for w in rows[i]) for i in range(len(rows) - 1)]
+        index = gaps.index(min(gaps))
+        rows[index:index + 2] = [rows[index] + rows[index + 1]]
+    return rows
+
+
+def _position_rows(days_top: float, rows: List[List[Word]], pitch: float) -> List[List[Word]]:
+    """
+    Assign the lines below a days line to the 4 position rows.
+
+    Rows without any word (nobody at that position all week) produce no
+    line, so lines are placed by their distance from the days line; extra
+    lines are wrapped names and are merged into their row.
+    """
+    if len(rows) > POSITIONS:
+        return _merge_rows(rows, POSITIONS)
+    slots = [min(POSITIONS, max(1, round((row[0]['top'] - days_top) / pitch))) - 1 for row in rows]
+    if slots != sorted(set(slots)):
+        return rows + [[] for _ in range(POSITIONS - len(rows))]  # Irregular spacing: keep reading order
+    positioned: List[List[Word]] = [[] for _ in range(POSITIONS)]
+    for slot, row in zip(slots, rows):
+        positioned[slot] = row
+    return positioned
+
+
+def words_to_lines(words: Sequence[Word]) -> Optional[List[str]]:
+    """
+    Bin positioned words into week blocks.
+
+    Args:
+        words: Words of one page (``page.extract_words()``)
+
+    Returns:
+        Tab-separated calendar lines (days line plus 4 worker rows per week),
+        or None if no column-aligned calendar grid was found
+    """
+    if not words:
+        return None
+
+    tolerance = median(word['bottom'] - word['top'] for word in words) / 2
+    lines = group_lines(words, tolerance)
+
+    starts = [index for index, line in enumerate(lines)
+              if _is_days_line(line) and index + 1 < len(lines) and not _is_days_line(lines[index + 1])]
+    if not starts:
+        return None
+
+    # Row pitch inside week blocks; lines further below the days line than the
+    # block height (footers) are not part of the last block
+    pitch = median(lines[i + 1][0]['top'] - lines[i][0]['top']
+                   for start, end in zip(starts, starts[1:] + [len(lines)])
+                   for i in range(start, min(end, start + POSITIONS + 1) - 1))
+    max_offset = (POSITIONS + 0.75) * pitch
+
+    weeks = []
+    for start, end in zip(starts, starts[1:] + [len(lines)]):
+        days_top = lines[start][0]['top']
+        rows = [line for line in lines[start + 1:end] if line[0]['top'] - days_top <= max_offset]
+        weeks.append((lines[start], _position_rows(days_top, rows, pitch)))
+
+    # Column anchors: median centers of the full weeks on the page
+    full = [days for days, _ in weeks if len(days) == DAYS_PER_WEEK]
+    anchors = [median(_center(days[column]) for days in full) for column in range(DAYS_PER_WEEK)] if full else None
+
+    output = []
+    for days, rows in weeks:
+        if anchors is not None:
+            week_anchors = anchors
+            columns = [min(range(DAYS_PER_WEEK), key=lambda c: abs(anchors[c] - _center(word))) for word in days]
+            if len(set(columns)) != len(columns):
+                return None
+        else:
+            # No full week to anchor on: columns in reading order, as the text parser does
+            week_anchors = [_center(word) for word in days]
+            columns = list(range(len(days)))
+        n_columns = len(week_anchors)
+        if n_columns < 2:
+            return None
+
+        row_words = [word for row in rows for word in row]
+        column_width = (week_anchors[-1] - week_anchors[0]) / (n_columns - 1)
+        if any(word['x1'] < week_anchors[0] - column_width or word['x0'] > week_anchors[-1] + column_width
+               for word in row_words):
+            return None  # Names spread far beyond the day columns: not a grid
+
+        boundaries = _column_boundaries(week_anchors, list(days) + row_words)
+
+        day_cells = [''] * n_columns
+        for word, column in zip(days, columns):
+            day_cells[column] = word['text']
+        output.append('\t'.join(day_cells))
+
+        for row in rows:
+            cells: List[List[Word]] = [[] for _ in range(n_columns)]
+            for word in row:
+                cells[bisect_right(boundaries, _center(word))].append(word)
+            output.append('\t'.join(
+                ' '.join(w['text'] for w in sorted(cell, key=lambda w: (w['top'], w['x0'])))
+                for cell in cells
+            ))
+
+    return output
+
+
+def words_to_text(words: Sequence[Word]) -> str:
+    """Plain text of the words, one line per text line (same output as ``page.extract_text()``)."""
+    from pdfplumber.utils import cluster_objects
+
+    lines = cluster_objects(list(words), 'top', PLAIN_TEXT_Y_TOLERANCE)
+    return '\n'.join(' '.join(word['text'] for word in line) for line in lines)
+
+
+def page_calendar_text(page, layout: bool = True) -> str:
+    """
+    Extract the calendar text of a pdfplumber page.
+
+    Args:
+        page: pdfplumber page
+        layout: Bin words into the week grid (pages without a grid fall back
+            to plain text built from the same words, so characters are only
+            grouped into words once)
+
+    Returns:
+        Page text ('' for pages without text)
+    """
+    if not layout:
+        return page.extract_text() or ''
+    words = page.extract_words()
+    lines = words_to_lines(words)
+    return '\n'.join(lines) if lines is not None else words_to_text(words)
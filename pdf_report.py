@@ -0,0 +1,214 @@
+"""
+PDF report rendering for shift analysis exports.
+
+Paragraph and table styles are built once per process and shared by every
+report. Long worker tables are laid out in page-sized chunks with fixed row
+heights, so ReportLab neither measures every cell nor re-splits one huge
+table on each page.
+"""
+
+from datetime import datetime
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus.flowables import Flowable
+
+from csv_export import GLOBAL_HEADER
+from shift_analyzer import months_with_data
+
+
+PAGE_MARGIN = 0.5 * inch
+FRAME_PADDING = 6  # SimpleDocTemplate frame padding (points, each side)
+FRAME_WIDTH = A4[0] - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+FRAME_HEIGHT = A4[1] - 2 * PAGE_MARGIN - 2 * FRAME_PADDING
+GLOBAL_ROW_HEIGHT = 16
+MONTHLY_ROW_HEIGHT = 15
+
+GLOBAL_COL_WIDTHS = [1.3*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.6*inch, 0.9*inch, 0.6*inch]
+
+_styles: Optional[Dict[str, any]] = None
+
+
+def _table_style(header_font_size: int, body_font_size: int) -> TableStyle:
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#374151')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), header_font_size),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTSIZE', (0, 1), (-1, -1), body_font_size),
+        ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f3f4f6')])
+    ])
+
+
+def get_styles() -> Dict[str, any]:
+    """Return the shared paragraph and table styles (built on first use)."""
+    global _styles
+    if _styles is None:
+        sample = getSampleStyleSheet()
+        _styles = {
+            'title': ParagraphStyle(
+                'CustomTitle',
+                parent=sample['Heading1'],
+                fontSize=14,
+                textColor=colors.HexColor('#1f2937'),
+                spaceAfter=6,
+                alignment=1  # Center
+            ),
+            'normal': sample['Normal'],
+            'heading': sample['Heading2'],
+            'global_table': _table_style(9, 8),
+            'monthly_table': _table_style(8, 7)
+        }
+    return _styles
+
+
+class _RowsRendered(Flowable):
+    """Zero-size marker placed after a table chunk: reports the rows drawn so far when it is reached."""
+
+    def __init__(self, progress: Callable[..., None], rows_rendered: int, rows_total: int):
+        super().__init__()
+        self.progress = progress
+        self.rows_rendered = rows_rendered
+        self.rows_total = rows_total
+
+    def wrap(self, available_width: float, available_height: float):
+        return 0, 0
+
+    def draw(self) -> None:
+        self.progress(rows_rendered=self.rows_rendered, rows_total=self.rows_total)
+
+
+def _used_height(flowables: list) -> float:
+    """Height taken by flowables placed at the top of a frame."""
+    used = 0
+    for index, flowable in enumerate(flowables):
+        if index:
+            used += flowable.getSpaceBefore()
+        used += flowable.wrap(FRAME_WIDTH, FRAME_HEIGHT)[1] + flowable.getSpaceAfter()
+    return used
+
+
+def _chunked_tables(header: List[str], rows: List[List[str]], col_widths: List[float],
+                    row_height: int, style: TableStyle, used: float = 0) -> List[Tuple[Table, int]]:
+    """
+    Split a long table into page-sized tables with fixed row heights.
+
+    The first chunk fills what is left of the current page (``used`` points
+    are already taken) and each following chunk fills exactly one page, so
+    every page starts with a header and no table has to be re-split.
+
+    Returns:
+        Tables with the number of data rows each one holds
+    """
+    per_page = max(1, int(FRAME_HEIGHT // row_height) - 1)
+    # Header plus one row of slack: a slightly short first page is better than a split
+    first = max(1, int((FRAME_HEIGHT - used) // row_height) - 2)
+
+    tables = []
+    bounds = [0] + list(range(first, len(rows), per_page)) + [len(rows)]
+    for start, stop in zip(bounds, bounds[1:]):
+        chunk = [header] + rows[start:stop]
+        table = Table(chunk, colWidths=col_widths, rowHeights=[row_height] * len(chunk), repeatRows=1)
+        table.setStyle(style)
+        tables.append((table, stop - start))
+    return tables
+
+
+def render_pdf_report(output: BinaryIO, workers: List[Dict[str, any]], monthly_data: List[Dict[str, any]],
+                      period: str, progress: Optional[Callable[..., None]] = None) -> None:
+    """
+    Render the PDF report with the global summary and the monthly breakdown.
+
+    Args:
+        output: Binary stream the PDF is written to
+        workers: Worker statistics
+        monthly_data: Monthly breakdown per worker
+        period: Analysis period shown in the title
+        progress: Optional callback receiving pages_rendered and rows_rendered/rows_total
+            (rows are reported as each page-sized table chunk is drawn)
+    """
+    styles = get_styles()
+    rows_total = len(workers) + len(monthly_data)
+    rows_added = 0
+
+    def add_tables(tables: List[Tuple[Table, int]]) -> None:
+        # With a progress callback, each page-sized chunk reports its rows once drawn
+        nonlocal rows_added
+        for table, rows in tables:
+            story.append(table)
+            rows_added += rows
+            if progress:
+                story.append(_RowsRendered(progress, rows_added, rows_total))
+
+    # A4 Portrait (210 x 297 mm)
+    doc = SimpleDocTemplate(output, pagesize=A4, topMargin=PAGE_MARGIN, bottomMargin=PAGE_MARGIN,
+                            leftMargin=PAGE_MARGIN, rightMargin=PAGE_MARGIN)
+    story = []
+
+    # Title
+    story.append(Paragraph(f"Análisis de Guardias - {period}", styles['title']))
+    story.append(Paragraph(f"Generado: {datetime.now().strftime('%d/%m/%Y %H:%M')}", styles['normal']))
+    story.append(Spacer(1, 0.2*inch))
+
+    # GLOBAL DATA SECTION
+    story.append(Paragraph("1. Resumen Global", styles['heading']))
+    story.append(Spacer(1, 0.1*inch))
+
+    global_rows = [
+        [
+            worker['name'],
+            str(worker.get('total', 0)),
+            str(worker.get('friday', 0)),
+            str(worker.get('saturday', 0)),
+            str(worker.get('sunday', 0)),
+            f"{worker.get('weekendPercentage', 0)}%",
+            str(worker.get('lastPosition', 0))
+        ]
+        for worker in workers
+    ]
+    add_tables(_chunked_tables(GLOBAL_HEADER, global_rows, GLOBAL_COL_WIDTHS,
+                               GLOBAL_ROW_HEIGHT, styles['global_table'], _used_height(story)))
+    story.append(Spacer(1, 0.2*inch))
+
+    # MONTHLY DATA SECTION (if available)
+    if monthly_data:
+        story.append(PageBreak())
+        section_start = len(story)
+        story.append(Paragraph("2. Desglose Mensual", styles['heading']))
+        story.append(Spacer(1, 0.1*inch))
+
+        # Only months with data (non-zero totals)
+        all_months = months_with_data(monthly_data)
+
+        if all_months:
+            monthly_rows = []
+            for worker_data in monthly_data:
+                values = [worker_data.get(month, 0) for month in all_months]
+                monthly_rows.append([worker_data['name']] + [str(v) for v in values] + [str(sum(values))])
+
+            # Adjust column widths for portrait (A4 is ~6.5 inches wide minus margins)
+            col_width = 3.5 / (len(all_months) + 2)
+            col_widths = [1.2*inch] + [col_width*inch] * len(all_months) + [0.6*inch]
+
+            add_tables(_chunked_tables(['Médico'] + all_months + ['Total'], monthly_rows, col_widths,
+                                       MONTHLY_ROW_HEIGHT, styles['monthly_table'],
+                                       _used_height(story[section_start:])))
+
+    # Build PDF, reporting pages as they are laid out
+    def on_page(canvas, document):
+        if progress:
+            progress(pages_rendered=document.page)
+
+    if progress:
+        progress(rows_rendered=0, rows_total=rows_total)
+    doc.build(story, onFirstPage=on_page, onLaterPages=on_page)
+    if progress:
+        progress(rows_rendered=rows_total, rows_total=rows_total)
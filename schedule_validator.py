@@ -0,0 +1,236 @@
+"""
+Rule-based validation of parsed schedules.
+
+All rules are checked in one pass over the days. Per-worker state (the last
+day worked and the running count of the current week/month) is kept in flat
+arrays indexed by worker id, so validation is linear in the schedule length.
+This extends the consecutive-shift check of ``validationWarnings`` in
+CalendarAnalyzer.jsx.
+"""
+
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Union
+
+from day_types import WEEKEND, day_type_codes
+from shift_analyzer import CalendarParser, ParsedCalendar, parse_holidays
+
+
+WEEKDAY_NAMES = ['lunes', 'martes', 'miércoles', 'jueves', 'viernes', 'sábado', 'domingo']
+MONTH_NAMES = ['enero', 'febrero', 'marzo', 'abril', 'mayo', 'junio', 'julio',
+               'agosto', 'septiembre', 'octubre', 'noviembre', 'diciembre']
+
+
+def _format_day(day: date) -> str:
+    """Format like ``toLocaleDateString('es-ES', {weekday: 'long', day: 'numeric', month: 'numeric'})``."""
+    return f"{WEEKDAY_NAMES[day.weekday()]}, {day.day}/{day.month}"
+
+
+def _format_month(month_index: int) -> str:
+    year, month = divmod(month_index, 12)
+    return f"{MONTH_NAMES[month]} {year}"
+
+
+class ValidationRules:
+    """Configurable limits (None disables a rule)."""
+
+    def __init__(self, min_rest_days: Optional[int] = 1, max_shifts_per_week: Optional[int] = None,
+                 max_shifts_per_month: Optional[int] = None,
+                 max_weekend_shifts_per_month: Optional[int] = None, check_duplicates: bool = True):
+        """
+        Args:
+            min_rest_days: Free days required between two shifts of a worker (1 = no consecutive days)
+            max_shifts_per_week: Maximum shifts per worker in a Monday-Sunday week
+            max_shifts_per_month: Maximum shifts per worker in a calendar month
+            max_weekend_shifts_per_month: Maximum Friday/Saturday/Sunday/holiday shifts per month
+            check_duplicates: Report a worker appearing twice on the same day
+        """
+        self.min_rest_days = min_rest_days
+        self.max_shifts_per_week = max_shifts_per_week
+        self.max_shifts_per_month = max_shifts_per_month
+        self.max_weekend_shifts_per_month = max_weekend_shifts_per_month
+        self.check_duplicates = check_duplicates
+
+    @staticmethod
+    def from_dict(data: Optional[Dict[str, any]]) -> 'ValidationRules':
+        """
+        Build rules from an API payload (camelCase keys, missing keys keep the defaults).
+
+        Raises:
+            ValueError: If a limit is not a non-negative integer
+        """
+        data = data or {}
+        rules = ValidationRules()
+        for key, attribute in (('minRestDays', 'min_rest_days'),
+                               ('maxShiftsPerWeek', 'max_shifts_per_week'),
+                               ('maxShiftsPerMonth', 'max_shifts_per_month'),
+                               ('maxWeekendShiftsPerMonth', 'max_weekend_shifts_per_month')):
+            if key in data:
+                value = data[key]
+                if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+                    raise ValueError(f"Invalid value for {key}: {value}")
+                setattr(rules, attribute, value)
+        if 'checkDuplicates' in data:
+            rules.check_duplicates = bool(data['checkDuplicates'])
+        return rules
+
+
+class _PeriodLimit:
+    """Running per-worker count for the current period of one limit rule."""
+
+    def __init__(self, rule: str, limit: int, n_workers: int, message):
+        self.rule = rule
+        self.limit = limit
+        self.message = message  # (worker, count, limit, period) -> str
+        self.period = [None] * n_workers
+        self.count = [0] * n_workers
+        self.exceeded_at = [None] * n_workers  # day index where the limit was first exceeded
+
+    def add(self, worker: int, period: int, day_index: int, names: List[str],
+            days: List[date], warnings: List[Dict[str, any]]) -> None:
+        if self.period[worker] != period:
+            self.flush(worker, names, days, warnings)
+            self.period[worker] = period
+            self.count[worker] = 0
+            self.exceeded_at[worker] = None
+        self.count[worker] += 1
+        if self.count[worker] == self.limit + 1:
+            self.exceeded_at[worker] = day_index
+
+    def flush(self, worker: int, names: List[str], days: List[date], warnings: List[Dict[str, any]]) -> None:
+        day_index = self.exceeded_at[worker]
+        if day_index is None:
+            return
+        name = names[worker]
+        warnings.append({
+            'rule': self.rule,
+            'worker': name,
+            'dayIndex': day_index,
+            'date': days[day_index].isoformat(),
+            'count': self.count[worker],
+            'limit': self.limit,
+            'message': self.message(name, self.count[worker], self.limit, self.period[worker])
+        })
+        self.exceeded_at[worker] = None
+
+
+class ScheduleValidator:
+    """Check a parsed schedule against a set of rules in a single sweep."""
+
+    def __init__(self, rules: Optional[ValidationRules] = None):
+        self.rules = rules or ValidationRules()
+
+    def validate(self, parsed: ParsedCalendar, holidays: Iterable[date] = ()) -> List[Dict[str, any]]:
+        """
+        Validate a parsed schedule.
+
+        Args:
+            parsed: Parsed calendar
+            holidays: Holiday dates (for weekend limits)
+
+        Returns:
+            Warnings with rule, worker, dayIndex, date and message (ordered by rule
+            type within each day; period limits are reported when the period ends)
+        """
+        rules = self.rules
+        names = parsed.worker_names
+        n_workers = len(names)
+        days = [date.fromordinal(ordinal) for ordinal in parsed.ordinals.tolist()]
+        ordinals = parsed.ordinals.tolist()
+        assignments = parsed.assignments.tolist()
+        weekend = (day_type_codes(parsed.ordinals, parsed.day_of_week, holidays) & WEEKEND).tolist()
+
+        limits = []  # (limit, period key of a day index, weekend days only)
+        if rules.max_shifts_per_week is not None:
+            limits.append((_PeriodLimit(
+                'maxShiftsPerWeek', rules.max_shifts_per_week, n_workers,
+                lambda w, c, l, p: f"{w} tiene {c} guardias en la semana del "
+                                   f"{_format_day(date.fromordinal(p * 7 + 1))} (máximo {l})"
+            ), lambda i: (ordinals[i] - 1) // 7, False))  # ordinal 1 is a Monday
+        if rules.max_shifts_per_month is not None:
+            limits.append((_PeriodLimit(
+                'maxShiftsPerMonth', rules.max_shifts_per_month, n_workers,
+                lambda w, c, l, p: f"{w} tiene {c} guardias en {_format_month(p)} (máximo {l})"
+            ), lambda i: days[i].year * 12 + days[i].month - 1, False))
+        if rules.max_weekend_shifts_per_month is not None:
+            limits.append((_PeriodLimit(
+                'maxWeekendShiftsPerMonth', rules.max_weekend_shifts_per_month, n_workers,
+                lambda w, c, l, p: f"{w} tiene {c} guardias de fin de semana en {_format_month(p)} (máximo {l})"
+            ), lambda i: days[i].year * 12 + days[i].month - 1, True))
+
+        warnings: List[Dict[str, any]] = []
+        last_seen = [None] * n_workers  # day index of the previous shift
+
+        for index, row in enumerate(assignments):
+            seen_today = {}
+            for worker in row:
+                if worker >= 0:
+                    seen_today[worker] = seen_today.get(worker, 0) + 1
+
+            for worker, times in seen_today.items():
+                name = names[worker]
+
+                if rules.check_duplicates and times > 1:
+                    warnings.append({
+                        'rule': 'duplicate',
+                        'worker': name,
+                        'dayIndex': index,
+                        'date': days[index].isoformat(),
+                        'count': times,
+                        'message': f"{name} aparece {times} veces el {_format_day(days[index])}"
+                    })
+
+                previous = last_seen[worker]
+                if rules.min_rest_days is not None and previous is not None:
+                    rest = ordinals[index] - ordinals[previous] - 1
+                    if rest < rules.min_rest_days:
+                        if rest == 0:
+                            message = (f"{name} tiene guardia consecutiva el {_format_day(days[previous])} "
+                                       f"y el {_format_day(days[index])}")
+                        else:
+                            message = (f"{name} descansa {rest} día(s) entre el {_format_day(days[previous])} "
+                                       f"y el {_format_day(days[index])} (mínimo {rules.min_rest_days})")
+                        warnings.append({
+                            'rule': 'minRestDays',
+                            'worker': name,
+                            'dayIndex': previous,
+                            'date': days[previous].isoformat(),
+                            'nextDate': days[index].isoformat(),
+                            'restDays': rest,
+                            'message': message
+                        })
+                last_seen[worker] = index
+
+                for limit, period, weekend_only in limits:
+                    if not weekend_only or weekend[index]:
+                        limit.add(worker, period(index), index, names, days, warnings)
+
+        for limit, _, _ in limits:
+            for worker in range(n_workers):
+                limit.flush(worker, names, days, warnings)
+
+        return warnings
+
+
+def validate_text(calendar_text: str, start_date: Union[str, date], name_mapping: str = '',
+                  holidays: str = '', rules: Optional[ValidationRules] = None) -> Dict[str, any]:
+    """
+    Parse and validate calendar text in one call.
+
+    Args:
+        calendar_text: Week-block calendar text
+        start_date: Date of the first day (YYYY-MM-DD)
+        name_mapping: Mapping lines (``alias=NAME``)
+        holidays: Comma-separated holiday dates
+        rules: Validation rules (defaults: no consecutive days, no duplicates)
+
+    Returns:
+        Dictionary with 'warnings', 'counts' (per rule) and 'days'
+    """
+    parsed = CalendarParser(start_date, name_mapping).parse(calendar_text)
+    warnings = ScheduleValidator(rules).validate(parsed, parse_holidays(holidays))
+
+    counts: Dict[str, int] = {}
+    for warning in warnings:
+        counts[warning['rule']] = counts.get(warning['rule'], 0) + 1
+
+    return {'warnings': warnings, 'counts': counts, 'days': len(parsed)}
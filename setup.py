@@ -31,7 +31,9 @@ setup(
         "flask-cors==4.0.0",
         "werkzeug==2.3.0",
         "pandas>=2.0.0",
+        "numpy>=1.22.0",
         "openpyxl>=3.1.0",
+        "lxml>=4.9.0",
         "pdfplumber>=0.10.0",
         "python-dateutil>=2.8.0",
         "ReportLab>=4.0.0",
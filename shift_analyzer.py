@@ -0,0 +1,542 @@
+"""
+Module for parsing week-block calendar text and computing per-worker shift statistics.
+
+This is the server-side counterpart of ``parseCalendar`` and the ``analysis``
+step in CalendarAnalyzer.jsx. Counters are accumulated with NumPy so that
+multi-year rosters can be analyzed in milliseconds.
+"""
+
+import re
+from datetime import date, timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from day_types import day_type_codes, split_codes
+from name_normalizer import NameNormalizer
+
+
+LINES_PER_WEEK = 5  # Days line + 4 worker rows
+POSITIONS = LINES_PER_WEEK - 1
+ROSELL_POSITION = 3  # Zero-based index of the last ("Rosell") position
+
+# Month keys used by the UI (indexed by month - 1)
+MONTH_KEYS = ['january', 'february', 'march', 'april', 'may', 'june',
+              'july', 'august', 'september', 'october', 'november', 'december']
+
+# Short labels used by the monthly breakdown, in report order
+MONTH_LABELS = {
+    'Dic': 'december', 'Ene': 'january', 'Feb': 'february', 'Mar': 'march',
+    'Abr': 'april', 'May': 'may', 'Jun': 'june', 'Jul': 'july',
+    'Ago': 'august', 'Sep': 'september', 'Oct': 'october', 'Nov': 'november'
+}
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def months_with_data(monthly_data: Iterable[Dict[str, any]]) -> List[str]:
+    """Return the month labels with a non-zero value, in report order."""
+    all_months = set()
+    for worker_data in monthly_data:
+        for key, value in worker_data.items():
+            if key != 'name' and value and value > 0:
+                all_months.add(key)
+    order = list(MONTH_LABELS)
+    return sorted(all_months, key=lambda x: order.index(x) if x in order else 999)
+
+_INT_PREFIX = re.compile(r'^\s*([+-]?\d+)')
+_INITIAL = re.compile(r'^[A-Za-z]\.?$|^[A-Za-z]{1,2}$')
+
+
+def _parse_int(value: str) -> Optional[int]:
+    """Parse a leading integer the way JavaScript's ``parseInt`` does."""
+    match = _INT_PREFIX.match(value)
+    return int(match.group(1)) if match else None
+
+
+def _normalize_date(year: int, month: int, day: int) -> Optional[date]:
+    """Build a date letting month/day overflow like ``new Date(y, m - 1, d)``."""
+    year += (month - 1) // 12
+    month = (month - 1) % 12 + 1
+    try:
+        return date(year, month, 1) + timedelta(days=day - 1)
+    except (ValueError, OverflowError):
+        return None
+
+
+def advance_date(current: date, previous_day: int, day: int) -> date:
+    """
+    Date of the next day number of a calendar.
+
+    A smaller day number than the previous one starts the next month; a day
+    past the end of its month overflows into the following one, as in the UI.
+
+    Args:
+        current: Date of the previous day (the start date before the first one)
+        previous_day: Previous day number (0 before the first one)
+        day: Day number as written in the calendar
+
+    Returns:
+        Date of the day
+
+    Raises:
+        ValueError: If the day number is not 1-31 or the date jumps more than one month
+    """
+    if not 1 <= day <= 31:
+        raise ValueError(f"Invalid day number: {day} (expected 1-31)")
+
+    month = current.month + 1 if 0 < previous_day and day < previous_day else current.month
+    result = _normalize_date(current.year, month, day)
+    if result is None:
+        raise ValueError(f"Day number {day} after {current.isoformat()} is outside the supported date range")
+    if (result.year - current.year) * 12 + result.month - current.month > 1:
+        raise ValueError(f"Day number {day} after {current.isoformat()} skips more than one month")
+    return result
+
+
+def parse_holidays(holiday_string: str) -> List[date]:
+    """
+    Parse a comma-separated list of holidays.
+
+    Args:
+        holiday_string: Dates as YYYY-MM-DD or DD-MM-YYYY (``/`` also accepted)
+
+    Returns:
+        List of parsed dates (invalid entries are ignored)
+    """
+    if not holiday_string or not holiday_string.strip():
+        return []
+
+    holidays = []
+    for date_str in holiday_string.split(','):
+        trimmed = date_str.strip()
+        if not trimmed:
+            continue
+
+        parts = re.split(r'[-/]', trimmed)
+        if len(parts) != 3:
+            continue
+
+        if len(parts[0]) == 4:
+            year, month, day = (_parse_int(p) for p in parts)
+        else:
+            day, month, year = (_parse_int(p) for p in parts)
+
+        if day is None or month is None or year is None:
+            continue
+
+        # Two-digit years
+        if year < 100:
+            year += 2000
+
+        parsed = _normalize_date(year, month, day)
+        if parsed is not None:
+            holidays.append(parsed)
+
+    return holidays
+
+
+def parse_start_date(value: Union[str, date, None]) -> date:
+    """Parse the calendar start date (YYYY-MM-DD)."""
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip()[:10])
+    except ValueError:
+        raise ValueError(f"Invalid start date: {value}")
+
+
+def _is_likely_initial(word: str) -> bool:
+    """Detect short words (initials or short surnames) that belong to the previous name."""
+    return bool(_INITIAL.match(word))
+
+
+def split_cells(line: str) -> List[str]:
+    """
+    Split a calendar line into its cells.
+
+    Lines produced by layout-aware extraction are tab-separated with one cell
+    per day column (empty cells kept); other lines are split on whitespace.
+    """
+    if '\t' in line:
+        return [cell.strip() for cell in line.split('\t')]
+    return line.split()
+
+
+def split_worker_names(row_text: str, day_count: int) -> List[str]:
+    """
+    Split a worker row into one raw name per day column.
+
+    Short words (initials) are appended to the preceding name unless the row
+    has exactly one plain word per day. Tab-separated rows are already split
+    by column: cells are taken as they are, empty ones included.
+
+    Args:
+        row_text: Raw text of the worker row
+        day_count: Number of days in the week block
+
+    Returns:
+        List of raw (unmapped) names
+    """
+    if '\t' in row_text:
+        return split_cells(row_text)[:day_count]
+
+    words = row_text.split()
+
+    # Exactly one word per day and no initials: simple mapping
+    if len(words) == day_count:
+        if not any(_is_likely_initial(word) for word in words[1:]):
+            return words
+
+    # Group compound names by appending short words (initials)
+    names = []
+    word_index = 0
+    while len(names) < day_count and word_index < len(words):
+        current_name = words[word_index]
+        word_index += 1
+        while word_index < len(words) and _is_likely_initial(words[word_index]):
+            current_name += ' ' + words[word_index]
+            word_index += 1
+        names.append(current_name)
+
+    return names
+
+
+def parse_worker_names(row_text: str, day_count: int, mapping: NameNormalizer) -> List[Optional[str]]:
+    """
+    Split a worker row into one (normalized) name per day column.
+
+    Args:
+        row_text: Raw text of the worker row
+        day_count: Number of days in the week block
+        mapping: Compiled name mapping
+
+    Returns:
+        List of worker names, one per day
+    """
+    return [worker for worker in mapping.normalize_many(split_worker_names(row_text, day_count)) if worker]
+
+
+def iter_week_blocks(lines: Iterable[str]) -> Iterator[List[str]]:
+    """
+    Group non-empty lines into week blocks of ``LINES_PER_WEEK`` lines.
+
+    Works on any iterable, so blocks can be consumed while the source
+    text is still being produced. The last block may be shorter. Inside a
+    block, tab-separated rows are kept even when all their cells are empty
+    (a position with nobody assigned that week).
+    """
+    block = []
+    for line in lines:
+        if not line.strip() and not (block and '\t' in line):
+            continue
+        block.append(line)
+        if len(block) == LINES_PER_WEEK:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def build_week_grid(lines: Iterable[str]) -> Dict[str, any]:
+    """
+    Tokenize week blocks into a compact grid (the upload ``grid`` response).
+
+    Each distinct raw name is sent once in ``names``; week rows reference
+    names by index. Names are not mapped, so the client can still apply
+    its own mapping.
+
+    Args:
+        lines: Calendar lines
+
+    Returns:
+        ``{'names': [...], 'weeks': [{'days': [1, 2, ...], 'workers': [[0, 3, ...], ...]}]}``
+        with one ``workers`` row per position (a day number that is not an
+        integer is null; rows can be shorter than the week when names are missing,
+        and empty cells of layout-extracted grids are null)
+    """
+    names: Dict[str, int] = {}
+    weeks = []
+    for block in iter_week_blocks(lines):
+        days_line = split_cells(block[0])
+        workers = [
+            [names.setdefault(name, len(names)) if name else None
+             for name in split_worker_names(block[r] if r < len(block) else '', len(days_line))]
+            for r in range(1, LINES_PER_WEEK)
+        ]
+        weeks.append({'days': [_parse_int(token) for token in days_line], 'workers': workers})
+    return {'names': list(names), 'weeks': weeks}
+
+
+class ParsedCalendar:
+    """Columnar representation of a parsed calendar (one entry per day)."""
+
+    def __init__(self, ordinals: np.ndarray, day_of_week: np.ndarray,
+                 assignments: np.ndarray, worker_names: List[str]):
+        self.ordinals = ordinals          # date.toordinal() per day
+        self.day_of_week = day_of_week    # 0=Sunday ... 6=Saturday (column based)
+        self.assignments = assignments    # (days, POSITIONS) worker ids, -1 if empty
+        self.worker_names = worker_names  # worker id -> name
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    @property
+    def months(self) -> np.ndarray:
+        """Month number (1-12) per day."""
+        days = (self.ordinals - EPOCH_ORDINAL).astype('datetime64[D]')
+        return (days.astype('datetime64[M]').astype(np.int64) % 12 + 1).astype(np.int8)
+
+    def to_days(self) -> List[Dict[str, any]]:
+        """Return the days in the same shape as ``calendarData`` in the UI."""
+        days = []
+        for index, ordinal in enumerate(self.ordinals.tolist()):
+            current = date.fromordinal(ordinal)
+            days.append({
+                'day': current.day,
+                'month': current.month,
+                'year': current.year,
+                'dayOfWeek': int(self.day_of_week[index]),
+                'workers': [self.worker_names[w] for w in self.assignments[index].tolist() if w >= 0]
+            })
+        return days
+
+
+class CalendarParser:
+    """Parse week-block calendar text into a :class:`ParsedCalendar`."""
+
+    def __init__(self, start_date: Union[str, date], name_mapping: str = ''):
+        self.start_date = parse_start_date(start_date)
+        self.mapping = NameNormalizer(name_mapping)
+        self.reset()
+
+    def reset(self) -> None:
+        """Restart date tracking from the start date."""
+        self.state = (self.start_date, 0)  # (current date, previous day number)
+
+    def iter_days(self, lines: Iterable[str]) -> Iterator[Tuple[int, int, List[str]]]:
+        """
+        Yield the days of the given lines, continuing from the current state.
+
+        Calling it again with more lines continues the calendar where the
+        previous call stopped (``state`` can be saved and restored).
+
+        Args:
+            lines: Calendar lines (a whole number of week blocks, except possibly the last)
+
+        Yields:
+            Tuples (date ordinal, day of week with 0=Sunday, raw worker names by position)
+
+        Raises:
+            ValueError: If a day number is not 1-31 or skips more than one month (see ``advance_date``)
+        """
+        current, previous_day = self.state
+
+        for block in iter_week_blocks(lines):
+            days_line = split_cells(block[0])
+            day_count = len(days_line)
+            worker_rows = [
+                split_worker_names(block[r] if r < len(block) else '', day_count)
+                for r in range(1, LINES_PER_WEEK)
+            ]
+
+            for column, token in enumerate(days_line):
+                day = _parse_int(token)
+                if day is None:
+                    continue
+
+                current = advance_date(current, previous_day, day)
+                previous_day = day
+                self.state = (current, previous_day)
+
+                # Columns are Monday-Sunday; convert to JS getDay() (0=Sunday)
+                column_day = column % 7
+                names = [row[column] for row in worker_rows if column < len(row)]
+
+                yield current.toordinal(), 0 if column_day == 6 else column_day + 1, names
+
+    def parse(self, text: Union[str, Iterable[str]]) -> ParsedCalendar:
+        """
+        Parse calendar text.
+
+        Args:
+            text: Calendar text, or an iterable of lines (e.g. a page stream)
+
+        Returns:
+            Parsed calendar
+        """
+        lines = text.split('\n') if isinstance(text, str) else text
+
+        ordinals = []
+        day_of_week = []
+        rows = []
+        worker_ids: Dict[str, int] = {}
+
+        self.reset()
+        for ordinal, dow, names in self.iter_days(lines):
+            ids = [-1] * POSITIONS
+            position = 0
+            for raw, worker in zip(names, self.mapping.normalize_many(names)):
+                if worker:
+                    ids[position] = worker_ids.setdefault(worker, len(worker_ids))
+                    position += 1
+                elif not raw:
+                    position += 1  # Empty grid cell: the position stays unassigned
+
+            ordinals.append(ordinal)
+            day_of_week.append(dow)
+            rows.append(ids)
+
+        return ParsedCalendar(
+            ordinals=np.asarray(ordinals, dtype=np.int64),
+            day_of_week=np.asarray(day_of_week, dtype=np.int8),
+            assignments=np.asarray(rows, dtype=np.int32).reshape(-1, POSITIONS),
+            worker_names=list(worker_ids)
+        )
+
+
+def _to_fixed(value: float) -> str:
+    """Format with one decimal like JavaScript's ``toFixed(1)``."""
+    return str(Decimal(value).quantize(Decimal('0.1'), rounding=ROUND_HALF_UP))
+
+
+class ShiftAnalysis:
+    """Per-worker shift counters stored as NumPy arrays (indexed by worker id)."""
+
+    COUNTERS = ['total', 'friday', 'saturday', 'sunday', 'weekend', 'lastPosition']
+
+    def __init__(self, worker_names: List[str], counters: Dict[str, np.ndarray], monthly: np.ndarray):
+        self.worker_names = worker_names
+        self.counters = counters  # counter name -> (workers,) int array
+        self.monthly = monthly    # (workers, 12) int array, column = month - 1
+
+    def to_workers(self, sort_by: str = 'total') -> List[Dict[str, any]]:
+        """
+        Build the worker list used by the UI and ``/api/export``.
+
+        Args:
+            sort_by: 'total', 'name', 'weekendPercentage', 'rosellPercentage' or any counter
+
+        Returns:
+            List of worker dictionaries, sorted
+        """
+        columns = {key: values.tolist() for key, values in self.counters.items()}
+        monthly = self.monthly.tolist()
+
+        workers = []
+        for index, name in enumerate(self.worker_names):
+            worker = {'name': name}
+            for key in self.COUNTERS:
+                worker[key] = columns[key][index]
+            for month_key in MONTH_LABELS.values():
+                worker[month_key] = monthly[index][MONTH_KEYS.index(month_key)]
+            total = worker['total']
+            worker['weekendPercentage'] = _to_fixed(worker['weekend'] / total * 100) if total else '0.0'
+            worker['rosellPercentage'] = _to_fixed(worker['lastPosition'] / total * 100) if total else '0.0'
+            workers.append(worker)
+
+        if sort_by == 'name':
+            workers.sort(key=lambda w: w['name'])
+        elif sort_by in ('weekendPercentage', 'rosellPercentage'):
+            workers.sort(key=lambda w: float(w[sort_by]), reverse=True)
+        elif workers and sort_by in workers[0]:
+            workers.sort(key=lambda w: w[sort_by], reverse=True)
+
+        return workers
+
+    @staticmethod
+    def to_monthly_data(workers: List[Dict[str, any]]) -> List[Dict[str, any]]:
+        """Build the monthly breakdown (Dic..Nov) used by the PDF export."""
+        return [
+            dict([('name', worker['name'])] +
+                 [(label, worker.get(key, 0) or 0) for label, key in MONTH_LABELS.items()])
+            for worker in workers
+        ]
+
+
+class ShiftAnalyzer:
+    """Compute per-worker statistics applying the weekend and holiday rules."""
+
+    @staticmethod
+    def classify_days(parsed: ParsedCalendar, holidays: Iterable[date]) -> Dict[str, np.ndarray]:
+        """
+        Classify each day as Friday/Saturday/Sunday applying holiday rules.
+
+        Holidays count as Sunday. The day before a holiday counts as Friday
+        only when it falls Monday-Thursday. Days are looked up in the shared
+        day-type index (see ``day_types``).
+
+        Args:
+            parsed: Parsed calendar
+            holidays: Holiday dates
+
+        Returns:
+            Dictionary of boolean arrays: friday, saturday, sunday, weekend
+        """
+        return split_codes(day_type_codes(parsed.ordinals, parsed.day_of_week, holidays))
+
+    @staticmethod
+    def analyze(parsed: ParsedCalendar, holidays: Iterable[date] = ()) -> ShiftAnalysis:
+        """
+        Compute per-worker totals.
+
+        Args:
+            parsed: Parsed calendar
+            holidays: Holiday dates
+
+        Returns:
+            Shift analysis with counters per worker
+        """
+        n_workers = len(parsed.worker_names)
+        day_types = ShiftAnalyzer.classify_days(parsed, holidays)
+
+        filled = parsed.assignments >= 0
+        day_index, position = np.nonzero(filled)
+        worker = parsed.assignments[day_index, position]
+
+        def count(mask: np.ndarray) -> np.ndarray:
+            return np.bincount(worker[mask], minlength=n_workers)
+
+        counters = {
+            'total': np.bincount(worker, minlength=n_workers),
+            'friday': count(day_types['friday'][day_index]),
+            'saturday': count(day_types['saturday'][day_index]),
+            'sunday': count(day_types['sunday'][day_index]),
+            'weekend': count(day_types['weekend'][day_index]),
+            'lastPosition': count(position == ROSELL_POSITION)
+        }
+
+        month = parsed.months.astype(np.int64) - 1
+        monthly = np.bincount(worker * 12 + month[day_index], minlength=n_workers * 12)
+
+        return ShiftAnalysis(parsed.worker_names, counters, monthly.reshape(n_workers, 12))
+
+
+def analyze_text(calendar_text: str, start_date: Union[str, date], name_mapping: str = '',
+                 holidays: str = '', sort_by: str = 'total') -> Dict[str, any]:
+    """
+    Parse and analyze calendar text in one call.
+
+    Args:
+        calendar_text: Week-block calendar text
+        start_date: Date of the first day (YYYY-MM-DD)
+        name_mapping: Mapping lines (``alias=NAME``)
+        holidays: Comma-separated holiday dates
+        sort_by: Sort key for the worker list
+
+    Returns:
+        Dictionary with 'workers', 'monthlyData', 'days' and 'nameSuggestions'
+        (suggested mapping lines for names that look like typos)
+    """
+    parser = CalendarParser(start_date, name_mapping)
+    parsed = parser.parse(calendar_text)
+    analysis = ShiftAnalyzer.analyze(parsed, parse_holidays(holidays))
+    workers = analysis.to_workers(sort_by)
+
+    return {
+        'workers': workers,
+        'monthlyData': ShiftAnalysis.to_monthly_data(workers),
+        'days': len(parsed),
+        'nameSuggestions': parser.mapping.suggestions()
+    }
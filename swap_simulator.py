@@ -0,0 +1,464 @@
+"""
+What-if simulation of swaps and reassignments on an analysis session.
+
+The simulator takes a snapshot of a session (worker per day and position,
+day types, per-worker counters) and applies proposed changes slot by slot.
+Moving one slot from a worker to another only touches the counters of those
+two workers, and the per-category sums and sums of squares are updated
+alongside, so the standard deviation of every category is known after each
+change without looking at the other workers. Spread and Gini are computed
+on demand over the fairness population: the workers with shifts when the
+snapshot was taken plus any worker assigned later (a worker left without
+shifts still counts, with zeros).
+
+Candidate swaps are ranked by applying each one, reading the objective from
+the running sums and reverting it, so thousands of what-ifs can be scored
+per second.
+"""
+
+from datetime import date
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from shift_analyzer import POSITIONS, ROSELL_POSITION, ShiftAnalysis
+
+if TYPE_CHECKING:
+    from analysis_session import AnalysisSession
+
+
+CATEGORIES = ShiftAnalysis.COUNTERS  # total, friday, saturday, sunday, weekend, lastPosition
+_DAY_CATEGORIES = ['friday', 'saturday', 'sunday', 'weekend']
+_ROSELL_COLUMN = CATEGORIES.index('lastPosition')
+
+MAX_CANDIDATES = 2000  # Candidates scored per ranking by default
+
+# (day index, position)
+Slot = Tuple[int, int]
+
+
+def gini(counts: np.ndarray) -> np.ndarray:
+    """Gini coefficient of each column of non-negative counts (0 = perfectly even)."""
+    n = len(counts)
+    if n == 0:
+        return np.zeros(counts.shape[1:])
+    total = counts.sum(axis=0)
+    ranks = np.arange(1, n + 1).reshape((n,) + (1,) * (counts.ndim - 1))
+    weighted = (ranks * np.sort(counts, axis=0)).sum(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(total > 0, 2 * weighted / (n * total) - (n + 1) / n, 0.0)
+
+
+class SwapSimulator:
+    """Per-worker counters of a schedule that can be changed one slot at a time."""
+
+    def __init__(self, ordinals: np.ndarray, day_types: Dict[str, np.ndarray], month: np.ndarray,
+                 assignments: np.ndarray, worker_names: List[str], normalize=None):
+        """
+        Args:
+            ordinals: Date ordinal per day
+            day_types: Boolean arrays per day for 'friday', 'saturday', 'sunday' and 'weekend'
+            month: Month index (0-11) per day
+            assignments: (days, POSITIONS) worker ids, -1 if empty
+            worker_names: Worker id -> name
+            normalize: Maps a name given in a change to its canonical name (e.g. the session's mapping)
+        """
+        self.ordinals = ordinals
+        self.month = month
+        self.assignments = assignments.copy()
+        self.worker_names = list(worker_names)
+        self.worker_ids = {name: worker for worker, name in enumerate(self.worker_names)}
+        self.normalize = normalize or (lambda name: name.strip() or None)
+        self.day_index = {ordinal: index for index, ordinal in reversed(list(enumerate(ordinals.tolist())))}
+
+        # Contribution of one slot to each category: the day's flags, plus Rosell for the last position
+        flags = np.ones((len(ordinals), len(CATEGORIES)), dtype=np.int64)
+        for key in _DAY_CATEGORIES:
+            flags[:, CATEGORIES.index(key)] = day_types[key]
+        flags[:, _ROSELL_COLUMN] = 0
+        self._contribution = [flags] * POSITIONS
+        self._contribution[ROSELL_POSITION] = flags.copy()
+        self._contribution[ROSELL_POSITION][:, _ROSELL_COLUMN] = 1
+
+        self.counts = np.zeros((len(self.worker_names), len(CATEGORIES)), dtype=np.int64)
+        self.monthly = np.zeros((len(self.worker_names), 12), dtype=np.int64)
+        day, position = np.nonzero(self.assignments >= 0)
+        worker = self.assignments[day, position]
+        for slot_position in range(POSITIONS):
+            at = position == slot_position
+            np.add.at(self.counts, worker[at], self._contribution[slot_position][day[at]])
+        np.add.at(self.monthly, (worker, self.month[day]), 1)
+
+        self.members = self.counts[:, 0] > 0
+        self._n = int(self.members.sum())
+        self._sum = self.counts.sum(axis=0).astype(np.float64)
+        self._sumsq = (self.counts.astype(np.float64) ** 2).sum(axis=0)
+        self.history: List[List[Tuple[Slot, int, int, List[int]]]] = []
+
+    @classmethod
+    def from_session(cls, session: 'AnalysisSession') -> 'SwapSimulator':
+        """Snapshot the current state of an analysis session."""
+        assignments = np.full(session.tokens.shape, -1, dtype=np.int32)
+        filled = session.tokens >= 0
+        assignments[filled] = session.token_worker[session.tokens[filled]]
+        return cls(session.ordinals, session.day_types, session.month, assignments,
+                   session.worker_names, session.mapping.normalize)
+
+    # ------------------------------------------------------------------
+    # Slot updates
+    # ------------------------------------------------------------------
+
+    def _grow(self, worker: int) -> None:
+        missing = worker + 1 - len(self.counts)
+        if missing > 0:
+            self.counts = np.vstack([self.counts, np.zeros((missing, len(CATEGORIES)), dtype=np.int64)])
+            self.monthly = np.vstack([self.monthly, np.zeros((missing, 12), dtype=np.int64)])
+            self.members = np.concatenate([self.members, np.zeros(missing, dtype=bool)])
+
+    def _move(self, slot: Slot, worker: int, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) the contribution of ``slot`` to ``worker``."""
+        day, position = slot
+        contribution = sign * self._contribution[position][day]
+        before = self.counts[worker]
+        after = before + contribution
+        self._sumsq += after * after - before * before
+        self._sum += contribution
+        self.counts[worker] = after
+        self.monthly[worker, self.month[day]] += sign
+
+    def _set(self, slot: Slot, worker: int) -> Tuple[int, List[int]]:
+        """Assign ``slot`` to ``worker`` (-1 empties it); return the previous worker and new members."""
+        day, position = slot
+        previous = int(self.assignments[day, position])
+        if previous == worker:
+            return previous, []
+        joined = []
+        if worker >= 0 and not self.members[worker]:
+            self.members[worker] = True
+            self._n += 1
+            joined.append(worker)
+        if previous >= 0:
+            self._move(slot, previous, -1)
+        if worker >= 0:
+            self._move(slot, worker, 1)
+        self.assignments[day, position] = worker
+        return previous, joined
+
+    def _unset(self, changes: List[Tuple[Slot, int, int, List[int]]]) -> None:
+        """Revert changes recorded by ``_set`` (most recent first)."""
+        for slot, previous, worker, joined in reversed(changes):
+            day, position = slot
+            if worker >= 0:
+                self._move(slot, worker, -1)
+            if previous >= 0:
+                self._move(slot, previous, 1)
+            self.assignments[day, position] = previous
+            for member in joined:
+                self.members[member] = False
+                self._n -= 1
+
+    def _apply_slots(self, assignments: List[Tuple[Slot, int]]) -> List[Tuple[Slot, int, int, List[int]]]:
+        changes = []
+        for slot, worker in assignments:
+            previous, joined = self._set(slot, worker)
+            changes.append((slot, previous, worker, joined))
+        return changes
+
+    # ------------------------------------------------------------------
+    # Changes
+    # ------------------------------------------------------------------
+
+    def slot(self, value: Dict[str, any]) -> Slot:
+        """
+        Resolve a slot given as ``{'date': 'YYYY-MM-DD' | 'day': index, 'position': 0-3}``.
+
+        Raises:
+            ValueError: If the day or position is not in the schedule
+        """
+        if not isinstance(value, dict):
+            raise ValueError('A slot must be an object with date (or day) and position')
+        if value.get('date') is not None:
+            try:
+                ordinal = date.fromisoformat(str(value['date'])[:10]).toordinal()
+            except ValueError:
+                raise ValueError(f"Invalid date: {value['date']}")
+            if ordinal not in self.day_index:
+                raise ValueError(f"Date not in the schedule: {value['date']}")
+            day = self.day_index[ordinal]
+        else:
+            day = value.get('day')
+            if not isinstance(day, int) or not 0 <= day < len(self.ordinals):
+                raise ValueError(f"Invalid day index: {day}")
+        position = value.get('position')
+        if not isinstance(position, int) or not 0 <= position < POSITIONS:
+            raise ValueError(f"Invalid position: {position} (0-{POSITIONS - 1})")
+        return day, position
+
+    def worker_id(self, name: Optional[str]) -> int:
+        """Id of a worker by name (canonicalized; new names get a new id, None or '' gives -1)."""
+        name = self.normalize(name) if name else None
+        if not name:
+            return -1
+        worker = self.worker_ids.get(name)
+        if worker is None:
+            worker = self.worker_ids[name] = len(self.worker_names)
+            self.worker_names.append(name)
+            self._grow(worker)
+        return worker
+
+    def _check_day(self, slot: Slot, worker: int, ignore: Iterable[Slot] = ()) -> None:
+        day, position = slot
+        if worker < 0:
+            return
+        for other in range(POSITIONS):
+            if other != position and (day, other) not in ignore and self.assignments[day, other] == worker:
+                raise ValueError(f"{self.worker_names[worker]} is already assigned on "
+                                 f"{date.fromordinal(int(self.ordinals[day])).isoformat()}")
+
+    def swap(self, a: Slot, b: Slot) -> None:
+        """
+        Exchange the workers of two slots.
+
+        Raises:
+            ValueError: If a worker would end up twice on the same day
+        """
+        worker_a, worker_b = int(self.assignments[a]), int(self.assignments[b])
+        if a[0] != b[0]:
+            self._check_day(b, worker_a, [b])
+            self._check_day(a, worker_b, [a])
+        self.history.append(self._apply_slots([(a, worker_b), (b, worker_a)]))
+
+    def reassign(self, slot: Slot, name: Optional[str]) -> None:
+        """
+        Give a slot to another worker (None or '' leaves it empty).
+
+        Raises:
+            ValueError: If the worker is already assigned on that day
+        """
+        worker = self.worker_id(name)
+        self._check_day(slot, worker)
+        self.history.append(self._apply_slots([(slot, worker)]))
+
+    def apply(self, change: Dict[str, any]) -> Dict[str, any]:
+        """
+        Apply one change given as a JSON object.
+
+        Args:
+            change: ``{'swap': [slot, slot]}`` or ``{'date': ..., 'position': ..., 'worker': 'NAME'}``
+                (see ``slot``; a null worker empties the slot)
+
+        Returns:
+            The change with the workers involved
+
+        Raises:
+            ValueError: If the change is invalid
+        """
+        if not isinstance(change, dict):
+            raise ValueError('Each change must be an object')
+        if 'swap' in change:
+            slots = change['swap']
+            if not isinstance(slots, list) or len(slots) != 2:
+                raise ValueError('swap must be a list of two slots')
+            a, b = self.slot(slots[0]), self.slot(slots[1])
+            self.swap(a, b)
+            return {'kind': 'swap', 'slots': [self.describe(a), self.describe(b)]}
+        if 'worker' not in change:
+            raise ValueError("A change needs 'swap' or 'worker'")
+        slot = self.slot(change)
+        previous = self.describe(slot)['worker']
+        self.reassign(slot, change['worker'])
+        return {'kind': 'reassign', 'slot': self.describe(slot), 'previous': previous}
+
+    def undo(self) -> bool:
+        """Revert the last change (False if there is none)."""
+        if not self.history:
+            return False
+        self._unset(self.history.pop())
+        return True
+
+    def describe(self, slot: Slot) -> Dict[str, any]:
+        """Date, position and current worker of a slot."""
+        day, position = slot
+        worker = int(self.assignments[day, position])
+        return {
+            'date': date.fromordinal(int(self.ordinals[day])).isoformat(),
+            'position': position,
+            'worker': self.worker_names[worker] if worker >= 0 else None
+        }
+
+    # ------------------------------------------------------------------
+    # Fairness
+    # ------------------------------------------------------------------
+
+    def _std(self) -> np.ndarray:
+        """Population standard deviation per category, from the running sums."""
+        if self._n == 0:
+            return np.zeros(len(CATEGORIES))
+        mean = self._sum / self._n
+        return np.sqrt(np.maximum(self._sumsq / self._n - mean * mean, 0))
+
+    def fairness(self) -> Dict[str, Dict[str, float]]:
+        """
+        Fairness metrics per category over the fairness population.
+
+        Returns:
+            ``{category: {'mean', 'std', 'spread', 'min', 'max', 'gini'}}``
+        """
+        counts = self.counts[self.members]
+        columns = {'std': self._std().tolist(), 'gini': gini(counts).tolist()}
+        if len(counts):
+            columns.update(mean=(self._sum / self._n).tolist(),
+                           min=counts.min(axis=0).tolist(), max=counts.max(axis=0).tolist())
+        else:
+            columns.update(mean=[0.0] * len(CATEGORIES), min=[0] * len(CATEGORIES), max=[0] * len(CATEGORIES))
+        return {
+            key: {
+                'mean': round(columns['mean'][column], 4),
+                'std': round(columns['std'][column], 4),
+                'spread': columns['max'][column] - columns['min'][column],
+                'min': columns['min'][column],
+                'max': columns['max'][column],
+                'gini': round(columns['gini'][column], 4)
+            }
+            for column, key in enumerate(CATEGORIES)
+        }
+
+    def workers(self, sort_by: str = 'total') -> List[Dict[str, any]]:
+        """Per-worker counters in the same shape as the analysis ``workers`` list."""
+        members = np.nonzero(self.members)[0]
+        analysis = ShiftAnalysis(
+            [self.worker_names[w] for w in members.tolist()],
+            {key: self.counts[members, column] for column, key in enumerate(CATEGORIES)},
+            self.monthly[members]
+        )
+        return analysis.to_workers(sort_by)
+
+    # ------------------------------------------------------------------
+    # Ranking
+    # ------------------------------------------------------------------
+
+    def _weights(self, weights: Union[str, Dict[str, float]]) -> np.ndarray:
+        if isinstance(weights, str):
+            weights = {weights: 1.0}
+        vector = np.zeros(len(CATEGORIES))
+        for key, weight in weights.items():
+            if key not in CATEGORIES:
+                raise ValueError(f"Unknown category: {key} (one of {', '.join(CATEGORIES)})")
+            try:
+                vector[CATEGORIES.index(key)] = float(weight)
+            except (TypeError, ValueError):
+                raise ValueError(f"Invalid weight for {key}: {weight}")
+        return vector
+
+    def _candidates(self, column: int, pairs: int, reassign: bool) -> Iterable[List[Tuple[Slot, int]]]:
+        """
+        Moves that shift one unit of a category from an overloaded to an underloaded worker.
+
+        Swaps exchange a slot of the overloaded worker that counts for the
+        category with a slot of the underloaded one that does not; with
+        ``reassign`` the slot may also simply be handed over.
+        """
+        members = np.nonzero(self.members)[0]
+        values = self.counts[members, column]
+        order = np.argsort(values, kind='stable')
+        under = members[order[:pairs]].tolist()
+        over = members[order[::-1][:pairs]].tolist()
+
+        slots_by_worker: Dict[int, List[Slot]] = {}
+        for worker in set(under) | set(over):
+            days, positions = np.nonzero(self.assignments == worker)
+            slots_by_worker[worker] = list(zip(days.tolist(), positions.tolist()))
+
+        def counts_for(slot: Slot) -> bool:
+            return bool(self._contribution[slot[1]][slot[0], column])
+
+        # Largest gaps first, so that a candidate cap keeps the most promising pairs
+        pairs_by_gap = sorted(((x, y) for x in over for y in under if x != y),
+                              key=lambda pair: self.counts[pair[1], column] - self.counts[pair[0], column])
+        for x, y in pairs_by_gap:
+            if self.counts[x, column] - self.counts[y, column] < 2:
+                continue  # Moving one unit would not reduce the gap
+            given = [slot for slot in slots_by_worker[x] if counts_for(slot)]
+            taken = [slot for slot in slots_by_worker[y] if not counts_for(slot)]
+            for a in given:
+                for b in taken:
+                    yield [(a, y), (b, x)]
+                if reassign:
+                    yield [(a, y)]
+
+    def _valid(self, moves: List[Tuple[Slot, int]]) -> bool:
+        targets = {slot for slot, _ in moves}
+        for slot, worker in moves:
+            day, position = slot
+            for other in range(POSITIONS):
+                if other != position and (day, other) not in targets and self.assignments[day, other] == worker:
+                    return False
+        return True
+
+    def rank_swaps(self, objective: Union[str, Dict[str, float]] = 'weekend', limit: int = 10,
+                   pairs: int = 5, reassign: bool = False,
+                   max_candidates: int = MAX_CANDIDATES) -> Dict[str, any]:
+        """
+        Score candidate moves for a fairness objective and return the best ones.
+
+        The objective is the weighted sum of the per-category standard
+        deviations (lower is fairer). Candidates move one unit of the main
+        category (the highest weight) from the ``pairs`` most loaded workers
+        to the ``pairs`` least loaded ones; each is applied, scored from the
+        running sums and reverted.
+
+        Args:
+            objective: A category, or ``{category: weight}``
+            limit: Candidates returned
+            pairs: Most and least loaded workers considered
+            reassign: Also consider handing a slot over without a swap back
+                (changes totals)
+            max_candidates: Candidates scored at most
+
+        Returns:
+            ``{'objective': current score, 'evaluated': n, 'candidates': [...]}`` with
+            candidates sorted by improvement, each with its changes and the
+            standard deviations after applying it
+
+        Raises:
+            ValueError: If the objective or a limit is invalid
+        """
+        weights = self._weights(objective)
+        if not weights.any():
+            raise ValueError('The objective needs a positive weight')
+        for name, value in (('limit', limit), ('pairs', pairs), ('maxCandidates', max_candidates)):
+            if not isinstance(value, int) or value < 1:
+                raise ValueError(f"{name} must be a positive integer")
+
+        baseline = float(weights @ self._std())
+        scored = []
+        evaluated = 0
+        for moves in self._candidates(int(np.argmax(weights)), pairs, reassign):
+            if evaluated >= max_candidates:
+                break
+            if not self._valid(moves):
+                continue
+            evaluated += 1
+            changes = self._apply_slots(moves)
+            std = self._std()
+            self._unset(changes)
+            score = float(weights @ std)
+            if score < baseline - 1e-12:
+                scored.append((score, moves, std))
+
+        scored.sort(key=lambda item: item[0])
+        candidates = []
+        for score, moves, std in scored[:limit]:
+            if len(moves) == 2:
+                (a, _), (b, _) = moves
+                change = {'swap': [self.describe(a), self.describe(b)]}
+            else:
+                (slot, worker), = moves
+                change = {**self.describe(slot), 'worker': self.worker_names[worker]}
+            candidates.append({
+                'change': change,
+                'objective': round(score, 4),
+                'improvement': round(baseline - score, 4),
+                'std': {key: round(float(std[column]), 4) for column, key in enumerate(CATEGORIES)}
+            })
+        return {'objective': round(baseline, 4), 'evaluated': evaluated, 'candidates': candidates}
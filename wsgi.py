@@ -0,0 +1,27 @@
+"""
+Production WSGI entry point.
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Error responses do not include tracebacks (set SHOW_TRACEBACKS=1 to
+include them). Unless WARM_UP=0, every format backend is loaded and
+exercised at import; with ``preload_app`` (see gunicorn.conf.py) that
+happens once in the master process, and the forked workers share it
+copy-on-write.
+"""
+
+import os
+
+from app import create_app, warm_up
+
+
+def _flag(name: str, default: str) -> bool:
+    return os.environ.get(name, default).lower() not in ('0', 'false', 'no')
+
+
+app = create_app()
+
+if _flag('WARM_UP', '1'):
+    timings = warm_up()
+    print(f"Warm-up: {sum(timings.values()):.2f}s "
+          f"({', '.join(f'{name} {seconds:.2f}s' for name, seconds in timings.items())})", flush=True)
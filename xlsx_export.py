@@ -0,0 +1,192 @@
+"""
+Streaming XLSX export of the global statistics and the monthly breakdown.
+
+The workbook is built with openpyxl's write-only mode, so rows are
+serialized to temporary files as they are appended instead of being kept as
+cell objects. The archive is then written by a producer thread into a
+bounded queue of chunks that ``iter_xlsx_chunks`` yields as they are
+produced: memory use does not depend on the number of rows, and the
+download starts before the archive is finished.
+"""
+
+import os
+import queue
+import threading
+from typing import Dict, Iterator, List
+
+from csv_export import GLOBAL_HEADER, monthly_breakdown
+
+
+XLSX_MIMETYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+CHUNK_SIZE = 64 * 1024
+MAX_PENDING_CHUNKS = 8  # Chunks buffered between the producer thread and the response
+GLOBAL_SHEET = 'Resumen Global'
+MONTHLY_SHEET = 'Desglose Mensual'
+
+
+class _Cancelled(Exception):
+    """The consumer stopped reading (e.g. the client disconnected)."""
+
+
+class _ChunkSink:
+    """Write-only, unseekable file object that hands the archive to the consumer in chunks."""
+
+    def __init__(self, chunks: queue.Queue, cancelled: threading.Event, chunk_size: int):
+        self.chunks = chunks
+        self.cancelled = cancelled
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+
+    def put(self, item) -> None:
+        while True:
+            if self.cancelled.is_set():
+                raise _Cancelled()
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, data) -> int:
+        self.buffer += data
+        while len(self.buffer) >= self.chunk_size:
+            self.put(bytes(self.buffer[:self.chunk_size]))
+            del self.buffer[:self.chunk_size]
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def finish(self) -> None:
+        if self.buffer:
+            self.put(bytes(self.buffer))
+            self.buffer.clear()
+
+
+def _number(value: any) -> any:
+    """Numeric strings (e.g. percentages formatted as '34.7') as numbers, other values unchanged."""
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def build_workbook(workers: List[Dict[str, any]], monthly_data: List[Dict[str, any]]):
+    """
+    Build a write-only workbook with a global sheet and a monthly sheet.
+
+    The monthly sheet has one column per month with data, in the Dic..Nov
+    order of the other exports, plus a total column.
+
+    Args:
+        workers: Worker statistics
+        monthly_data: Monthly breakdown per worker (may be empty)
+
+    Returns:
+        openpyxl Workbook ready to be saved (once)
+    """
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+
+    workbook = Workbook(write_only=True)
+    bold = Font(bold=True)
+
+    def header(sheet, titles: List[str]) -> List[any]:
+        cells = []
+        for title in titles:
+            cell = WriteOnlyCell(sheet, value=title)
+            cell.font = bold
+            cells.append(cell)
+        return cells
+
+    sheet = workbook.create_sheet(GLOBAL_SHEET)
+    sheet.freeze_panes = 'B2'
+    sheet.column_dimensions['A'].width = 28
+    sheet.append(header(sheet, GLOBAL_HEADER))
+    for worker in workers:
+        sheet.append([
+            worker.get('name', ''),
+            worker.get('total', 0),
+            worker.get('friday', 0),
+            worker.get('saturday', 0),
+            worker.get('sunday', 0),
+            _number(worker.get('weekendPercentage', 0)),
+            worker.get('lastPosition', 0)
+        ])
+
+    months, monthly_by_name = monthly_breakdown(workers, monthly_data)
+    sheet = workbook.create_sheet(MONTHLY_SHEET)
+    sheet.freeze_panes = 'B2'
+    sheet.column_dimensions['A'].width = 28
+    sheet.append(header(sheet, ['Médico'] + months + ['Total']))
+    for name, entry in monthly_by_name.items():
+        values = [entry.get(month, 0) or 0 for month in months]
+        sheet.append([name or ''] + values + [sum(values)])
+
+    return workbook
+
+
+def _discard(workbook) -> None:
+    """Remove the temporary sheet files of a workbook whose save did not finish."""
+    if workbook is None:
+        return
+    for sheet in workbook.worksheets:
+        writer = getattr(sheet, '_writer', None)
+        if writer is not None and isinstance(writer.out, str) and os.path.exists(writer.out):
+            writer.close()
+            writer.cleanup()
+
+
+def iter_xlsx_chunks(workers: List[Dict[str, any]], monthly_data: List[Dict[str, any]],
+                     chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Produce the XLSX export as a stream of chunks.
+
+    Args:
+        workers: Worker statistics
+        monthly_data: Monthly breakdown per worker (may be empty)
+        chunk_size: Bytes per yielded chunk (the last one may be shorter)
+
+    Yields:
+        Chunks of the XLSX archive
+
+    Raises:
+        Exception: Whatever building or saving the workbook raised
+    """
+    chunks: queue.Queue = queue.Queue(maxsize=MAX_PENDING_CHUNKS)
+    cancelled = threading.Event()
+    sink = _ChunkSink(chunks, cancelled, chunk_size)
+    done = object()
+
+    def produce() -> None:
+        workbook = None
+        try:
+            workbook = build_workbook(workers, monthly_data)
+            workbook.save(sink)  # ZipFile writes data descriptors to an unseekable stream
+            sink.finish()
+            sink.put(done)
+        except _Cancelled:
+            _discard(workbook)
+        except BaseException as e:
+            _discard(workbook)
+            try:
+                sink.put(e)
+            except _Cancelled:
+                pass
+
+    producer = threading.Thread(target=produce, name='xlsx-export', daemon=True)
+    producer.start()
+    try:
+        while True:
+            item = chunks.get()
+            if item is done:
+                return
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+    finally:
+        cancelled.set()
+        producer.join()